@@ -0,0 +1,46 @@
+"""Benchmark of the bulk Excel parsing.
+
+Copy the sample exports N times into a temporary directory and parse them with 1, 2, 4... workers.
+
+    python benchmarks/excel_bulk.py --copies 32
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pygazpar.excelparser import ExcelParser
+
+SAMPLES = ["tests/resources/Donnees_informatives_PCE_DAILY.xlsx",
+           "tests/resources/Donnees_informatives_PCE_WEEKLY.xlsx",
+           "tests/resources/Donnees_informatives_PCE_MONTHLY.xlsx"]
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=16, help="Number of PCE (copies of each sample)")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count(), help="Largest pool size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # One sub directory per frequency, one file per PCE (the file name is the PCE when the export is anonymized).
+        for sample in SAMPLES:
+            os.mkdir(os.path.join(directory, os.path.basename(sample)))
+            for index in range(args.copies):
+                shutil.copy(sample, os.path.join(directory, os.path.basename(sample), f"{index:014d}.xlsx"))
+        filenames = ExcelParser.expand(os.path.join(directory, "*", "*.xlsx"))
+
+        baseline = None
+        workers = 1
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            res = ExcelParser.parse_many(filenames, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:3d} worker(s): {len(filenames)} files, {len(res)} PCE in {elapsed:.2f}s (speedup x{baseline / elapsed:.2f})")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark of JsonFileDataSource on an archive of dumps.
+
+Build an archive of --dumps files holding --pces PCE each (copies of the sample PCE), then load one PCE.
+Dumps which do not contain the PCE are skipped through the memory map without being decoded.
+
+    python benchmarks/json_archive.py --dumps 50 --pces 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from pygazpar.datasource import JsonFileDataSource
+from pygazpar.enum import Frequency
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dumps", type=int, default=20, help="Number of dump files")
+    parser.add_argument("--pces", type=int, default=100, help="Number of PCE per dump")
+    args = parser.parse_args()
+
+    with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+        sample = json.load(consumption_json_file)[PCE_IDENTIFIER]
+
+    with tempfile.TemporaryDirectory() as directory:
+        size = 0
+        for dump_index in range(args.dumps):
+            dump = {f"{dump_index:04d}{pce_index:010d}": sample for pce_index in range(args.pces)}
+            filename = os.path.join(directory, f"{dump_index:04d}.json")
+            with open(filename, "w") as dump_file:
+                json.dump(dump, dump_file)
+            size += os.path.getsize(filename)
+        print(f"Archive: {args.dumps} dumps, {args.dumps * args.pces} PCE, {size / 1e6:.0f} MB")
+
+        dataSource = JsonFileDataSource(directory, None)
+        for pce_identifier in [f"{0:04d}{0:010d}", f"{args.dumps - 1:04d}{args.pces - 1:010d}"]:
+            start = time.perf_counter()
+            data = asyncio.run(dataSource.load(pce_identifier, None, None, [Frequency.DAILY, Frequency.MONTHLY]))
+            elapsed = time.perf_counter() - start
+            print(f"PCE {pce_identifier}: {len(data[Frequency.DAILY.value])} daily readings in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Peak memory benchmark of the JSON load pipeline.
+
+Build a dump of --years years of daily readings for each of --pces PCE, load every PCE with JsonFileDataSource
+(all frequencies) and serialize the result, with tracemalloc on. Report the peak bytes per daily reading of each
+stage (max over the PCE) and exit with 1 when a stage goes over its threshold.
+
+    python benchmarks/memory.py --pces 5 --years 4
+    python benchmarks/memory.py --threshold parse_result=2000 --threshold load=20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+from pygazpar import profiling
+from pygazpar.datasource import JsonFileDataSource
+from pygazpar.enum import Frequency
+
+PCE_IDENTIFIER = "22423299474865"
+
+# Peak bytes per daily reading, about twice what was measured on Python 3.11 / pandas 2.
+THRESHOLDS = {
+    "load": 4000,
+    "json_decode": 3000,
+    "consommation_type": 600,
+    "parse_result": 800,
+    "dataframe": 1200,
+    "serialization": 8000
+}
+
+
+def build_dump(template: dict, pce_identifier: str, years: int) -> dict:
+    """Get a consommation dump of consecutive gas days, starting in 2015"""
+    releves = []
+    first_day = date(2015, 1, 1)
+    index = 0
+    for day_index in range(years * 365):
+        day = first_day + timedelta(days=day_index)
+        volume = 1 + day_index % 11
+        releves.append(dict(template,
+                            journeeGaziere=day.isoformat(),
+                            dateDebutReleve=f"{day.isoformat()}T06:00:00+01:00",
+                            dateFinReleve=f"{(day + timedelta(days=1)).isoformat()}T06:00:00+01:00",
+                            indexDebut=index,
+                            indexFin=index + volume,
+                            volumeBrutConsomme=volume,
+                            energieConsomme=round(volume * 11.2)))
+        index += volume
+    return {pce_identifier: {"idPce": pce_identifier, "frequence": None, "releves": releves}}
+
+
+def parse_thresholds(values):
+    """Get the thresholds overridden by the command line"""
+    thresholds = dict(THRESHOLDS)
+    for value in values or []:
+        name, limit = value.split("=")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pces", type=int, default=3, help="Number of PCE")
+    parser.add_argument("--years", type=int, default=3, help="Years of daily readings per PCE")
+    parser.add_argument("--threshold", action="append", help="Override a threshold: <stage>=<bytes per reading>")
+    args = parser.parse_args()
+    thresholds = parse_thresholds(args.threshold)
+
+    with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+        template = json.load(consumption_json_file)[PCE_IDENTIFIER]["releves"][0]
+
+    per_reading = {}
+    with tempfile.TemporaryDirectory() as directory:
+        pce_identifiers = [f"{pce_index:014d}" for pce_index in range(args.pces)]
+        for pce_identifier in pce_identifiers:
+            with open(os.path.join(directory, f"{pce_identifier}.json"), "w") as dump_file:
+                json.dump(build_dump(template, pce_identifier, args.years), dump_file)
+
+        dataSource = JsonFileDataSource(directory, None)
+        frequencies = [Frequency.DAILY, Frequency.WEEKLY, Frequency.MONTHLY, Frequency.YEARLY]
+        # Warm up: lazy imports and one-time caches are not per reading costs.
+        asyncio.run(dataSource.load(pce_identifiers[0], None, None, frequencies))
+        for pce_identifier in pce_identifiers:
+            profiler = profiling.enable(memory=True)
+            try:
+                with profiler.stage("load"):
+                    data = asyncio.run(dataSource.load(pce_identifier, None, None, frequencies))
+                with profiler.stage("serialization"):
+                    json.dumps(data, default=lambda o: o.__dict__)
+            finally:
+                profiling.disable()
+            count = len(data[Frequency.DAILY.value])
+            for name, stats in profiler.stages.items():
+                per_reading[name] = max(per_reading.get(name, 0), stats["peak"] / count)
+
+    print(f"{args.pces} PCE x {args.years} years ({args.years * 365} daily readings per PCE)")
+    print(f"{'stage':<24}{'peak (B/reading)':>18}{'threshold':>12}")
+    failures = []
+    for name, value in per_reading.items():
+        threshold = thresholds.get(name)
+        print(f"{name:<24}{value:>18.0f}{threshold if threshold is not None else '-':>12}")
+        if threshold is not None and value > threshold:
+            failures.append(name)
+
+    if len(failures) > 0:
+        print(f"Over threshold: {', '.join(failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
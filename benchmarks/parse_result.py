@@ -0,0 +1,72 @@
+"""Benchmark of JsonParser.parse_result.
+
+Parse --years years of daily readings (half of them without temperature, joined from the temperature dump)
+for each of --pces PCE, and compare with the former per releve implementation (strptime/strftime and a full
+RelevesResultType construction per releve).
+
+    python benchmarks/parse_result.py --pces 100 --years 10
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from pygazpar.jsonparser import JsonParser, INPUT_DATE_FORMAT, OUTPUT_DATE_FORMAT
+from pygazpar.types.ConsommationType import ConsommationType
+from pygazpar.types.RelevesResultType import RelevesResultType
+
+
+def build_consommation(pce_identifier: str, years: int):
+    """Get a consommation of consecutive gas days starting in 2015, and the temperatures of the odd days"""
+    releves = []
+    temperatures = {}
+    first_day = date(2015, 1, 1)
+    for day_index in range(years * 365):
+        day = (first_day + timedelta(days=day_index)).isoformat()
+        releves.append({"dateDebutReleve": f"{day}T06:00:00+01:00", "dateFinReleve": f"{day}T06:00:00+01:00",
+                        "journeeGaziere": day, "indexDebut": day_index, "indexFin": day_index + 1,
+                        "volumeBrutConsomme": 1, "energieConsomme": 11, "natureReleve": "Informative Journalier",
+                        "qualificationReleve": "Mesuré", "coeffConversion": 11.2,
+                        "temperature": 10.5 if day_index % 2 == 0 else None})
+        if day_index % 2 == 1:
+            temperatures[day] = 5.5
+    return ConsommationType(idPce=pce_identifier, releves=releves, frequence=None), temperatures
+
+
+def reference_parse_result(data, temperatures, pce_identifier):
+    """Former implementation of JsonParser.parse_result"""
+    res = []
+    data_timestamp = datetime.now().isoformat()
+    for releve in data.releves:
+        temperature = releve.temperature
+        if temperature is None and temperatures is not None and len(temperatures) > 0:
+            temperature = temperatures.get(releve.journeeGaziere)
+        res.append(RelevesResultType(datetime.strftime(datetime.strptime(releve.journeeGaziere, INPUT_DATE_FORMAT), OUTPUT_DATE_FORMAT),
+                                     data_timestamp, releve, temperature))
+    return res
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pces", type=int, default=100, help="Number of PCE")
+    parser.add_argument("--years", type=int, default=10, help="Years of daily readings per PCE")
+    args = parser.parse_args()
+
+    inputs = [build_consommation(f"{pce_index:014d}", args.years) for pce_index in range(args.pces)]
+    count = args.pces * args.years * 365
+
+    timings = {}
+    for name, parse in [("reference", reference_parse_result), ("parse_result", JsonParser.parse_result)]:
+        start = time.perf_counter()
+        results = [parse(data, temperatures, data.idPce) for data, temperatures in inputs]
+        timings[name] = time.perf_counter() - start
+        print(f"{name:<16}{timings[name]:>8.2f}s{count / timings[name]:>12.0f} readings/s")
+        del results
+
+    expected = reference_parse_result(*inputs[0], inputs[0][0].idPce)
+    result = JsonParser.parse_result(*inputs[0], inputs[0][0].idPce)
+    assert [{**vars(item), "timestamp": None} for item in result] == [{**vars(item), "timestamp": None} for item in expected]
+    print(f"Speedup: x{timings['reference'] / timings['parse_result']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from pygazpar.enum import PropertyName, Frequency  # noqa: F401
 from pygazpar.client import Client  # noqa: F401
-from pygazpar.datasource import JsonWebDataSource, ExcelFileDataSource, JsonFileDataSource, ExcelWebDataSource, TestDataSource  # noqa: F401
+from pygazpar.fleet import FleetClient  # noqa: F401
+from pygazpar.datasource import JsonWebDataSource, ExcelFileDataSource, ExcelDirectoryDataSource, JsonFileDataSource, ExcelWebDataSource, TestDataSource  # noqa: F401
 from pygazpar.version import __version__  # noqa: F401
@@ -1,5 +1,8 @@
 import argparse
+import cProfile
+import functools
 import json
+import sys
 import traceback
 import os
 import logging
@@ -7,10 +10,128 @@ import asyncio
 from pygazpar.enum import Frequency
 from pygazpar.client import Client
 from pygazpar.datasource import JsonWebDataSource, ExcelWebDataSource, TestDataSource, ExcelFileDataSource
+from pygazpar.daemon import PollingDaemon, JsonDirectorySink
+from pygazpar.export import PartitionedSink
+from pygazpar.runner import ShardedRunner
 from pygazpar.version import __version__  # noqa: F401
+from pygazpar import profiling
+
+async def daemon_main(argv):
+    """Daemon subcommand: poll the PCE of a configuration file forever"""
+    parser = argparse.ArgumentParser(prog="pygazpar daemon")
+    parser.add_argument("--config",
+                        required=True,
+                        help="JSON configuration file (accounts, PCE, intervals)")
+    parser.add_argument("-o", "--output",
+                        required=True,
+                        help="Directory where the results are written")
+    parser.add_argument("--format",
+                        required=False,
+                        default="json",
+                        choices=["json", "csv", "parquet"],
+                        help="json: last result of each PCE in <PCE>.json | csv, parquet: history partitioned by PCE and month")
+    parser.add_argument("-t", "--tmpdir",
+                        required=False,
+                        default="/tmp",
+                        help="tmp directory (default is /tmp)")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.tmpdir):
+        os.mkdir(args.tmpdir)
+
+    logging.basicConfig(filename=f"{args.tmpdir}/pygazpar.log", level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    logging.info(f"PyGazpar {__version__} daemon")
+    logging.info(f"--config {args.config}")
+    logging.info(f"--output {args.output}")
+    logging.info(f"--format {args.format}")
+
+    with open(args.config) as config_file:
+        config = json.load(config_file)
+
+    if args.format == "json":
+        sink = JsonDirectorySink(args.output)
+    else:
+        sink = PartitionedSink(args.output, args.format)
+
+    daemon = PollingDaemon.from_config(config, sink)
+    logging.info(f"Polling {len(daemon.jobs)} PCE")
+    try:
+        await daemon.run()
+    finally:
+        await daemon.close()
+
+
+async def runner_main(argv):
+    """Runner subcommand: load the PCE of a configuration file with one worker process per shard of accounts"""
+    parser = argparse.ArgumentParser(prog="pygazpar runner")
+    parser.add_argument("--config",
+                        required=True,
+                        help="JSON configuration file (accounts, PCE)")
+    parser.add_argument("-o", "--output",
+                        required=True,
+                        help="Directory where the results are written")
+    parser.add_argument("--format",
+                        required=False,
+                        default="json",
+                        choices=["json", "csv", "parquet"],
+                        help="json: last result of each PCE in <PCE>.json | csv, parquet: history partitioned by PCE and month")
+    parser.add_argument("-w", "--workers",
+                        required=False,
+                        type=int,
+                        help="Number of worker processes (default is the number of CPU)")
+    parser.add_argument("--state",
+                        required=False,
+                        help="Directory of the state shared by the workers: tokens (default is <tmpdir>/pygazpar-state)")
+    parser.add_argument("--interval",
+                        required=False,
+                        type=float,
+                        default=0,
+                        help="Run again every INTERVAL seconds (default is 0: run once)")
+    parser.add_argument("-t", "--tmpdir",
+                        required=False,
+                        default="/tmp",
+                        help="tmp directory (default is /tmp)")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.tmpdir):
+        os.mkdir(args.tmpdir)
+
+    logging.basicConfig(filename=f"{args.tmpdir}/pygazpar.log", level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    logging.info(f"PyGazpar {__version__} runner")
+    logging.info(f"--config {args.config}")
+    logging.info(f"--output {args.output}")
+    logging.info(f"--format {args.format}")
+    logging.info(f"--workers {args.workers}")
+
+    with open(args.config) as config_file:
+        config = json.load(config_file)
+
+    if args.format == "json":
+        sink_factory = functools.partial(JsonDirectorySink, args.output)
+    else:
+        sink_factory = functools.partial(PartitionedSink, args.output, args.format)
+
+    state_directory = args.state if args.state is not None else os.path.join(args.tmpdir, "pygazpar-state")
+    runner = ShardedRunner.from_config(config, sink_factory, state_directory, args.workers)
+    while True:
+        report = await asyncio.get_running_loop().run_in_executor(None, runner.run_once)
+        print(report.report(), file=sys.stderr)
+        if args.interval <= 0:
+            return 1 if len(report.failed_shards) > 0 else 0
+        await asyncio.sleep(args.interval)
+
 
 async def main():
     """Main function"""
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        return await daemon_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "runner":
+        return await runner_main(sys.argv[2:])
+
     parser = argparse.ArgumentParser()
     parser.add_argument("-v", "--version",
                         action="version",
@@ -45,6 +166,17 @@ async def main():
                         required=False,
                         default="json",
                         help="Datasource: json | excel | excelweb | test")
+    parser.add_argument("--profile",
+                        required=False,
+                        action="store_true",
+                        help="Report wall time and CPU time per stage on stderr")
+    parser.add_argument("--profile-output",
+                        required=False,
+                        help="Dump cProfile statistics to this file (implies --profile)")
+    parser.add_argument("--profile-memory",
+                        required=False,
+                        action="store_true",
+                        help="Also report peak and retained memory per stage with tracemalloc (implies --profile, slow)")
 
     args = parser.parse_args()
 
@@ -66,25 +198,60 @@ async def main():
     logging.info(f"--frequency {args.frequency}")
     logging.info(f"--lastNDays {args.lastNDays}")
     logging.info(f"--datasource {bool(args.datasource)}")
-    if args.datasource == "json":
-        client = Client(JsonWebDataSource(args.username, args.password))
-    elif args.datasource == "excelweb":
-        client = Client(ExcelWebDataSource(args.username, args.password, args.tmpdir))
-    elif args.datasource == "excel":
-        client = Client(ExcelFileDataSource(args.excelfile))
-    elif args.datasource == "test":
-        client = Client(TestDataSource())
-    else:
-        raise Exception("Invalid datasource: (json | excel | excelweb | test) is expected")
+    logging.info(f"--profile {args.profile}")
+    logging.info(f"--profile-output {args.profile_output}")
+    logging.info(f"--profile-memory {args.profile_memory}")
+
+    profiler = None
+    c_profiler = None
+    if args.profile or args.profile_output or args.profile_memory:
+        profiler = profiling.enable(memory=args.profile_memory)
+    if args.profile_output:
+        c_profiler = cProfile.Profile()
+        c_profiler.enable()
 
+    # Stop cProfile and tracemalloc whatever happens.
     try:
-        data = await client.load_since(args.pce, int(args.lastNDays), [args.frequency])
-    except BaseException:
-        print('An error occured while querying PyGazpar library : %s', traceback.format_exc())
-        return 1
+        if args.datasource == "json":
+            client = Client(JsonWebDataSource(args.username, args.password))
+        elif args.datasource == "excelweb":
+            client = Client(ExcelWebDataSource(args.username, args.password, args.tmpdir))
+        elif args.datasource == "excel":
+            client = Client(ExcelFileDataSource(args.excelfile))
+        elif args.datasource == "test":
+            client = Client(TestDataSource())
+        else:
+            raise Exception("Invalid datasource: (json | excel | excelweb | test) is expected")
+
+        try:
+            data = await client.load_since(args.pce, int(args.lastNDays), [args.frequency])
+        except BaseException:
+            print('An error occured while querying PyGazpar library : %s', traceback.format_exc())
+            return 1
+
+        with profiling.stage("serialization"):
+            output = json.dumps(data, indent=2, default=lambda o: o.__dict__)
+
+        if c_profiler is not None:
+            c_profiler.disable()
+            c_profiler.dump_stats(args.profile_output)
+            logging.info(f"cProfile statistics written to {args.profile_output}")
+        if profiler is not None:
+            report = profiler.report()
+            logging.info(f"Profile:\n{report}")
+            print(report, file=sys.stderr)
+    finally:
+        if c_profiler is not None:
+            c_profiler.disable()
+        profiling.disable()
+
+    print(output)
+
 
-    print(json.dumps(data, indent=2))
+def run():
+    """Console script entry point: exit with the status returned by main"""
+    sys.exit(asyncio.run(main()))
 
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    run()
@@ -0,0 +1,176 @@
+"""Support for incremental aggregation."""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+from dateutil.relativedelta import relativedelta
+from pygazpar.enum import Frequency, NatureReleve, QualificationReleve
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.gasday import GasDayCalendar
+from pygazpar.types.RelevesResultType import RelevesResultType
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class IncrementalAggregator:
+    """Keep running weekly, monthly or yearly aggregates of daily readings.
+
+    update() only processes gas days after the last one already aggregated, so the cost of a poll
+    depends on the number of new days, not on the history length. Corrections of already aggregated
+    days are ignored: call reset() and replay the history to take them into account.
+    The periods are the same as FrequencyConverter.compute_weekly/monthly/yearly. They are kept in
+    chronological order (days only come in order) and only the max_periods last ones are kept.
+    """
+    MIN_DAY_COUNT = {
+        Frequency.WEEKLY: 7,
+        Frequency.MONTHLY: 28,
+        Frequency.YEARLY: 360
+    }
+
+    # About ten years of history.
+    DEFAULT_MAX_PERIODS = {
+        Frequency.WEEKLY: 530,
+        Frequency.MONTHLY: 120,
+        Frequency.YEARLY: 10
+    }
+
+    def __init__(self, frequency: Frequency, max_periods: Optional[int] = None):
+        if frequency not in IncrementalAggregator.MIN_DAY_COUNT:
+            raise ValueError(f"Unsupported frequency: {frequency}")
+        self.frequency = frequency
+        self.max_periods = max_periods if max_periods is not None else IncrementalAggregator.DEFAULT_MAX_PERIODS[frequency]
+        self.last_day: Optional[str] = None
+        self._periods: Dict[str, Dict[str, Any]] = {}
+        # Readings of the periods, built again only when their period changes.
+        self.__releves: Dict[str, RelevesResultType] = {}
+
+    # ------------------------------------------------------
+    def update(self, daily: List[RelevesResultType]) -> List[str]:
+        '''Add the new gas days and get the keys of the periods which have changed'''
+        changed = []
+        skipped = 0
+        for releve in daily:
+            if releve.journeeGaziere is None or (self.last_day is not None and releve.journeeGaziere <= self.last_day):
+                skipped += 1
+                continue
+
+            key = FrequencyConverter.period_key(self.frequency, releve.journeeGaziere)
+            period = self._periods.get(key)
+            if period is None:
+                period = {
+                    "first_day": releve.journeeGaziere,
+                    "indexDebut": None,
+                    "indexFin": None,
+                    "volumeBrutConsomme": 0.0,
+                    "energieConsomme": 0.0,
+                    "temperature_sum": 0.0,
+                    "temperature_count": 0,
+                    "count": 0,
+                    "timestamp": releve.timestamp
+                }
+                self._periods[key] = period
+                self.__evict()
+            if releve.indexDebut is not None:
+                period["indexDebut"] = releve.indexDebut if period["indexDebut"] is None else min(period["indexDebut"], releve.indexDebut)
+            if releve.indexFin is not None:
+                period["indexFin"] = releve.indexFin if period["indexFin"] is None else max(period["indexFin"], releve.indexFin)
+            period["volumeBrutConsomme"] += releve.volumeBrutConsomme or 0
+            period["energieConsomme"] += releve.energieConsomme or 0
+            if releve.temperature is not None:
+                period["temperature_sum"] += float(releve.temperature)
+                period["temperature_count"] += 1
+            if releve.energieConsomme is not None:
+                # Same day count as FrequencyConverter (days with an energy).
+                period["count"] += 1
+            period["timestamp"] = min(period["timestamp"], releve.timestamp)
+            if len(changed) == 0 or changed[-1] != key:
+                changed.append(key)
+                self.__releves.pop(key, None)
+            self.last_day = releve.journeeGaziere
+
+        if skipped > 0:
+            Logger.debug(f"{skipped} gas days already aggregated have been skipped")
+
+        return changed
+
+    # ------------------------------------------------------
+    def __evict(self) -> None:
+        while len(self._periods) > self.max_periods:
+            key = next(iter(self._periods))
+            del self._periods[key]
+            self.__releves.pop(key, None)
+
+    # ------------------------------------------------------
+    def periods(self) -> List[RelevesResultType]:
+        '''Get the aggregated periods (full periods and the last one), as copies'''
+        min_count = IncrementalAggregator.MIN_DAY_COUNT[self.frequency]
+        last_key = next(reversed(self._periods), None)
+        res = []
+        for key, period in self._periods.items():
+            if period["count"] >= min_count or key == last_key:
+                releve = self.__releves.get(key)
+                if releve is None:
+                    releve = self.__releves[key] = self.__to_releve(key)
+                res.append(RelevesResultType.from_releve(releve.time_period, releve.timestamp, releve))
+        return res
+
+    # ------------------------------------------------------
+    def __to_releve(self, key: str) -> RelevesResultType:
+        period = self._periods[key]
+        first_day = datetime.strptime(period["first_day"], FrequencyConverter.INPUT_DATE_FORMAT)
+
+        if self.frequency == Frequency.WEEKLY:
+            start_week = datetime.strptime(key, FrequencyConverter.INPUT_DATE_FORMAT)
+            end_week = start_week + timedelta(days=6)
+            time_period = f"Du {start_week.strftime(FrequencyConverter.OUTPUT_DATE_FORMAT)} au {end_week.strftime(FrequencyConverter.OUTPUT_DATE_FORMAT)}"
+            start = start_week.date()
+            end = end_week.date() + timedelta(days=1)
+        elif self.frequency == Frequency.MONTHLY:
+            time_period = f"{FrequencyConverter.MONTHS[first_day.month - 1]} {first_day.year}"
+            start = first_day.date().replace(day=1)
+            end = start + relativedelta(months=1)
+        else:
+            time_period = str(first_day.year)
+            start = first_day.date().replace(month=1, day=1)
+            end = start + relativedelta(years=1)
+
+        temperature = period["temperature_sum"] / period["temperature_count"] if period["temperature_count"] > 0 else None
+
+        return RelevesResultType(time_period=time_period,
+                                 timestamp=period["timestamp"],
+                                 temperature=temperature,
+                                 dateDebutReleve=GasDayCalendar.start(start),
+                                 dateFinReleve=GasDayCalendar.start(end),
+                                 indexDebut=period["indexDebut"],
+                                 indexFin=period["indexFin"],
+                                 volumeBrutConsomme=period["volumeBrutConsomme"],
+                                 energieConsomme=period["energieConsomme"],
+                                 natureReleve=NatureReleve.INFORMATIVES.value,
+                                 qualificationReleve=QualificationReleve.ESTIME.value)
+
+    # ------------------------------------------------------
+    def reset(self) -> None:
+        '''Forget all aggregated days'''
+        self.last_day = None
+        self._periods.clear()
+        self.__releves.clear()
+
+    # ------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        '''Serialize the state (JSON compatible)'''
+        return {
+            "frequency": self.frequency.value,
+            "max_periods": self.max_periods,
+            "last_day": self.last_day,
+            "periods": {key: dict(period) for key, period in self._periods.items()}
+        }
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_dict(state: Dict[str, Any]) -> IncrementalAggregator:
+        '''Restore an aggregator serialized with to_dict'''
+        aggregator = IncrementalAggregator(Frequency(state["frequency"]), state.get("max_periods"))
+        aggregator.last_day = state["last_day"]
+        aggregator._periods = {key: dict(period) for key, period in state["periods"].items()}
+        return aggregator
@@ -26,6 +26,7 @@ class GazparAuth:
         session=self._session,
         method="post",
         url=SESSION_TOKEN_URL,
+        endpoint="auth_session",
         headers={"Content-type": "application/json", "domain":"grdf.fr","X-Requested-With": "XMLHttpRequest"},
         data={"username": self.__username,"password": self.__password,"options":
               {"multiOptionalFactorEnroll": "false","warnBeforePasswordExpired": "false"}},
@@ -40,6 +41,7 @@ class GazparAuth:
             session=self._session,
             method="get",
             url=AUTH_TOKEN_URL,
+            endpoint="auth_token",
             headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
             params={"checkAccountSetupComplete": "true","token": session_token,"redirectUrl": "https://monespace.grdf.fr"},
 
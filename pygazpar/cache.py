@@ -0,0 +1,198 @@
+"""Support for Caches."""
+from __future__ import annotations
+from typing import IO, Any, Dict, Hashable, Iterable, List, Optional, Set
+from collections import OrderedDict
+from datetime import date, timedelta
+import hashlib
+import json
+import logging
+import os
+import time
+from pygazpar.columns import DailyReleves
+
+DEFAULT_PAYLOAD_CACHE_SIZE = 64
+DEFAULT_TEMPERATURE_SETTLING_DAYS = 3
+DEFAULT_TOKEN_TTL = 3600
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PayloadCache:
+    """Bounded LRU cache of parsed results.
+
+    Entries are keyed by request (PCE, range, frequency...) and only served back when the digest
+    of the new raw payload equals the digest stored with them. Values are copied in and out, down to
+    the readings, so a caller changing its result does not change the next ones.
+    """
+    def __init__(self, max_entries: int = DEFAULT_PAYLOAD_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------
+    @staticmethod
+    def digest(*payloads: bytes) -> str:
+        '''Hash one or several raw payloads'''
+        sha = hashlib.sha256()
+        for payload in payloads:
+            sha.update(len(payload).to_bytes(8, "big"))
+            sha.update(payload)
+        return sha.hexdigest()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def digest_file(payload: IO[bytes], size: int, chunk_size: int = 64 * 1024) -> str:
+        '''Hash a raw payload held in a file object, same result as digest(payload bytes)'''
+        sha = hashlib.sha256()
+        sha.update(size.to_bytes(8, "big"))
+        payload.seek(0)
+        for chunk in iter(lambda: payload.read(chunk_size), b""):
+            sha.update(chunk)
+        payload.seek(0)
+        return sha.hexdigest()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __copy_object(item: Any) -> Any:
+        # Much faster than copy.copy for the readings (plain attributes).
+        if not hasattr(item, "__dict__"):
+            return item
+        copied = item.__class__.__new__(item.__class__)
+        copied.__dict__.update(item.__dict__)
+        return copied
+
+    # ------------------------------------------------------
+    @staticmethod
+    def copy_value(value: Any) -> Any:
+        '''Copy a parsed result: dictionaries and lists are copied, and so are the readings they hold'''
+        if isinstance(value, dict):
+            return {key: PayloadCache.copy_value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            items = [PayloadCache.copy_value(item) if isinstance(item, (dict, list)) else PayloadCache.__copy_object(item) for item in value]
+            # The columns are never changed in place: the copy shares them.
+            return DailyReleves(items, value.columns) if isinstance(value, DailyReleves) else items
+        return value
+
+    # ------------------------------------------------------
+    def get(self, key: Hashable, digest: str) -> Optional[Any]:
+        '''Get the cached value if it has been parsed from the same payload'''
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != digest:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        Logger.debug(f"Payload unchanged for {key}, reusing the parsed result")
+        return PayloadCache.copy_value(entry[1])
+
+    # ------------------------------------------------------
+    def put(self, key: Hashable, digest: str, value: Any) -> None:
+        '''Store the value parsed from the payload with the given digest'''
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (digest, PayloadCache.copy_value(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ------------------------------------------------------
+    def clear(self) -> None:
+        '''Remove all entries'''
+        self._entries.clear()
+
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TemperatureCache:
+    """Per PCE history of daily temperatures.
+
+    Past temperatures never change, so a gas day is covered once it has been requested, except for the
+    last settling_days days which may still be published later by GrDF.
+    """
+    def __init__(self, settling_days: int = DEFAULT_TEMPERATURE_SETTLING_DAYS):
+        self.settling_days = settling_days
+        self._temperatures: Dict[str, Dict[str, Any]] = {}
+        self._covered: Dict[str, Set[str]] = {}
+
+    # ------------------------------------------------------
+    def get(self, pce_identifier: str) -> Dict[str, Any]:
+        '''Get the known temperatures of a PCE by gas day (YYYY-MM-DD)'''
+        return self._temperatures.setdefault(pce_identifier, {})
+
+    # ------------------------------------------------------
+    def missing_days(self, pce_identifier: str, days: Iterable[str]) -> List[str]:
+        '''Get the sorted gas days which have never been requested'''
+        temperatures = self._temperatures.get(pce_identifier, {})
+        covered = self._covered.get(pce_identifier, set())
+        return sorted({day for day in days if day not in temperatures and day not in covered})
+
+    # ------------------------------------------------------
+    def update(self, pce_identifier: str, first_day: date, last_day: date, temperatures: Dict[str, Any],
+               today: Optional[date] = None) -> None:
+        '''Store the temperatures returned for the requested days'''
+        known = self.get(pce_identifier)
+        for day, temperature in temperatures.items():
+            if temperature is not None:
+                known[day] = temperature
+
+        settled = (today or date.today()) - timedelta(days=self.settling_days)
+        covered = self._covered.setdefault(pce_identifier, set())
+        day = first_day
+        while day <= min(last_day, settled):
+            covered.add(day.isoformat())
+            day += timedelta(days=1)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class TokenStore:
+    """Auth tokens of many accounts kept in a local directory, shared by processes.
+
+    One file per account, replaced atomically, so readers of other processes never see a partial token.
+    A token older than ttl is ignored: the account logs in again.
+    Tokens are credentials: the directory is private to the user (0o700) and so are the files (0o600).
+    """
+    def __init__(self, directory: str, ttl: float = DEFAULT_TOKEN_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Also restrict a directory created before (or by another tool).
+        os.chmod(directory, 0o700)
+
+    # ------------------------------------------------------
+    def __filename(self, username: str) -> str:
+        # Usernames are emails: hash them into a safe file name.
+        return os.path.join(self.directory, hashlib.sha256(username.encode()).hexdigest()[:32] + ".json")
+
+    # ------------------------------------------------------
+    def get(self, username: str) -> Optional[str]:
+        '''Get the token of an account, None when unknown or too old'''
+        try:
+            with open(self.__filename(username)) as token_file:
+                entry = json.load(token_file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["saved_at"] >= self.ttl:
+            return None
+        return entry["token"]
+
+    # ------------------------------------------------------
+    def put(self, username: str, token: str) -> None:
+        '''Store the token of an account'''
+        filename = self.__filename(username)
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        with os.fdopen(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as token_file:
+            json.dump({"token": token, "saved_at": time.time()}, token_file)
+        os.replace(temporary, filename)
+
+    # ------------------------------------------------------
+    def invalidate(self, username: str) -> None:
+        '''Forget the token of an account'''
+        try:
+            os.remove(self.__filename(username))
+        except FileNotFoundError:
+            pass
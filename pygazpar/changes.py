@@ -0,0 +1,88 @@
+"""Support for changes since the last poll."""
+from __future__ import annotations
+from typing import Any, Dict, Optional, Tuple
+import logging
+import uuid
+from pygazpar.datasource import MeterReadingsByFrequency
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ChangeTracker:
+    """Snapshot of the last readings returned for each PCE, to return only what changed since.
+
+    A reading is identified by its frequency and time period and compared on all its values except its
+    fetch timestamp. Each diff gives a new cursor: a caller passing back the last cursor of a PCE gets the
+    new and modified readings only, any other cursor (None, older, from another tracker) gets everything.
+    Only the last snapshot of each PCE is kept, in memory.
+    """
+    def __init__(self):
+        # Cursors of another tracker (or of a restarted process) never match.
+        self.__epoch = uuid.uuid4().hex[:12]
+        self.__generation = 0
+        self._generations: Dict[str, int] = {}
+        self._snapshots: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    # ------------------------------------------------------
+    @staticmethod
+    def period(releve: Any) -> str:
+        '''Get the identity of a reading within its frequency'''
+        if isinstance(releve, dict):
+            return str(releve.get("time_period"))
+        return str(releve.time_period)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def fingerprint(releve: Any) -> int:
+        '''Get a hash of the values of a reading, the fetch timestamp excluded'''
+        values = releve if isinstance(releve, dict) else vars(releve)
+        # repr() makes NaN equal to NaN and Enum values comparable.
+        return hash(repr(sorted((name, value) for name, value in values.items() if name != "timestamp")))
+
+    # ------------------------------------------------------
+    def cursor(self, pce_identifier: str) -> Optional[str]:
+        '''Get the current cursor of a PCE, None before its first diff'''
+        generation = self._generations.get(pce_identifier)
+        if generation is None:
+            return None
+        return f"{self.__epoch}:{generation}"
+
+    # ------------------------------------------------------
+    def diff(self, pce_identifier: str, data: MeterReadingsByFrequency,
+             cursor: Optional[str] = None) -> Tuple[MeterReadingsByFrequency, str]:
+        '''Get the readings new or modified since cursor and the next cursor, then keep data as the snapshot'''
+        full = cursor is None or cursor != self.cursor(pce_identifier)
+        if full and cursor is not None:
+            Logger.debug(f"Unknown cursor {cursor} for PCE {pce_identifier}, returning all readings")
+        previous = self._snapshots.get(pce_identifier, {})
+
+        changes: MeterReadingsByFrequency = {}
+        # Frequencies not loaded this time keep their previous snapshot.
+        snapshot: Dict[str, Dict[str, int]] = dict(previous)
+        for frequency, releves in data.items():
+            known = previous.get(frequency, {})
+            fingerprints = snapshot[frequency] = {}
+            changed = changes[frequency] = []
+            for releve in releves:
+                period = ChangeTracker.period(releve)
+                fingerprint = ChangeTracker.fingerprint(releve)
+                fingerprints[period] = fingerprint
+                if full or known.get(period) != fingerprint:
+                    changed.append(releve)
+
+        self._snapshots[pce_identifier] = snapshot
+        # Never reused, even after forget(): an old cursor can not match a newer snapshot.
+        self.__generation += 1
+        self._generations[pce_identifier] = self.__generation
+        return changes, self.cursor(pce_identifier)  # type: ignore
+
+    # ------------------------------------------------------
+    def forget(self, pce_identifier: Optional[str] = None) -> None:
+        '''Drop the snapshot of a PCE (all PCE by default): its next diff returns everything'''
+        if pce_identifier is None:
+            self._snapshots.clear()
+            self._generations.clear()
+        else:
+            self._snapshots.pop(pce_identifier, None)
+            self._generations.pop(pce_identifier, None)
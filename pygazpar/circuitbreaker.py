@@ -0,0 +1,129 @@
+"""Support for circuit breaker."""
+from __future__ import annotations
+from typing import Any, Dict
+import logging
+import time
+from pygazpar.exceptions import CircuitOpenError
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 60.0
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class CircuitBreaker:
+    """Fail fast on an endpoint family while the upstream is unhealthy.
+
+    closed: requests go through, failure_threshold consecutive failures open the circuit.
+    open: requests fail with CircuitOpenError until cooldown seconds have elapsed.
+    half_open: one probe request goes through, a success closes the circuit, a failure opens it again.
+    """
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+        self.rejected = 0
+
+    # ------------------------------------------------------
+    def before_call(self) -> bool:
+        '''Raise CircuitOpenError if the request must not be sent, else get whether the request is the half open probe'''
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:  # type: ignore
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit '{self.name}' is open: failing fast")
+            Logger.info(f"Circuit '{self.name}' is half open: probing")
+            self.state = STATE_HALF_OPEN
+        if self.state == STATE_HALF_OPEN:
+            if self.probing:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit '{self.name}' is half open: a probe is running")
+            self.probing = True
+            return True
+        return False
+
+    # ------------------------------------------------------
+    def record_success(self) -> None:
+        '''Record a request which reached a healthy upstream'''
+        if self.state != STATE_CLOSED:
+            Logger.info(f"Circuit '{self.name}' is closed")
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.probing = False
+
+    # ------------------------------------------------------
+    def record_failure(self) -> None:
+        '''Record a request which failed because of the upstream'''
+        self.failures += 1
+        self.probing = False
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                Logger.warning(f"Circuit '{self.name}' is open after {self.failures} failure(s)")
+            self.state = STATE_OPEN
+            self.opened_at = time.monotonic()
+
+    # ------------------------------------------------------
+    def release(self) -> None:
+        '''End a request which says nothing about the upstream health'''
+        self.probing = False
+
+    # ------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        '''Get the state for monitoring'''
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "open_for": time.monotonic() - self.opened_at if self.state != STATE_CLOSED and self.opened_at is not None else None
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_settings: Dict[str, Any] = {"failure_threshold": DEFAULT_FAILURE_THRESHOLD, "cooldown": DEFAULT_COOLDOWN}
+
+
+# ------------------------------------------------------
+def endpoint_family(endpoint: str) -> str:
+    '''Get the family of an endpoint name (auth_token -> auth, pce_meteo -> pce)'''
+    return endpoint.split("_")[0]
+
+
+# ------------------------------------------------------
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    '''Get the circuit breaker of the family of an endpoint'''
+    family = endpoint_family(endpoint)
+    breaker = _breakers.get(family)
+    if breaker is None:
+        breaker = CircuitBreaker(family, **_settings)
+        _breakers[family] = breaker
+    return breaker
+
+
+# ------------------------------------------------------
+def configure(failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN) -> None:
+    '''Set the thresholds of every circuit breaker'''
+    _settings["failure_threshold"] = failure_threshold
+    _settings["cooldown"] = cooldown
+    for breaker in _breakers.values():
+        breaker.failure_threshold = failure_threshold
+        breaker.cooldown = cooldown
+
+
+# ------------------------------------------------------
+def states() -> Dict[str, Dict[str, Any]]:
+    '''Get the state of every circuit breaker by endpoint family'''
+    return {family: breaker.snapshot() for family, breaker in _breakers.items()}
+
+
+# ------------------------------------------------------
+def reset() -> None:
+    '''Close every circuit breaker'''
+    _breakers.clear()
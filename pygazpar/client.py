@@ -1,11 +1,17 @@
 """Support for API Methods."""
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import logging
 from datetime import date, timedelta
 from pygazpar.enum import Frequency
+from pygazpar.changes import ChangeTracker
 from pygazpar.datasource import IDataSource, MeterReadingsByFrequency
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.registry import PceRegistry, DEFAULT_PCE_TTL, DEFAULT_PCE_CONCURRENCY
+from pygazpar.types.PceType import PceType
+from pygazpar.types.RelevesResultType import RelevesResultType
 
 DEFAULT_LAST_N_DAYS = 365
+DEFAULT_WINDOW_DAYS = 30
 Logger = logging.getLogger(__name__)
 
 
@@ -13,8 +19,11 @@ Logger = logging.getLogger(__name__)
 class Client:
     '''Get the API Client'''
     # ------------------------------------------------------
-    def __init__(self, datasource: IDataSource):
+    def __init__(self, datasource: IDataSource, pce_ttl: float = DEFAULT_PCE_TTL,
+                 pce_max_concurrency: int = DEFAULT_PCE_CONCURRENCY):
         self.__datasource = datasource
+        self.__registry = PceRegistry(datasource, pce_ttl, pce_max_concurrency)
+        self.__changes = ChangeTracker()
 
     async def async_login(self):
         '''Try to log in'''
@@ -51,6 +60,80 @@ class Client:
             raise
 
         return res
+
+    # ------------------------------------------------------
+    async def load_changes(self, pce_identifier: str, cursor: Optional[str] = None,
+                           last_n_days: int = DEFAULT_LAST_N_DAYS,
+                           frequencies: Optional[List[Frequency]] = None) -> Tuple[MeterReadingsByFrequency, str]:
+        '''Load data since last N days and get only the readings new or modified since cursor, with the next cursor.
+
+        Pass None the first time, then the cursor returned by the previous call. An unknown or outdated
+        cursor gets all the readings, like load_since.
+        '''
+        res = await self.load_since(pce_identifier, last_n_days, frequencies)
+        changes, next_cursor = self.__changes.diff(pce_identifier, res, cursor)
+        Logger.debug(f"{sum(len(releves) for releves in changes.values())} readings changed since cursor {cursor}")
+        return changes, next_cursor
+
+    # ------------------------------------------------------
+    async def iter_releves(self, pce_identifier: str, start_date: date, end_date: date,
+                           frequencies: Optional[List[Frequency]] = None,
+                           window_days: int = DEFAULT_WINDOW_DAYS) -> AsyncIterator[Tuple[Frequency, RelevesResultType]]:
+        '''Stream data between two dates window by window.
+
+        Daily readings are yielded as soon as their window is loaded, weekly/monthly/yearly
+        periods as soon as the first day of the next period has been received (or at the end).
+        '''
+        compute_by_frequency = {
+            Frequency.WEEKLY: FrequencyConverter.compute_weekly,
+            Frequency.MONTHLY: FrequencyConverter.compute_monthly,
+            Frequency.YEARLY: FrequencyConverter.compute_yearly
+        }
+
+        if frequencies is None:
+            # Transform Enum in List.
+            frequency_list = [frequency for frequency in Frequency]
+        else:
+            # Get unique values.
+            frequency_list = list(dict.fromkeys(frequencies))
+
+        # Daily readings of the period currently being filled, by frequency.
+        pending = {frequency: [] for frequency in frequency_list if frequency in compute_by_frequency}
+
+        window_start = start_date
+        while window_start <= end_date:
+            window_end = min(window_start + timedelta(days=window_days - 1), end_date)
+            Logger.debug(f"Start loading the data from {window_start} to {window_end}...")
+            try:
+                data = await self.__datasource.load(pce_identifier, window_start, window_end, [Frequency.DAILY])
+            except Exception:
+                Logger.error("An unexpected error occured while loading the data", exc_info=True)
+                raise
+
+            for releve in data.get(Frequency.DAILY.value, []):
+                if Frequency.DAILY in frequency_list:
+                    yield Frequency.DAILY, releve
+                if releve.journeeGaziere is None:
+                    # Published period (merge_published): it has no gas day to aggregate.
+                    continue
+                for frequency, buffer in pending.items():
+                    period_key = FrequencyConverter.period_key(frequency, releve.journeeGaziere)
+                    if len(buffer) > 0 and FrequencyConverter.period_key(frequency, buffer[-1].journeeGaziere) != period_key:
+                        # The previous period is complete.
+                        for period in compute_by_frequency[frequency](buffer):
+                            yield frequency, period
+                        buffer.clear()
+                    buffer.append(releve)
+
+            window_start = window_end + timedelta(days=1)
+
+        # Flush the last (possibly partial) periods.
+        for frequency, buffer in pending.items():
+            if len(buffer) > 0:
+                for period in compute_by_frequency[frequency](buffer):
+                    yield frequency, period
+
+    # ------------------------------------------------------
     async def load_list_pce(self):
         '''Load data since last N days'''
         try:
@@ -59,3 +142,26 @@ class Client:
             Logger.error("An unexpected error occured while loading the data", exc_info=True)
             raise
         return res
+
+    # ------------------------------------------------------
+    async def load_pce_registry(self, with_details: bool = False, force: bool = False) -> Dict[str, PceType]:
+        '''Load the PCE of the account (cached), with their details if requested'''
+        try:
+            if with_details:
+                res = await self.__registry.all_details(force)
+            else:
+                res = {pce.pce: pce for pce in await self.__registry.list(force)}
+        except Exception:
+            Logger.error("An unexpected error occured while loading the PCE", exc_info=True)
+            raise
+        return res
+
+    # ------------------------------------------------------
+    async def load_pce_details(self, pce_identifier: str, force: bool = False) -> PceType:
+        '''Load the details of one PCE (cached)'''
+        try:
+            res = await self.__registry.details(pce_identifier, force)
+        except Exception:
+            Logger.error("An unexpected error occured while loading the PCE details", exc_info=True)
+            raise
+        return res
@@ -0,0 +1,124 @@
+"""Support for typed daily columns."""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+from array import array
+import logging
+import math
+import numpy as np
+import pandas as pd
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class DailyColumns:
+    """Column buffers of the daily readings used by the frequency converters.
+
+    Numbers go to float64 arrays (None as NaN), so the DataFrame is built from the buffers without any
+    per row dictionary or dtype inference. Like pandas inference, a column with only int values and no
+    missing value is an int64 column.
+    """
+    NUMBERS = ["indexDebut", "indexFin", "volumeBrutConsomme", "energieConsomme", "temperature"]
+
+    def __init__(self):
+        self.days: List[str] = []
+        self.numbers: Dict[str, array] = {name: array("d") for name in DailyColumns.NUMBERS}
+        self.timestamps: List[str] = []
+        self.__integral = {name: True for name in DailyColumns.NUMBERS}
+
+    # ------------------------------------------------------
+    def append(self, journee_gaziere: str, timestamp: str, **numbers: Any) -> None:
+        '''Add a daily reading: its gas day (YYYY-MM-DD), its timestamp and the NUMBERS values'''
+        self.days.append(journee_gaziere)
+        self.timestamps.append(timestamp)
+        for name, buffer in self.numbers.items():
+            value = numbers.get(name)
+            if value is None:
+                buffer.append(math.nan)
+                self.__integral[name] = False
+            else:
+                if self.__integral[name] and type(value) is not int:  # pylint: disable=unidiomatic-typecheck
+                    self.__integral[name] = False
+                buffer.append(float(value))
+
+    # ------------------------------------------------------
+    def extend(self, journee_gazieres: List[str], timestamps: List[str], **numbers: List[Any]) -> None:
+        '''Add daily readings column by column: the NUMBERS lists have one value per gas day'''
+        self.days.extend(journee_gazieres)
+        self.timestamps.extend(timestamps)
+        for name, buffer in self.numbers.items():
+            values = numbers.get(name)
+            if values is None:
+                values = [None] * len(journee_gazieres)
+            if self.__integral[name] and not all(type(value) is int for value in values):  # pylint: disable=unidiomatic-typecheck
+                self.__integral[name] = False
+            buffer.extend([math.nan if value is None else float(value) for value in values])
+
+    # ------------------------------------------------------
+    def append_releve(self, releve: Any) -> None:
+        '''Add a daily reading from its RelevesResultType'''
+        self.append(releve.journeeGaziere, releve.timestamp,
+                    indexDebut=releve.indexDebut, indexFin=releve.indexFin,
+                    volumeBrutConsomme=releve.volumeBrutConsomme, energieConsomme=releve.energieConsomme,
+                    temperature=releve.temperature)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_releves(releves: Iterable[Any]) -> DailyColumns:
+        '''Get the columns of RelevesResultType daily readings'''
+        columns = DailyColumns()
+        for releve in releves:
+            columns.append_releve(releve)
+        return columns
+
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.days)
+
+    # ------------------------------------------------------
+    def to_frame(self) -> pd.DataFrame:
+        '''Build the DataFrame: journeeGaziere as datetime64, numbers as float64 (int64 when all int), timestamp as object'''
+        data: Dict[str, Any] = {"journeeGaziere": np.array(self.days, dtype="datetime64[D]").astype("datetime64[ns]")}
+        for name, buffer in self.numbers.items():
+            values = np.frombuffer(buffer, dtype=np.float64) if len(buffer) > 0 else np.empty(0, dtype=np.float64)
+            data[name] = values.astype(np.int64) if self.__integral[name] and len(buffer) > 0 else values
+        data["timestamp"] = np.array(self.timestamps, dtype=object)
+        return pd.DataFrame(data, copy=False)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class DailyReleves(list):
+    """List of daily RelevesResultType carrying the DailyColumns filled by the parser.
+
+    Any change to the list drops the columns, the converters then rebuild them from the readings.
+    Changing the attributes of a reading in place is not detected: replace the reading instead.
+    """
+    def __init__(self, releves: Iterable[Any] = (), columns: Optional[DailyColumns] = None):
+        super().__init__(releves)
+        self.columns = columns
+
+    # ------------------------------------------------------
+    def columns_or_none(self) -> Optional[DailyColumns]:
+        '''Get the columns when they still match the readings'''
+        if self.columns is not None and len(self.columns) == len(self):
+            return self.columns
+        return None
+
+    def __reduce_ex__(self, protocol):
+        # Keep the columns through pickle (process pools).
+        return (DailyReleves, (list(self), self.columns))
+
+
+def _dropping_columns(name: str):
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kwargs):
+        self.columns = None
+        return method(self, *args, **kwargs)
+
+    mutate.__name__ = name
+    return mutate
+
+
+for _name in ["append", "extend", "insert", "pop", "remove", "clear", "sort", "reverse", "__setitem__", "__delitem__", "__iadd__", "__imul__"]:
+    setattr(DailyReleves, _name, _dropping_columns(_name))
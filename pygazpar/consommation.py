@@ -1,46 +1,79 @@
 """Support for Consommation Methods."""
 from __future__ import annotations
 from typing import  Dict, Any
+import json
+import logging
 import aiohttp
-from pygazpar.helpers import _api_wrapper
+from pygazpar.helpers import _api_wrapper, _download
+from pygazpar import profiling
 from pygazpar.types.ConsommationType import ConsommationType
 from pygazpar.enum import ConsommationRole,Frequency
 from .exceptions import ClientError
 
 BASE_URL="https://monespace.grdf.fr/api/e-conso/pce/consommation/"
+
+Logger = logging.getLogger(__name__)
+
 class  GazparConsommation:
      '''Get the consommation JSON or File from the API'''
      # ------------------------------------------------------
      def __init__(self, session: aiohttp.ClientSession):
         self._session = session
      # ------------------------------------------------------
-     async def get_consommation(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole) -> ConsommationType:
+     async def get_consommation(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole,attempt:int=1) -> ConsommationType:
           '''Get the consommation from the API'''
+          payload=await self.get_consommation_payload(pce,date_debut,date_fin,type_conso,attempt)
+          return self.parse_consommation(payload,pce)
+     # ------------------------------------------------------
+     @staticmethod
+     def parse_consommation(payload:bytes,pce:str) -> ConsommationType:
+          '''Build the consommation from the raw API payload'''
+          with profiling.stage("json_decode"):
+               raw=json.loads(payload)[pce]
+          with profiling.stage("consommation_type"):
+               return ConsommationType(**raw)
+     # ------------------------------------------------------
+     async def get_consommation_payload(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole,attempt:int=1) -> bytes:
+          '''Get the raw consommation JSON payload from the API'''
           response=await _api_wrapper(
           session=self._session,
           method="get",
           url=BASE_URL+type_conso.value,
+          endpoint="consommation",
+          pce=pce,
+          attempt=attempt,
           headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
           params={"dateDebut":date_debut,"dateFin":date_fin,"pceList[0]":pce}
           )
           if response.content_type=="application/json":
-               responsejson=await response.json()
+               return await response.read()
           else: 
                raise ClientError("Invalid response from server")
-          return ConsommationType(**responsejson[pce])
      # ------------------------------------------------------
-     async def get_consommation_file(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole,frequency:Frequency) -> Dict[str, Any]:
-          '''Get the consommation file from the API'''
+     async def get_consommation_file(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole,frequency:Frequency,attempt:int=1) -> Dict[str, Any]:
+          '''Get the consommation file from the API ("content" is the bytes of the file)'''
+          response=await self.stream_consommation_file(pce,date_debut,date_fin,type_conso,frequency,attempt)
+          with response["content"] as content:
+               return {"filename":response["filename"],"content":content.read()}
+     # ------------------------------------------------------
+     async def stream_consommation_file(self,pce:str,date_debut:str,date_fin:str,type_conso:ConsommationRole,frequency:Frequency,attempt:int=1) -> Dict[str, Any]:
+          '''Download the consommation file from the API by chunks ("content" is a file object to close, "size" its bytes)'''
           response=await _api_wrapper(
           session=self._session,
           method="get",
           url=BASE_URL+type_conso.value+"/telecharger",
+          endpoint="consommation_file",
+          pce=pce,
+          attempt=attempt,
           headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
           params={"dateDebut":date_debut,"dateFin":date_fin,"pceList[0]":pce,"frequence":frequency.value}
           )
           if response.content_type=="text/html":
+               response.release()
                raise ClientError("Invalid response from server")
           else:
                filename = response.headers["Content-Disposition"].split("filename=")[1]
-               filecontent = await response.content()
-               return {"filename":filename,"content":filecontent}
+               # In memory, or on disk for large exports.
+               filecontent, size = await _download(response)
+               Logger.debug(f"Consommation file {filename} downloaded: {size} bytes")
+               return {"filename":filename,"content":filecontent,"size":size}
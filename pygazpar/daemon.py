@@ -0,0 +1,203 @@
+"""Support for the polling daemon."""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+from abc import ABC, abstractmethod
+import asyncio
+import heapq
+import json
+import logging
+import os
+import random
+import re
+import time
+from pygazpar.client import Client, DEFAULT_LAST_N_DAYS
+from pygazpar.datasource import IDataSource, JsonWebDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.exceptions import ClientAuthenticationError
+
+DEFAULT_POLL_INTERVAL = 3600
+DEFAULT_CONCURRENCY = 16
+DEFAULT_JITTER = 0.1
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class IResultSink(ABC):
+    '''Base class of the daemon outputs'''
+    @abstractmethod
+    async def write(self, username: str, pce_identifier: str, data: MeterReadingsByFrequency) -> None:
+        '''Write the result of one poll'''
+        pass
+
+
+# ------------------------------------------------------------------------------------------------------------
+class JsonDirectorySink(IResultSink):
+    '''Write the last result of each PCE of each account into <directory>/<account>/<pce>.json'''
+    def __init__(self, directory: str):
+        self.__directory = directory
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    # ------------------------------------------------------
+    def path(self, username: str, pce_identifier: str) -> str:
+        '''Get the file of a PCE of an account: a PCE shared by two accounts gets one file per account'''
+        return os.path.join(self.__directory, re.sub(r"^\.|[^\w@.+-]", "_", username), f"{pce_identifier}.json")
+
+    # ------------------------------------------------------
+    async def write(self, username: str, pce_identifier: str, data: MeterReadingsByFrequency) -> None:
+        # Serialization and file I/O off the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self.__write, self.path(username, pce_identifier), data)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __write(filename: str, data: MeterReadingsByFrequency) -> None:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        # Write then rename so that a reader never sees a partial file.
+        with open(f"{filename}.tmp", "w") as json_file:
+            json.dump(data, json_file, default=lambda o: o.__dict__)
+        os.replace(f"{filename}.tmp", filename)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PollJob:
+    '''One PCE to poll periodically'''
+    def __init__(self, username: str, pce_identifier: str, interval: float):
+        self.username = username
+        self.pce_identifier = pce_identifier
+        self.interval = interval
+        self.polls = 0
+        self.errors = 0
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PollingDaemon:
+    """Poll many PCE of many accounts forever.
+
+    Each account keeps one datasource (HTTP session, token, payload and temperature caches) for the
+    whole life of the daemon. Polls are scheduled per PCE with a random jitter and run at most
+    concurrency at a time.
+    """
+    def __init__(self, accounts: List[Dict[str, Any]], sink: IResultSink,
+                 last_n_days: int = DEFAULT_LAST_N_DAYS, frequencies: Optional[List[Frequency]] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY, jitter: float = DEFAULT_JITTER,
+                 datasource_factory: Optional[Callable[[str, str], IDataSource]] = None):
+        self.__sink = sink
+        self.__last_n_days = last_n_days
+        self.__frequencies = frequencies if frequencies is not None else [Frequency.DAILY]
+        self.__concurrency = concurrency
+        self.__jitter = jitter
+        self.__datasource_factory = datasource_factory if datasource_factory is not None else JsonWebDataSource
+        self.__accounts = accounts
+        self._clients: Dict[str, Client] = {}
+        self._datasources: Dict[str, IDataSource] = {}
+        self.jobs: List[PollJob] = []
+        for account in accounts:
+            for pce in account["pces"]:
+                if isinstance(pce, dict):
+                    self.jobs.append(PollJob(account["username"], pce["pce"], pce.get("interval", account.get("interval", DEFAULT_POLL_INTERVAL))))
+                else:
+                    self.jobs.append(PollJob(account["username"], pce, account.get("interval", DEFAULT_POLL_INTERVAL)))
+        self._stopped = asyncio.Event()
+        self._wakeup = asyncio.Event()
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_config(config: Dict[str, Any], sink: IResultSink) -> PollingDaemon:
+        '''Build a daemon from a configuration dictionary (see README)'''
+        frequencies = [Frequency[frequency] for frequency in config["frequencies"]] if "frequencies" in config else None
+        return PollingDaemon(config["accounts"], sink,
+                             last_n_days=config.get("last_n_days", DEFAULT_LAST_N_DAYS),
+                             frequencies=frequencies,
+                             concurrency=config.get("concurrency", DEFAULT_CONCURRENCY),
+                             jitter=config.get("jitter", DEFAULT_JITTER))
+
+    # ------------------------------------------------------
+    def __client(self, username: str) -> Client:
+        client = self._clients.get(username)
+        if client is None:
+            password = next(account["password"] for account in self.__accounts if account["username"] == username)
+            datasource = self.__datasource_factory(username, password)
+            self._datasources[username] = datasource
+            client = Client(datasource)
+            self._clients[username] = client
+        return client
+
+    # ------------------------------------------------------
+    def __next_delay(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.__jitter, self.__jitter))
+
+    # ------------------------------------------------------
+    async def poll(self, job: PollJob) -> None:
+        '''Poll one PCE and write the result into the sink'''
+        client = self.__client(job.username)
+        job.polls += 1
+        try:
+            try:
+                data = await client.load_since(job.pce_identifier, self.__last_n_days, self.__frequencies)
+            except ClientAuthenticationError:
+                # The token has expired: log in again and retry once.
+                await client.async_login()
+                data = await client.load_since(job.pce_identifier, self.__last_n_days, self.__frequencies)
+            await self.__sink.write(job.username, job.pce_identifier, data)
+        except Exception:  # pylint: disable=broad-except
+            job.errors += 1
+            Logger.error(f"Polling of PCE {job.pce_identifier} has failed", exc_info=True)
+
+    # ------------------------------------------------------
+    async def run_once(self) -> None:
+        '''Poll every PCE once'''
+        semaphore = asyncio.Semaphore(self.__concurrency)
+
+        async def bounded_poll(job: PollJob) -> None:
+            async with semaphore:
+                await self.poll(job)
+
+        await asyncio.gather(*[bounded_poll(job) for job in self.jobs])
+
+    # ------------------------------------------------------
+    async def run(self) -> None:
+        '''Poll every PCE at its interval until stop() is called'''
+        semaphore = asyncio.Semaphore(self.__concurrency)
+        now = time.monotonic()
+        # Spread the first polls over the jitter window to avoid a burst at start.
+        schedule = [(now + random.uniform(0, self.__jitter * job.interval), index, job) for index, job in enumerate(self.jobs)]
+        heapq.heapify(schedule)
+        running = set()
+
+        async def bounded_poll(index: int, job: PollJob) -> None:
+            async with semaphore:
+                await self.poll(job)
+            heapq.heappush(schedule, (time.monotonic() + self.__next_delay(job.interval), index, job))
+            self._wakeup.set()
+
+        while not self._stopped.is_set():
+            delay = schedule[0][0] - time.monotonic() if len(schedule) > 0 else 60
+            if delay > 0:
+                # Sleep until the next poll is due, a poll is rescheduled or stop() is called.
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, 60))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, index, job = heapq.heappop(schedule)
+            task = asyncio.create_task(bounded_poll(index, job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        await asyncio.gather(*running, return_exceptions=True)
+
+    # ------------------------------------------------------
+    def stop(self) -> None:
+        '''Ask run() to return once the running polls are done'''
+        self._stopped.set()
+        self._wakeup.set()
+
+    # ------------------------------------------------------
+    async def close(self) -> None:
+        '''Close the HTTP sessions of the accounts'''
+        for datasource in self._datasources.values():
+            close = getattr(datasource, "close", None)
+            if close is not None:
+                await close()
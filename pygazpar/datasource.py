@@ -4,20 +4,34 @@ import logging
 import glob
 import os
 import json
+import mmap
+import shutil
 import time
-from datetime import date, timedelta
+import asyncio
+from datetime import date, datetime, timedelta
 from abc import ABC, abstractmethod
 import aiohttp
+from yarl import URL
 from pygazpar.enum import Frequency, PropertyName,ConsommationRole
 from pygazpar.excelparser import ExcelParser
 from pygazpar.jsonparser import JsonParser
 from pygazpar.auth import GazparAuth
+from pygazpar.cache import PayloadCache, TemperatureCache, DEFAULT_PAYLOAD_CACHE_SIZE
 from pygazpar.consommation import GazparConsommation
 from pygazpar.pce import GazparPCE
 from pygazpar.frequency import FrequencyConverter
+from pygazpar.merge import merge_periods, merge_releves, merge_streams, releve_key
+from pygazpar.instrumentation import create_trace_config
+from pygazpar.singleflight import SingleFlight
+from pygazpar import profiling
 from pygazpar.types.PceType import PceType
+from pygazpar.exceptions import CircuitOpenError, ClientAuthenticationError
+from pygazpar.types.ConsommationType import ConsommationType, RelevesType
 Logger = logging.getLogger(__name__)
 
+# Attempts of a consumption request before giving up.
+MAX_ATTEMPTS = 10
+
 MeterReading = Dict[str, Any]
 
 MeterReadings = List[MeterReading]
@@ -42,12 +56,17 @@ class IDataSource(ABC):
         '''List PCE from source'''
         pass
 
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        '''Get PCE details from source (not abstract, so that the datasources written before it keep working)'''
+        raise NotImplementedError(f"{type(self).__name__} does not provide PCE details")
+
 
 # ------------------------------------------------------------------------------------------------------------
 class WebDataSource(IDataSource):
     '''Base class for the WEB api'''
     # ------------------------------------------------------
-    def __init__(self, username: str, password: str, session: aiohttp.ClientSession):
+    def __init__(self, username: str, password: str, session: aiohttp.ClientSession,
+                 payload_cache_size: int = DEFAULT_PAYLOAD_CACHE_SIZE):
 
         self.__username = username
         self.__password = password
@@ -56,16 +75,45 @@ class WebDataSource(IDataSource):
         self._conso=GazparConsommation(session)
         self._auth=GazparAuth(username, password,session)
         self._auth_token=None
+        # Parsed results of the last payloads, reused when GrDF sends back the same bytes.
+        self._payload_cache = PayloadCache(payload_cache_size)
+        # Concurrent identical loads and logins share one call.
+        self._flight = SingleFlight()
     async def login(self) -> str:
-         self._auth_token=await self._auth.request_token()
+         return await self._flight.do(("login",), self.__request_token)
+    async def __request_token(self) -> str:
+         with profiling.stage("login"):
+             self._auth_token=await self._auth.request_token()
          return self._auth_token
+    def set_token(self, token: str) -> None:
+         '''Reuse a token obtained by an earlier login (see TokenStore) instead of logging in'''
+         self._auth_token=token
+         self.__session.cookie_jar.update_cookies({"auth_token": token}, URL("https://monespace.grdf.fr"))
     async def list_pce(self) -> List[PceType]:
          return await self._pce.get_list_pce()
+    async def pce_details(self, pce_identifier: str) -> PceType:
+         return await self._pce.get_pce_details(pce_identifier)
+    async def close(self) -> None:
+         '''Close the HTTP session'''
+         await self.__session.close()
     # ------------------------------------------------------
     async def load(self, pce_identifier: str, start_date: date, end_date: date, frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
 
+        if frequencies is None:
+            # Transform Enum in List.
+            frequency_list = [frequency for frequency in Frequency]
+        else:
+            # Get unique values.
+            frequency_list = list(dict.fromkeys(frequencies))
+
+        # Callers asking for the same readings at the same time get the same result object.
+        key = ("load", pce_identifier, start_date, end_date, tuple(frequency_list))
+        return await self._flight.do(key, lambda: self.__load(pce_identifier, start_date, end_date, frequency_list))
+
+    async def __load(self, pce_identifier: str, start_date: date, end_date: date, frequencies: List[Frequency]) -> MeterReadingsByFrequency:
+
         if(self._auth_token is None):
-            self._auth_token=await self._auth.request_token()
+            await self.login()
         
         res = await self._load_from_session(pce_identifier, start_date, end_date, frequencies)
 
@@ -97,12 +145,13 @@ class ExcelWebDataSource(WebDataSource):
     DATA_FILENAME = 'Donnees_informatives_*.xlsx'
 
     # ------------------------------------------------------
-    def __init__(self, username: str, password: str,tmpDirectory: str, session: aiohttp.ClientSession|None=None):
+    def __init__(self, username: str, password: str,tmpDirectory: str, session: aiohttp.ClientSession|None=None,
+                 payload_cache_size: int = DEFAULT_PAYLOAD_CACHE_SIZE):
 
         if session is None:
-            session = aiohttp.ClientSession(cookie_jar= aiohttp.CookieJar())
+            session = aiohttp.ClientSession(cookie_jar= aiohttp.CookieJar(), trace_configs=[create_trace_config()])
       
-        super().__init__(username, password,session)
+        super().__init__(username, password,session,payload_cache_size)
         
         self.__tmp_directory = tmpDirectory
     
@@ -136,21 +185,37 @@ class ExcelWebDataSource(WebDataSource):
             Logger.debug(f"Loading data of frequency {ExcelWebDataSource.FREQUENCY_VALUES[frequency]} from {start_date.strftime(ExcelWebDataSource.DATE_FORMAT)} to {end_date.strftime(ExcelWebDataSource.DATE_FORMAT)}")
 
             # Retry mechanism.
-            retry = 10
-            while retry > 0:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
 
 
                 try:
-                    response = await self._conso.get_consommation_file(pce_identifier,start_date.strftime(ExcelWebDataSource.DATE_FORMAT),end_date.strftime(ExcelWebDataSource.DATE_FORMAT),ConsommationRole.INFORMATIVES,frequency)
-                    open(f"{self.__tmp_directory}/{response.filename}", "wb").write(response.content)
-
+                    response = await self._conso.stream_consommation_file(pce_identifier,start_date.strftime(ExcelWebDataSource.DATE_FORMAT),end_date.strftime(ExcelWebDataSource.DATE_FORMAT),ConsommationRole.INFORMATIVES,frequency,
+                                                                       attempt=attempt)
                     break
+                except CircuitOpenError:
+                    # The endpoint is unhealthy: retrying now would only add load.
+                    raise
+                except ClientAuthenticationError:
+                    # The token is invalid or expired: retrying with it cannot succeed, let the caller log in again.
+                    raise
                 except Exception as e:
-                    if retry == 1:
+                    if attempt == MAX_ATTEMPTS:
                         raise e
                     Logger.error("An error occurred while loading data. Retry in 3 seconds.")
                     time.sleep(3)
-                    retry -= 1
+
+            # Same file as last time: reuse the parsed result.
+            with response["content"] as content:
+                digest = PayloadCache.digest_file(content, response["size"])
+                cache_key = (pce_identifier, start_date, end_date, frequency)
+                cached = self._payload_cache.get(cache_key, digest)
+                if cached is not None:
+                    res[frequency.value] = cached
+                    continue
+
+                with profiling.stage("xlsx_write"):
+                    with open(f"{self.__tmp_directory}/{response['filename']}", "wb") as data_file:
+                        shutil.copyfileobj(content, data_file)
 
             # Load the XLSX file into the data structure
             file_list = glob.glob(data_file_path_pattern)
@@ -159,7 +224,8 @@ class ExcelWebDataSource(WebDataSource):
                 Logger.warning(f"Not any data file has been found in '{self.__tmp_directory}' directory")
 
             for filename in file_list:
-                res[frequency.value] = ExcelParser.parse(filename, frequency if frequency != Frequency.YEARLY else Frequency.DAILY)
+                with profiling.stage("xlsx_parse"):
+                    res[frequency.value] = ExcelParser.parse(filename, frequency if frequency != Frequency.YEARLY else Frequency.DAILY)
                 try:
                     # openpyxl does not close the file properly.
                     os.remove(filename)
@@ -168,7 +234,11 @@ class ExcelWebDataSource(WebDataSource):
 
             # We compute yearly from daily data.
             if frequency == Frequency.YEARLY:
-                res[frequency.value] = FrequencyConverter.compute_yearly(res[frequency.value])
+                with profiling.stage("compute_yearly"):
+                    res[frequency.value] = FrequencyConverter.compute_yearly(res[frequency.value])
+
+            if frequency.value in res:
+                self._payload_cache.put(cache_key, digest, res[frequency.value])
 
         return res
 
@@ -186,6 +256,9 @@ class ExcelFileDataSource(IDataSource):
     async def list_pce(self) -> List[PceType]:
         '''List PCE from source'''
         pass
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        '''Get PCE details from source'''
+        pass
     async def load(self, pce_identifier: str, start_date: date,
                    end_date: date, frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
 
@@ -200,10 +273,65 @@ class ExcelFileDataSource(IDataSource):
 
         for frequency in frequency_list:
             if frequency != Frequency.YEARLY:
-                res[frequency.value] = ExcelParser.parse(self.__excel_file, frequency)
+                with profiling.stage("xlsx_parse"):
+                    res[frequency.value] = ExcelParser.parse(self.__excel_file, frequency)
             else:
-                daily = ExcelParser.parse(self.__excel_file, Frequency.DAILY)
-                res[frequency.value] = FrequencyConverter.compute_yearly(daily)
+                with profiling.stage("xlsx_parse"):
+                    daily = ExcelParser.parse(self.__excel_file, Frequency.DAILY)
+                with profiling.stage("compute_yearly"):
+                    res[frequency.value] = FrequencyConverter.compute_yearly(daily)
+
+        return res
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ExcelDirectoryDataSource(IDataSource):
+    '''Many Excel exports (directory or glob pattern) parsed across a process pool'''
+    def __init__(self, pattern: str, max_workers: Optional[int] = None):
+
+        self.__pattern = pattern
+        self.__max_workers = max_workers
+        self._exports: Optional[Dict[str, MeterReadingsByFrequency]] = None
+    async def login(self) -> str:
+         pass
+    async def list_pce(self) -> List[PceType]:
+        '''List PCE from source'''
+        pass
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        '''Get PCE details from source'''
+        pass
+
+    async def load_all(self) -> Dict[str, MeterReadingsByFrequency]:
+        '''Parse every export once and get the readings by PCE'''
+        if self._exports is None:
+            filenames = ExcelParser.expand(self.__pattern)
+            with profiling.stage("xlsx_parse"):
+                # The pool is blocking: keep the event loop responsive.
+                self._exports = await asyncio.get_running_loop().run_in_executor(None, ExcelParser.parse_many, filenames, self.__max_workers)
+        return self._exports
+
+    async def load(self, pce_identifier: str, start_date: date,
+                   end_date: date, frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
+
+        res = {}
+
+        if frequencies is None:
+            # Transform Enum in List.
+            frequency_list = [frequency for frequency in Frequency]
+        else:
+            # Get unique values.
+            frequency_list = set(frequencies)
+
+        exports = (await self.load_all()).get(pce_identifier, {})
+
+        for frequency in frequency_list:
+            if frequency != Frequency.YEARLY:
+                res[frequency.value] = exports.get(frequency.value, [])
+            elif Frequency.DAILY.value in exports:
+                with profiling.stage("compute_yearly"):
+                    res[frequency.value] = FrequencyConverter.compute_yearly(exports[Frequency.DAILY.value])
+            else:
+                res[frequency.value] = []
 
         return res
 
@@ -213,53 +341,58 @@ class JsonWebDataSource(WebDataSource):
     '''Base class for the Json Web data'''
     INPUT_DATE_FORMAT = "%Y-%m-%d"
     OUTPUT_DATE_FORMAT = "%d/%m/%Y"
+    METEO_MAX_DAYS = 730
 
-    def __init__(self, username: str, password: str, session: aiohttp.ClientSession|None=None):
+    def __init__(self, username: str, password: str, session: aiohttp.ClientSession|None=None,
+                 payload_cache_size: int = DEFAULT_PAYLOAD_CACHE_SIZE, merge_published: bool = False):
 
         if session is None:
-            session = aiohttp.ClientSession(cookie_jar= aiohttp.CookieJar())
-        super().__init__(username, password,session)
+            session = aiohttp.ClientSession(cookie_jar= aiohttp.CookieJar(), trace_configs=[create_trace_config()])
+        super().__init__(username, password,session,payload_cache_size)
 
-    async def _load_from_session(self,pce_identifier: str, start_date: date, end_date: date, 
-                                 frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
-
-        res = {}
-
-        compute_by_frequency = {
-            Frequency.HOURLY: FrequencyConverter.compute_hourly,
-            Frequency.DAILY: FrequencyConverter.compute_daily,
-            Frequency.WEEKLY: FrequencyConverter.compute_weekly,
-            Frequency.MONTHLY: FrequencyConverter.compute_monthly,
-            Frequency.YEARLY: FrequencyConverter.compute_yearly
-        }
+        self._temperature_cache = TemperatureCache()
+        # Also load the published consumption and let it override the informative one: published gas days
+        # everywhere, published periods (several gas days) in the daily list.
+        self._merge_published = merge_published
 
+    async def _load_payload(self, pce_identifier: str, start_date: date, end_date: date, role: ConsommationRole) -> bytes:
+        '''Load the raw consumption payload of a role with the retry mechanism'''
         # Data URL: Inject parameters.
         # Retry mechanism.
-        retry = 10
-        while retry > 0:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
 
 
             try:
-                data=await self._conso.get_consommation(pce_identifier,start_date.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),
-                                                        end_date.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),ConsommationRole.INFORMATIVES)
-                break
+                with profiling.stage("consumption_fetch"):
+                    return await self._conso.get_consommation_payload(pce_identifier,start_date.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),
+                                                                      end_date.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),role,
+                                                                      attempt=attempt)
+            except CircuitOpenError:
+                # The endpoint is unhealthy: retrying now would only add load.
+                raise
+            except ClientAuthenticationError:
+                # The token is invalid or expired: retrying with it cannot succeed, let the caller log in again.
+                raise
             except Exception as e:
 
-                if retry == 1:
+                if attempt == MAX_ATTEMPTS:
                     raise e
 
                 Logger.error("An error occurred while loading data. Retry in 3 seconds.")
-                time.sleep(3)
-                retry -= 1
+                await asyncio.sleep(3)
 
-        # Temperatures URL: Inject parameters.
-        end_date = date.today() - timedelta(days=1) if end_date >= date.today() else end_date
-        days = min((end_date - start_date).days, 730)
-        # Get weather data.
-        temperatures=await self._pce.get_pce_meteo(pce_identifier,end_date.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),days)
+    async def _load_from_session(self,pce_identifier: str, start_date: date, end_date: date, 
+                                 frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
 
-        # Transform all the data into the target structure.
-        daily = JsonParser.parse_result(data, temperatures, pce_identifier)
+        res = {}
+
+        compute_by_frequency = {
+            Frequency.HOURLY: FrequencyConverter.compute_hourly,
+            Frequency.DAILY: FrequencyConverter.compute_daily,
+            Frequency.WEEKLY: FrequencyConverter.compute_weekly,
+            Frequency.MONTHLY: FrequencyConverter.compute_monthly,
+            Frequency.YEARLY: FrequencyConverter.compute_yearly
+        }
 
         if frequencies is None:
             # Transform Enum in List.
@@ -268,16 +401,73 @@ class JsonWebDataSource(WebDataSource):
             # Get unique values.
             frequency_list = set(frequencies)
 
+        cache_key = (pce_identifier, start_date, end_date, tuple(sorted(frequency.value for frequency in frequency_list)), self._merge_published)
+
+        if self._merge_published:
+            payloads = await asyncio.gather(self._load_payload(pce_identifier, start_date, end_date, ConsommationRole.INFORMATIVES),
+                                            self._load_payload(pce_identifier, start_date, end_date, ConsommationRole.PUBLIEES))
+        else:
+            payloads = [await self._load_payload(pce_identifier, start_date, end_date, ConsommationRole.INFORMATIVES)]
+
+        # Same payload as last time: reuse the parsed and aggregated result.
+        digest = PayloadCache.digest(*payloads)
+        cached = self._payload_cache.get(cache_key, digest)
+        if cached is not None:
+            return cached
+
+        with profiling.stage("json_parse"):
+            data = GazparConsommation.parse_consommation(payloads[0], pce_identifier)
+            if self._merge_published:
+                publiees = GazparConsommation.parse_consommation(payloads[1], pce_identifier)
+                releves = merge_releves(data.releves, publiees.releves)
+                # Published releves over a period (no gas day) cannot be aggregated: they go to the daily list.
+                data.releves = [releve for releve in releves if releve.journeeGaziere is not None]
+                periods = [releve for releve in releves if releve.journeeGaziere is None]
+
+        # Temperatures are available up to yesterday and for at most METEO_MAX_DAYS days.
+        meteo_end_date = min(end_date, date.today() - timedelta(days=1)).strftime(JsonWebDataSource.INPUT_DATE_FORMAT)
+        meteo_start_date = max(start_date, end_date - timedelta(days=JsonWebDataSource.METEO_MAX_DAYS)).strftime(JsonWebDataSource.INPUT_DATE_FORMAT)
+
+        # Get weather data only for the days without temperature which have never been requested.
+        days_without_temperature = [releve.journeeGaziere for releve in data.releves
+                                    if releve.temperature is None and releve.journeeGaziere is not None and meteo_start_date <= releve.journeeGaziere <= meteo_end_date]
+        missing_days = self._temperature_cache.missing_days(pce_identifier, days_without_temperature)
+        if len(missing_days) > 0:
+            first_day = datetime.strptime(missing_days[0], JsonWebDataSource.INPUT_DATE_FORMAT).date()
+            last_day = datetime.strptime(missing_days[-1], JsonWebDataSource.INPUT_DATE_FORMAT).date()
+            days = (last_day - first_day).days + 1
+            with profiling.stage("meteo_fetch"):
+                temperatures=await self._pce.get_pce_meteo(pce_identifier,last_day.strftime(JsonWebDataSource.INPUT_DATE_FORMAT),days)
+            self._temperature_cache.update(pce_identifier, first_day, last_day, temperatures or {})
+
+        # Transform all the data into the target structure.
+        with profiling.stage("json_parse"):
+            daily = JsonParser.parse_result(data, self._temperature_cache.get(pce_identifier), pce_identifier)
+
         for frequency in frequency_list:
-            res[frequency.value] = compute_by_frequency[frequency](daily)
+            with profiling.stage(f"compute_{frequency.value}"):
+                res[frequency.value] = compute_by_frequency[frequency](daily)
+
+        if self._merge_published and Frequency.DAILY in frequency_list:
+            # The published periods replace the informative gas days they cover.
+            res[Frequency.DAILY.value] = merge_periods(res[Frequency.DAILY.value], JsonParser.parse_periods(periods))
+
+        # Only reuse this result once no temperature can show up later for it.
+        if len(self._temperature_cache.missing_days(pce_identifier, days_without_temperature)) == 0:
+            self._payload_cache.put(cache_key, digest, res)
 
         return res
 
 
 # ------------------------------------------------------------------------------------------------------------
 class JsonFileDataSource(IDataSource):
-    '''Base class for the Json File data'''
-    def __init__(self, consumption_json_file: str, temperature_json_file):
+    '''Base class for the Json File data.
+
+    consumption_json_file is a dump ({pce: consommation}) or a directory (glob pattern) of archived dumps,
+    merged by precedence (see merge_streams), the last dump in file name order winning on a tie.
+    temperature_json_file is a dump ({day: temperature}) or a directory of dumps whose names start with the PCE.
+    '''
+    def __init__(self, consumption_json_file: str, temperature_json_file: Optional[str]):
 
         self.__consumption_json_file = consumption_json_file
         self.__temperature_json_file = temperature_json_file
@@ -286,14 +476,74 @@ class JsonFileDataSource(IDataSource):
     async def list_pce(self) -> List[PceType]:
         '''List PCE from source'''
         pass
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        '''Get PCE details from source'''
+        pass
+
+    @staticmethod
+    def _expand(pattern: str) -> List[str]:
+        '''Get the dump files of a file, a directory or a glob pattern'''
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.json")
+        return sorted(glob.glob(pattern))
+
+    @staticmethod
+    def _read_dump(filename: str, key: Optional[str] = None) -> Optional[Any]:
+        '''Read a dump, skipping it without reading it into memory when key does not appear in it'''
+        with open(filename, "rb") as dump_file:
+            if os.fstat(dump_file.fileno()).st_size == 0:
+                return None
+            if key is not None:
+                # The memory map only serves the search: json cannot decode from it without a full copy.
+                with mmap.mmap(dump_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if mapped.find(f'"{key}"'.encode()) < 0:
+                        return None
+            return json.load(dump_file)
+
+    @staticmethod
+    def _read_consommation(pattern: str, pce_identifier: str) -> ConsommationType:
+        '''Read the consommation of a PCE from one or many dumps'''
+        consommation = None
+        streams: List[List[RelevesType]] = []
+        for filename in JsonFileDataSource._expand(pattern):
+            with profiling.stage("json_decode"):
+                dump = JsonFileDataSource._read_dump(filename, pce_identifier)
+            if dump is None or pce_identifier not in dump:
+                continue
+            with profiling.stage("consommation_type"):
+                consommation = ConsommationType(**dump[pce_identifier])
+            streams.append(sorted(consommation.releves, key=releve_key))
+
+        if consommation is None:
+            raise ValueError(f"PCE {pce_identifier} not found in '{pattern}'")
+
+        consommation.releves = merge_streams(streams)
+        return consommation
+
+    @staticmethod
+    def _read_temperatures(pattern: Optional[str], pce_identifier: str) -> Dict[str, Any]:
+        '''Read the temperatures of a PCE from one or many dumps'''
+        if pattern is None:
+            return {}
+        if os.path.isfile(pattern):
+            return JsonFileDataSource._read_dump(pattern) or {}
+        res: Dict[str, Any] = {}
+        for filename in JsonFileDataSource._expand(pattern):
+            if os.path.basename(filename).startswith(pce_identifier):
+                res.update(JsonFileDataSource._read_dump(filename) or {})
+        return res
+
     async def load(self, pce_identifier: str, start_date: date, end_date: date,
                    frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
 
         res = {}
 
-        with open(self.__consumption_json_file) as __consumption_json_file:
-            with open(self.__temperature_json_file) as __temperature_json_file:
-                daily = JsonParser.parse(__consumption_json_file.read(), __temperature_json_file.read(), pce_identifier)
+        with profiling.stage("json_parse"):
+            data = JsonFileDataSource._read_consommation(self.__consumption_json_file, pce_identifier)
+            temperatures = JsonFileDataSource._read_temperatures(self.__temperature_json_file, pce_identifier)
+
+        with profiling.stage("parse_result"):
+            daily = JsonParser.parse_result(data, temperatures, pce_identifier)
 
         compute_by_frequency = {
             Frequency.HOURLY: FrequencyConverter.compute_hourly,
@@ -311,7 +561,8 @@ class JsonFileDataSource(IDataSource):
             frequency_list = set(frequencies)
 
         for frequency in frequency_list:
-            res[frequency.value] = compute_by_frequency[frequency](daily)
+            with profiling.stage(f"compute_{frequency.value}"):
+                res[frequency.value] = compute_by_frequency[frequency](daily)
 
         return res
 
@@ -326,6 +577,9 @@ class TestDataSource(IDataSource):
     async def list_pce(self) -> List[PceType]:
         '''List PCE from source'''
         pass
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        '''Get PCE details from source'''
+        pass
     async def load(self, pce_identifier: str, start_date: date, end_date: date,
                    frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
 
@@ -1,8 +1,11 @@
 """Support for Excel parser."""
-from typing import  List, Dict
+from typing import  Any, List, Dict, Iterable, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import glob
 import logging
-from datetime import datetime, time,timedelta
-import pytz
+import os
+import re
+from datetime import datetime, timedelta
 import dateparser
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.cell.cell import Cell
@@ -12,7 +15,12 @@ from dateutil.relativedelta import relativedelta
 from pygazpar.enum import NatureReleve, QualificationReleve, StatusReleve,Frequency,PropertyName
 from pygazpar.types.RelevesResultType import RelevesResultType
 from pygazpar.types.ConsommationType import RelevesType
+from pygazpar.gasday import GasDayCalendar
+from pygazpar.columns import DailyColumns, DailyReleves
+from pygazpar.xlsxreader import XlsxWorksheet, UnsupportedLayoutError
 FIRST_DATA_LINE_NUMBER = 10
+PCE_CELL = "D4"
+DAILY_DATE_PATTERN = re.compile(r"^\d{2}/\d{2}/\d{4}$")
 
 Logger = logging.getLogger(__name__)
 
@@ -26,7 +34,7 @@ class ExcelParser:
     INPUT_DATE_FORMAT = "%d/%m/%Y"
     # ------------------------------------------------------
     @staticmethod
-    def parse(data_filename: str, data_reading_frequency: Frequency) -> List[RelevesResultType]:
+    def parse(data_filename: str, data_reading_frequency: Frequency, fast: bool = True) -> List[RelevesResultType]:
         '''Parse excel file'''
         parse_by_frequency = {
             Frequency.HOURLY: ExcelParser.__parse_hourly,
@@ -37,16 +45,106 @@ class ExcelParser:
 
         Logger.debug(f"Loading Excel data file '{data_filename}'...")
 
+        workbook, worksheet = ExcelParser.__load_worksheet(data_filename, fast)
+
+        res = parse_by_frequency[data_reading_frequency](worksheet)  # type: ignore
+
+        if workbook is not None:
+            workbook.close()
+
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __load_worksheet(data_filename: str, fast: bool) -> Tuple[Optional[Any], Any]:
+        '''Load the active sheet: values only when possible, openpyxl otherwise'''
+        if fast:
+            try:
+                return None, XlsxWorksheet.load(data_filename)
+            except UnsupportedLayoutError as error:
+                Logger.debug(f"Fast reader not applicable, using openpyxl: {error}")
+
         workbook = load_workbook(filename=data_filename)
 
-        worksheet = workbook.active
+        return workbook, workbook.active
 
-        res = parse_by_frequency[data_reading_frequency](worksheet)  # type: ignore
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_export(data_filename: str, fast: bool = True) -> Tuple[str, Frequency, List[RelevesResultType]]:
+        '''Parse a GRDF export whose PCE and frequency are read from the file itself'''
+        Logger.debug(f"Loading Excel export '{data_filename}'...")
+
+        workbook, worksheet = ExcelParser.__load_worksheet(data_filename, fast)
+
+        pce_identifier, frequency = ExcelParser.detect(worksheet, data_filename)  # type: ignore
+
+        parse_by_frequency = {
+            Frequency.DAILY: ExcelParser.__parse_daily,
+            Frequency.WEEKLY: ExcelParser.__parse_weekly,
+            Frequency.MONTHLY: ExcelParser.__parse_monthly
+        }
+
+        res = parse_by_frequency[frequency](worksheet)  # type: ignore
 
-        workbook.close()
+        if workbook is not None:
+            workbook.close()
+
+        return pce_identifier, frequency, res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def detect(worksheet: Worksheet, data_filename: str) -> Tuple[str, Frequency]:
+        '''Get the PCE (file name if anonymized) and the frequency of an export'''
+        pce_identifier = worksheet[PCE_CELL].value
+        if pce_identifier is None or len(str(pce_identifier).strip()) == 0:
+            pce_identifier = os.path.splitext(os.path.basename(data_filename))[0]
+
+        first_date = worksheet.cell(column=2, row=FIRST_DATA_LINE_NUMBER).value
+        if first_date is None or DAILY_DATE_PATTERN.match(str(first_date).strip()):
+            frequency = Frequency.DAILY
+        elif str(first_date).startswith("Du "):
+            frequency = Frequency.WEEKLY
+        else:
+            frequency = Frequency.MONTHLY
+
+        return str(pce_identifier).strip(), frequency
+
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_many(data_filenames: Iterable[str], max_workers: Optional[int] = None) -> Dict[str, Dict[str, List[RelevesResultType]]]:
+        '''Parse many exports across a process pool and get the readings by PCE and frequency'''
+        filenames = sorted(data_filenames)
+
+        Logger.debug(f"Loading {len(filenames)} Excel exports...")
+
+        if max_workers == 1 or len(filenames) <= 1:
+            exports = [ExcelParser.parse_export(filename) for filename in filenames]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                # Workbooks are large and few: one task per file.
+                exports = list(executor.map(ExcelParser.parse_export, filenames))
+
+        # Many periods of the same PCE: the most recent export (last file name) wins on overlaps.
+        by_period: Dict[str, Dict[str, Dict[str, RelevesResultType]]] = {}
+        for pce_identifier, frequency, releves in exports:
+            periods = by_period.setdefault(pce_identifier, {}).setdefault(frequency.value, {})
+            for releve in releves:
+                periods[releve.dateDebutReleve] = releve  # type: ignore
+
+        res: Dict[str, Dict[str, List[RelevesResultType]]] = {}
+        for pce_identifier, by_frequency in by_period.items():
+            res[pce_identifier] = {frequency: [periods[key] for key in sorted(periods)] for frequency, periods in by_frequency.items()}
 
         return res
 
+    # ------------------------------------------------------
+    @staticmethod
+    def expand(pattern: str) -> List[str]:
+        '''Get the export files of a directory or a glob pattern'''
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.xlsx")
+        return sorted(glob.glob(pattern))
+
     # ------------------------------------------------------
     @staticmethod
     def __fill_row(row: Dict, property_name: str, cell: Cell, is_number: bool):
@@ -73,7 +171,9 @@ class ExcelParser:
     @staticmethod
     def __parse_daily(worksheet: Worksheet) -> List[RelevesResultType]:
         '''parse daily data'''
-        res = []       
+        res = []
+        # Filled as we go for the frequency converters.
+        columns = DailyColumns()
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
 
@@ -83,13 +183,8 @@ class ExcelParser:
             row = {}
             if worksheet.cell(column=2, row=rownum).value is not None:
                 date_journee = datetime.strptime(worksheet.cell(column=2, row=rownum).value, ExcelParser.INPUT_DATE_FORMAT).date()
-                info=pytz.timezone('Europe/Paris')
-                MyTime = time(6, 0, 0)  #hr/min/sec
-                datetime_debut = datetime.combine(date_journee, MyTime)
-                datetime_debut_localize=info.localize(datetime_debut)
                 row[PropertyName.JOURNEE_GAZIERE.value] = date_journee.strftime(ExcelParser.OUTPUT_DATE_FORMAT)
-                row[PropertyName.DATE_DEBUT.value]= datetime_debut_localize.isoformat()
-                row[PropertyName.DATE_FIN.value]= (datetime_debut_localize+timedelta(days=1)).isoformat()
+                row[PropertyName.DATE_DEBUT.value], row[PropertyName.DATE_FIN.value] = GasDayCalendar.bounds(date_journee)
 
                 ExcelParser.__fill_row(row, PropertyName.START_INDEX.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
                 ExcelParser.__fill_row(row, PropertyName.END_INDEX.value, worksheet.cell(column=4, row=rownum), True)  # type: ignore
@@ -108,10 +203,11 @@ class ExcelParser:
                 releve_result = RelevesResultType(worksheet.cell(column=2, row=rownum).value,data_timestamp,releve)
 
                 res.append(releve_result)
+                columns.append_releve(releve_result)
 
         Logger.debug(f"Daily data read successfully between row #{minRowNum} and row #{maxRowNum}")
 
-        return res
+        return DailyReleves(res, columns)
 
     # ------------------------------------------------------
     @staticmethod
@@ -121,8 +217,6 @@ class ExcelParser:
 
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
-        info=pytz.timezone('Europe/Paris')
-        my_time = time(6, 0, 0)  #hr/min/sec
         min_row_num = FIRST_DATA_LINE_NUMBER
         max_row_num = len(worksheet['B'])
         for rownum in range(min_row_num, max_row_num + 1):
@@ -133,13 +227,9 @@ class ExcelParser:
                 dateEnd=dateField.split('au')[1]
                 dateStartDT=parse(dateStart, fuzzy_with_tokens=True)
                 dateEndDT=parse(dateEnd, fuzzy_with_tokens=True)
-                dateStartDT = datetime.combine(dateStartDT[0], my_time)
-                dateEndDT = datetime.combine(dateEndDT[0], my_time)
-                dateStartDT=info.localize(dateStartDT)
-                dateEndDT=info.localize(dateEndDT)
 
-                row[PropertyName.DATE_DEBUT.value]= dateStartDT.isoformat()
-                row[PropertyName.DATE_FIN.value]= (dateEndDT+timedelta(days=1)).isoformat()
+                row[PropertyName.DATE_DEBUT.value]= GasDayCalendar.start(dateStartDT[0].date())
+                row[PropertyName.DATE_FIN.value]= GasDayCalendar.start(dateEndDT[0].date()+timedelta(days=1))
                 row[PropertyName.JOURNEE_GAZIERE.value] =None
                 ExcelParser.__fill_row(row, PropertyName.VOLUME.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
                 ExcelParser.__fill_row(row, PropertyName.ENERGY.value, worksheet.cell(column=4, row=rownum), True)  # type: ignore
@@ -172,9 +262,6 @@ class ExcelParser:
 
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
-        info=pytz.timezone('Europe/Paris')
-       
-        MyTime = time(6, 0, 0)  #hr/min/sec
         minRowNum = FIRST_DATA_LINE_NUMBER
         maxRowNum = len(worksheet['B'])
         for rownum in range(minRowNum, maxRowNum + 1):
@@ -182,11 +269,9 @@ class ExcelParser:
             if worksheet.cell(column=2, row=rownum).value is not None:
                 dateField=worksheet.cell(column=2, row=rownum).value
                 dateStartDT=dateparser.parse(dateField, locales=['fr'])
-                dateStartDT=dateStartDT.replace(day=1)
-                dateStartDT = datetime.combine(dateStartDT, MyTime)
-                dateStartDT=info.localize(dateStartDT)
-                row[PropertyName.DATE_DEBUT.value]= dateStartDT.isoformat()
-                row[PropertyName.DATE_FIN.value]= (dateStartDT+relativedelta(months=1)).isoformat()
+                dateStartDT=dateStartDT.replace(day=1).date()
+                row[PropertyName.DATE_DEBUT.value]= GasDayCalendar.start(dateStartDT)
+                row[PropertyName.DATE_FIN.value]= GasDayCalendar.start(dateStartDT+relativedelta(months=1))
                 row[PropertyName.JOURNEE_GAZIERE.value] =None
 
                 ExcelParser.__fill_row(row, PropertyName.VOLUME.value, worksheet.cell(column=3, row=rownum), True)  # type: ignore
@@ -13,3 +13,9 @@ class ClientAuthenticationError(
     ClientError,
 ):
     """Exception to indicate an authentication error."""
+
+
+class CircuitOpenError(
+    ClientCommunicationError,
+):
+    """Exception to indicate that an endpoint is failing fast until it recovers."""
@@ -0,0 +1,178 @@
+"""Support for partitioned export."""
+from __future__ import annotations
+from typing import Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+import asyncio
+import glob
+import logging
+import os
+import time
+import pandas as pd
+from pygazpar.daemon import IResultSink
+from pygazpar.datasource import MeterReadingsByFrequency
+
+DEFAULT_COMPACT_THRESHOLD = 8
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+def parquet_available() -> bool:
+    '''Tell whether pandas can write Parquet files (pyarrow installed)'''
+    try:
+        import pyarrow  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+        return True
+    except ImportError:
+        return False
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PartitionedWriter:
+    """Write readings as columnar files partitioned by frequency, PCE and month.
+
+    Layout: <directory>/frequency=<frequency>/pce=<pce>/month=<YYYY-MM>/part-<n>.<parquet|csv>
+    Each write appends one new part per touched partition. A partition with more than compact_threshold
+    parts is compacted into one part, keeping the last written version of each reading.
+    Several processes may write the same PCE (a PCE shared by accounts of different runner workers): part
+    names hold the process id, and a part already removed by the compaction of another process is skipped.
+    Parquet needs pyarrow (pip install pygazpar[parquet]), CSV is used otherwise.
+    """
+    FORMATS = ["parquet", "csv"]
+
+    def __init__(self, directory: str, file_format: Optional[str] = None, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        if file_format is None:
+            file_format = "parquet" if parquet_available() else "csv"
+        if file_format not in PartitionedWriter.FORMATS:
+            raise ValueError(f"Invalid format: {file_format} ({' | '.join(PartitionedWriter.FORMATS)} is expected)")
+        if file_format == "parquet" and not parquet_available():
+            raise ImportError("Parquet export requires pyarrow: pip install pygazpar[parquet]")
+        self.directory = directory
+        self.file_format = file_format
+        self.compact_threshold = compact_threshold
+        self.__sequence = 0
+
+    # ------------------------------------------------------
+    @staticmethod
+    def to_frame(releves: List[Any]) -> pd.DataFrame:
+        '''Convert readings (RelevesResultType or dict) to a DataFrame with plain values'''
+        df = pd.DataFrame.from_records([releve if isinstance(releve, dict) else vars(releve) for releve in releves])
+        for column in df.columns:
+            if df[column].dtype == object:
+                df[column] = df[column].map(lambda value: value.value if isinstance(value, Enum) else value)
+        return df
+
+    # ------------------------------------------------------
+    def partition_path(self, frequency: str, pce_identifier: str, month: str) -> str:
+        '''Get the directory of a partition'''
+        return os.path.join(self.directory, f"frequency={frequency}", f"pce={pce_identifier}", f"month={month}")
+
+    # ------------------------------------------------------
+    def write(self, pce_identifier: str, data: MeterReadingsByFrequency) -> List[str]:
+        '''Append the readings of a PCE and get the written files'''
+        written = []
+        for frequency, releves in data.items():
+            if len(releves) == 0:
+                continue
+            df = PartitionedWriter.to_frame(releves)
+            months = df["dateDebutReleve"].str.slice(0, 7)
+            for month, partition in df.groupby(months, sort=True):
+                written.append(self.__append(self.partition_path(frequency, pce_identifier, str(month)), partition))
+        return written
+
+    # ------------------------------------------------------
+    def __append(self, path: str, df: pd.DataFrame) -> str:
+        # Another worker may create the same partition meanwhile.
+        os.makedirs(path, exist_ok=True)
+        # Part names sort in write order, so the last part holds the last version of a reading.
+        self.__sequence += 1
+        filename = os.path.join(path, f"part-{time.time_ns():020d}-{os.getpid()}-{self.__sequence:06d}.{self.file_format}")
+        self.__write_file(df, filename)
+        if len(self.parts(path)) > self.compact_threshold:
+            self.compact(path)
+        return filename
+
+    # ------------------------------------------------------
+    def __write_file(self, df: pd.DataFrame, filename: str) -> None:
+        temporary = f"{filename}.{os.getpid()}.tmp"
+        if self.file_format == "parquet":
+            df.to_parquet(temporary, index=False)
+        else:
+            df.to_csv(temporary, index=False)
+        os.replace(temporary, filename)
+
+    # ------------------------------------------------------
+    def __read_file(self, filename: str) -> pd.DataFrame:
+        if self.file_format == "parquet":
+            return pd.read_parquet(filename)
+        return pd.read_csv(filename, dtype={"journeeGaziere": str, "time_period": str})
+
+    # ------------------------------------------------------
+    def parts(self, path: str) -> List[str]:
+        '''Get the part files of a partition, oldest first'''
+        return sorted(glob.glob(os.path.join(path, f"part-*.{self.file_format}")))
+
+    # ------------------------------------------------------
+    def read_partition(self, path: str) -> pd.DataFrame:
+        '''Read a partition, keeping the last written version of each reading'''
+        frames = []
+        for part in self.parts(path):
+            try:
+                frames.append(self.__read_file(part))
+            except FileNotFoundError:
+                # Compacted by another process meanwhile: its content is in the last part.
+                pass
+        if len(frames) == 0:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True)
+        return df.drop_duplicates(subset=["dateDebutReleve"], keep="last").sort_values("dateDebutReleve").reset_index(drop=True)
+
+    # ------------------------------------------------------
+    def read(self, frequency: str, pce_identifier: str) -> pd.DataFrame:
+        '''Read every partition of a PCE'''
+        paths = sorted(glob.glob(self.partition_path(frequency, pce_identifier, "*")))
+        frames = [self.read_partition(path) for path in paths]
+        if len(frames) == 0:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    # ------------------------------------------------------
+    def compact(self, path: str) -> None:
+        '''Merge the parts of a partition into one'''
+        parts = self.parts(path)
+        if len(parts) <= 1:
+            return
+        Logger.debug(f"Compacting {len(parts)} parts of {path}...")
+        # The compacted part replaces the last one, then the older ones are removed:
+        # a crash in between leaves duplicates that read_partition ignores.
+        self.__write_file(self.read_partition(path), parts[-1])
+        for part in parts[:-1]:
+            try:
+                os.remove(part)
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------
+    def compact_all(self) -> Tuple[int, int]:
+        '''Compact every partition and get (partitions, removed parts)'''
+        partitions = 0
+        removed = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "frequency=*", "pce=*", "month=*"))):
+            count = len(self.parts(path))
+            if count > 1:
+                self.compact(path)
+                partitions += 1
+                removed += count - 1
+        return partitions, removed
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PartitionedSink(IResultSink):
+    '''Daemon output appending to a PartitionedWriter'''
+    def __init__(self, directory: str, file_format: Optional[str] = None, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        self.writer = PartitionedWriter(directory, file_format, compact_threshold)
+        # One thread: the writes leave the event loop but never run concurrently on the same partition.
+        self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pygazpar-export")
+
+    async def write(self, username: str, pce_identifier: str, data: MeterReadingsByFrequency) -> None:
+        await asyncio.get_running_loop().run_in_executor(self.__executor, self.writer.write, pce_identifier, data)
@@ -0,0 +1,234 @@
+"""Support for multi-account fleet client."""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from datetime import date
+import asyncio
+import logging
+import aiohttp
+from pygazpar.cache import TokenStore
+from pygazpar.client import Client, DEFAULT_LAST_N_DAYS
+from pygazpar.datasource import IDataSource, JsonWebDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.exceptions import ClientAuthenticationError
+from pygazpar.instrumentation import create_trace_config
+
+DEFAULT_FLEET_CONCURRENCY = 16
+DEFAULT_ACCOUNT_CONCURRENCY = 2
+DEFAULT_CONNECTION_LIMIT = 64
+
+Logger = logging.getLogger(__name__)
+
+DataSourceFactory = Callable[[str, str, aiohttp.ClientSession], IDataSource]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FleetResult:
+    '''Results of a fleet operation keyed by account then PCE, and the errors of the failed ones'''
+    def __init__(self):
+        self.data: Dict[str, Dict[str, MeterReadingsByFrequency]] = {}
+        self.errors: Dict[Tuple[str, str], Exception] = {}
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FleetClient:
+    """Client of many GrDF accounts.
+
+    Each account gets its own Client, datasource and cookie jar, over one connector shared by all the
+    accounts (at most connection_limit connections). At most concurrency calls run at a time, and at most
+    account_concurrency per account, so an account with many PCE does not delay the others: the calls
+    of the other accounts keep their turn in the shared queue.
+    An account without "pces" gets all the PCE of the account (PCE registry); when this listing fails, the
+    error of the account is in FleetResult.errors under (username, "*") and the other accounts are loaded.
+    With a token_store, an account reuses the stored token of a previous login (of this process or of
+    another one) instead of logging in, and stores the token of each new login.
+    """
+    def __init__(self, accounts: List[Dict[str, Any]],
+                 concurrency: int = DEFAULT_FLEET_CONCURRENCY,
+                 account_concurrency: int = DEFAULT_ACCOUNT_CONCURRENCY,
+                 connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+                 datasource_factory: Optional[DataSourceFactory] = None,
+                 token_store: Optional[TokenStore] = None):
+        self.__accounts = {account["username"]: account for account in accounts}
+        self.__concurrency = concurrency
+        self.__account_concurrency = account_concurrency
+        self.__connection_limit = connection_limit
+        self.__datasource_factory = datasource_factory if datasource_factory is not None else JsonWebDataSource
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._clients: Dict[str, Client] = {}
+        self._datasources: Dict[str, IDataSource] = {}
+        self.__token_store = token_store
+        self.__login_locks: Dict[str, asyncio.Lock] = {}
+        self.__logged_in: set = set()
+        self.logins = 0
+        self.reused_tokens = 0
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+        self.__account_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    # ------------------------------------------------------
+    @property
+    def usernames(self) -> List[str]:
+        '''Get the accounts of the fleet'''
+        return list(self.__accounts)
+
+    # ------------------------------------------------------
+    def client(self, username: str) -> Client:
+        '''Get the Client of an account (created on first use, within the event loop)'''
+        client = self._clients.get(username)
+        if client is None:
+            if self._connector is None:
+                self._connector = aiohttp.TCPConnector(limit=self.__connection_limit)
+            # Own cookie jar (auth_token) per account, shared connection pool.
+            session = aiohttp.ClientSession(connector=self._connector, connector_owner=False,
+                                            cookie_jar=aiohttp.CookieJar(), trace_configs=[create_trace_config()])
+            self._sessions[username] = session
+            account = self.__accounts[username]
+            datasource = self.__datasource_factory(username, account["password"], session)
+            self._datasources[username] = datasource
+            client = Client(datasource)
+            self._clients[username] = client
+        return client
+
+    # ------------------------------------------------------
+    async def __bounded(self, username: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.__concurrency)
+        account_semaphore = self.__account_semaphores.get(username)
+        if account_semaphore is None:
+            account_semaphore = self.__account_semaphores[username] = asyncio.Semaphore(self.__account_concurrency)
+        # Account slot first: the calls waiting for the shared slots are spread over the accounts.
+        async with account_semaphore:
+            async with self.__semaphore:
+                return await call()
+
+    # ------------------------------------------------------
+    async def __login(self, username: str) -> None:
+        token = await self.__bounded(username, self.client(username).async_login)
+        self.logins += 1
+        if self.__token_store is not None and token is not None:
+            self.__token_store.put(username, token)
+
+    # ------------------------------------------------------
+    async def __ensure_token(self, username: str) -> None:
+        '''Restore the stored token of an account, or log in and store the token, once'''
+        if self.__token_store is None or username in self.__logged_in:
+            return
+        lock = self.__login_locks.setdefault(username, asyncio.Lock())
+        async with lock:
+            if username in self.__logged_in:
+                return
+            self.client(username)
+            datasource = self._datasources[username]
+            token = self.__token_store.get(username)
+            if token is not None and hasattr(datasource, "set_token"):
+                datasource.set_token(token)
+                self.reused_tokens += 1
+            else:
+                await self.__login(username)
+            self.__logged_in.add(username)
+
+    # ------------------------------------------------------
+    async def login_all(self) -> Dict[str, Optional[Exception]]:
+        '''Log in every account and get the error of each account (None when logged in)'''
+        async def login(username: str) -> Optional[Exception]:
+            try:
+                await self.__login(username)
+                self.__logged_in.add(username)
+                return None
+            except Exception as exception:  # pylint: disable=broad-except
+                return exception
+
+        usernames = self.usernames
+        errors = await asyncio.gather(*[login(username) for username in usernames])
+        return dict(zip(usernames, errors))
+
+    # ------------------------------------------------------
+    async def list_pces(self, errors: Optional[Dict[Tuple[str, str], Exception]] = None) -> Dict[str, List[str]]:
+        '''Get the PCE of every account: the configured ones, else the ones of the account.
+        With errors, an account whose PCE cannot be listed is left out and its error is stored under (username, "*"),
+        else the first error is raised'''
+        async def pces(username: str) -> Optional[List[str]]:
+            configured = self.__accounts[username].get("pces")
+            if configured is not None:
+                return [pce["pce"] if isinstance(pce, dict) else pce for pce in configured]
+            try:
+                await self.__ensure_token(username)
+                registry = await self.__bounded(username, self.client(username).load_pce_registry)
+            except Exception as exception:  # pylint: disable=broad-except
+                if errors is None:
+                    raise
+                Logger.error(f"Listing of the PCE of {username} has failed", exc_info=True)
+                errors[(username, "*")] = exception
+                return None
+            return list(registry)
+
+        usernames = self.usernames
+        pces_by_account = dict(zip(usernames, await asyncio.gather(*[pces(username) for username in usernames])))
+        return {username: pces for username, pces in pces_by_account.items() if pces is not None}
+
+    # ------------------------------------------------------
+    async def __load(self, username: str, pce_identifier: str,
+                     load: Callable[[Client, str], Awaitable[MeterReadingsByFrequency]]) -> MeterReadingsByFrequency:
+        client = self.client(username)
+        await self.__ensure_token(username)
+        try:
+            return await self.__bounded(username, lambda: load(client, pce_identifier))
+        except ClientAuthenticationError:
+            # The token has expired: log in again and retry once.
+            await self.__login(username)
+            return await self.__bounded(username, lambda: load(client, pce_identifier))
+
+    # ------------------------------------------------------
+    async def __load_all(self, load: Callable[[Client, str], Awaitable[MeterReadingsByFrequency]]) -> FleetResult:
+        result = FleetResult()
+        pces_by_account = await self.list_pces(result.errors)
+
+        # Interleave the accounts so that the first calls queued are not all from the first account.
+        jobs = []
+        longest = max([len(pces) for pces in pces_by_account.values()], default=0)
+        for position in range(longest):
+            for username, pces in pces_by_account.items():
+                if position < len(pces):
+                    jobs.append((username, pces[position]))
+
+        async def run(username: str, pce_identifier: str) -> None:
+            try:
+                data = await self.__load(username, pce_identifier, load)
+                result.data.setdefault(username, {})[pce_identifier] = data
+            except Exception as exception:  # pylint: disable=broad-except
+                Logger.error(f"Loading of PCE {pce_identifier} of {username} has failed", exc_info=True)
+                result.errors[(username, pce_identifier)] = exception
+
+        await asyncio.gather(*[run(username, pce_identifier) for username, pce_identifier in jobs])
+        return result
+
+    # ------------------------------------------------------
+    async def load_since(self, last_n_days: int = DEFAULT_LAST_N_DAYS,
+                         frequencies: Optional[List[Frequency]] = None) -> FleetResult:
+        '''Load data since last N days for every PCE of every account'''
+        return await self.__load_all(lambda client, pce_identifier: client.load_since(pce_identifier, last_n_days, frequencies))
+
+    # ------------------------------------------------------
+    async def load_date_range(self, start_date: date, end_date: date,
+                              frequencies: Optional[List[Frequency]] = None) -> FleetResult:
+        '''Load data between two dates for every PCE of every account'''
+        return await self.__load_all(lambda client, pce_identifier: client.load_date_range(pce_identifier, start_date, end_date, frequencies))
+
+    # ------------------------------------------------------
+    async def close(self) -> None:
+        '''Close the sessions of the accounts and the shared connector'''
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        self._clients.clear()
+        self._datasources.clear()
+        self.__logged_in.clear()
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    async def __aenter__(self) -> FleetClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,9 +1,13 @@
 """Support for Frequency Converter."""
 
 from typing import List, Dict, Any, cast
+from datetime import datetime, timedelta
 import pandas as pd
 from pygazpar.types.RelevesResultType import RelevesResultType
-from pygazpar.enum import NatureReleve, QualificationReleve
+from pygazpar.enum import Frequency, NatureReleve, QualificationReleve
+from pygazpar.gasday import GasDayCalendar
+from pygazpar.columns import DailyColumns, DailyReleves
+from pygazpar import profiling
 
 # ------------------------------------------------------------------------------------------------------------
 class FrequencyConverter:
@@ -27,6 +31,23 @@ class FrequencyConverter:
         "Décembre"
     ]
 
+    PERIOD_KEY_FORMATS = {
+        Frequency.MONTHLY: "%Y %m",
+        Frequency.YEARLY: "%Y"
+    }
+
+    # ------------------------------------------------------
+    @staticmethod
+    def period_key(frequency: Frequency, journee_gaziere: str) -> str:
+        """Get the key of the period a gas day belongs to (same grouping as compute_weekly/monthly/yearly).
+
+        A week is identified by its Monday (YYYY-MM-DD), so the week over new year is a single period.
+        """
+        day = datetime.strptime(journee_gaziere, FrequencyConverter.INPUT_DATE_FORMAT)
+        if frequency == Frequency.WEEKLY:
+            return (day - timedelta(days=day.weekday())).strftime(FrequencyConverter.INPUT_DATE_FORMAT)
+        return day.strftime(FrequencyConverter.PERIOD_KEY_FORMATS[frequency])
+
     # ------------------------------------------------------
     @staticmethod
     def compute_hourly(daily: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -40,30 +61,31 @@ class FrequencyConverter:
         """Compute hourly data."""
         return daily
 
+    # ------------------------------------------------------
+    @staticmethod
+    def daily_frame(daily: List[RelevesResultType]) -> pd.DataFrame:
+        """Build the DataFrame of daily readings (journeeGaziere as datetime64), from the parser columns when available."""
+        with profiling.stage("dataframe"):
+            columns = daily.columns_or_none() if isinstance(daily, DailyReleves) else None
+            if columns is None:
+                columns = DailyColumns.from_releves(daily)
+            return columns.to_frame()
+
     # ------------------------------------------------------
     @staticmethod
     def compute_weekly(daily: List[RelevesResultType]) -> List[RelevesResultType]:
         """Compute Weekly data."""
-        convertDaily = [ob.__dict__ for ob in daily]
-        df = pd.DataFrame(convertDaily)
-
-        # Trimming head and trailing spaces and convert to datetime.
-        #df["date_time"] = pd.to_datetime(df["time_period"].str.strip(), format=FrequencyConverter.OUTPUT_DATE_FORMAT)
-        df["journeeGaziere"] = pd.to_datetime(df["journeeGaziere"], format=FrequencyConverter.INPUT_DATE_FORMAT)
+        df = FrequencyConverter.daily_frame(daily)
 
-        # Get the first day of week.
+        # Get the first day of week (Monday, also for the week over new year).
+        df["dateDebutWeek"] = df["journeeGaziere"] - pd.to_timedelta(df["journeeGaziere"].dt.weekday, unit="D")
 
-        df["dateDebutReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%W %Y 1T06:00:00"), format="%W %Y %wT%H:%M:%S")
-        df["dateDebutReleve"]= df["dateDebutReleve"].dt.tz_localize("Europe/Paris")
+        df["dateDebutReleve"] = GasDayCalendar.iso_starts(df["dateDebutWeek"])
 
-        df["dateDebutWeek"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%W %Y 1"), format="%W %Y %w")
         # Get the last day of week.
+        df["dateFinWeek"] = df["dateDebutWeek"] + pd.Timedelta(days=6)
 
-        df["dateFinReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%W %Y 0T06:00:00"), format="%W %Y %wT%H:%M:%S")
-        df["dateFinReleve"]= df["dateFinReleve"].dt.tz_localize("Europe/Paris")
-        df["dateFinReleve"]= df["dateFinReleve"]+pd.Timedelta(days=1)
-
-        df["dateFinWeek"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%W %Y 0"), format="%W %Y %w")
+        df["dateFinReleve"] = GasDayCalendar.iso_starts(df["dateFinWeek"] + pd.Timedelta(days=1))
 
         # Reformat the time period.
         df["time_period"] = "Du " + df["dateDebutWeek"].dt.strftime(FrequencyConverter.OUTPUT_DATE_FORMAT).astype(str) + " au " + df["dateFinWeek"].dt.strftime(FrequencyConverter.OUTPUT_DATE_FORMAT).astype(str)
@@ -76,9 +98,6 @@ class FrequencyConverter:
 
         # Select rows where we have a full week (7 days) except for the current week.
         df = pd.concat([df[(df["count"] >= 7)], df.tail(1)[df.tail(1)["count"] < 7]])
-        
-        df['dateDebutReleve']=df['dateDebutReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
-        df['dateFinReleve']=df['dateFinReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
 
         # Select target columns.
         df = df[["time_period","dateDebutReleve","dateFinReleve", "indexDebut", "indexFin", "volumeBrutConsomme", "energieConsomme","temperature", "timestamp"]]
@@ -94,18 +113,11 @@ class FrequencyConverter:
     @staticmethod
     def compute_monthly(daily: List[RelevesResultType]) -> List[RelevesResultType]:
         """Compute Monthly data."""
-        convertDaily = [ob.__dict__ for ob in daily]
-        df = pd.DataFrame(convertDaily)
-
-        # Trimming head and trailing spaces and convert to datetime.
-        df["journeeGaziere"] = pd.to_datetime(df["journeeGaziere"], format=FrequencyConverter.INPUT_DATE_FORMAT)
-        
-        df["dateDebutReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%Y %m 01T06:00:00"), format="%Y %m %dT%H:%M:%S")
-        df["dateDebutReleve"]= df["dateDebutReleve"].dt.tz_localize("Europe/Paris")
-        
-        df["dateFinReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%Y %m 01T06:00:00"), format="%Y %m %dT%H:%M:%S")
-        df["dateFinReleve"]= df["dateFinReleve"].dt.tz_localize("Europe/Paris")
-        df["dateFinReleve"]= df["dateFinReleve"]+pd.DateOffset(months=1)
+        df = FrequencyConverter.daily_frame(daily)
+
+        first_day = df["journeeGaziere"] - pd.to_timedelta(df["journeeGaziere"].dt.day - 1, unit="D")
+        df["dateDebutReleve"] = GasDayCalendar.iso_starts(first_day)
+        df["dateFinReleve"] = GasDayCalendar.iso_starts(first_day + pd.DateOffset(months=1))
 
         # Get the corresponding month-year.
         df["month_year"] = df["journeeGaziere"].apply(lambda x: FrequencyConverter.MONTHS[x.month - 1]).astype(str) + " " + df["journeeGaziere"].dt.strftime("%Y").astype(str)
@@ -125,9 +137,6 @@ class FrequencyConverter:
 
         # Select target columns.
         df = df[["time_period","dateDebutReleve","dateFinReleve", "indexDebut", "indexFin", "volumeBrutConsomme", "energieConsomme","temperature", "timestamp"]]
-        
-        df['dateDebutReleve']=df['dateDebutReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
-        df['dateFinReleve']=df['dateFinReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
         res = cast(List[Dict[str, Any]], df.to_dict('records'))
         result = [RelevesResultType(**dict(item, **{'natureReleve':NatureReleve.INFORMATIVES.value,'qualificationReleve':QualificationReleve.ESTIME.value})) for item in res]
 
@@ -137,26 +146,18 @@ class FrequencyConverter:
     @staticmethod
     def compute_yearly(daily: List[RelevesResultType]) -> List[RelevesResultType]:
         """Compute Yearly data."""
-        convertDaily = [ob.__dict__ for ob in daily]
-        df = pd.DataFrame(convertDaily)
-
-        # Trimming head and trailing spaces and convert to datetime.
-        df["journeeGaziere"] = pd.to_datetime(df["journeeGaziere"], format=FrequencyConverter.INPUT_DATE_FORMAT)
-
-         
-        df["dateDebutReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%Y 01 01T06:00:00"), format="%Y %m %dT%H:%M:%S")
-        df["dateDebutReleve"]= df["dateDebutReleve"].dt.tz_localize("Europe/Paris")
-        
-        df["dateFinReleve"] = pd.to_datetime(df["journeeGaziere"].dt.strftime("%Y 12 01T06:00:00"), format="%Y %m %dT%H:%M:%S")
-        df["dateFinReleve"]= df["dateFinReleve"].dt.tz_localize("Europe/Paris")
-        df["dateFinReleve"]= df["dateFinReleve"]+pd.DateOffset(months=1)
+        df = FrequencyConverter.daily_frame(daily)
+
+        first_day = pd.to_datetime(df["journeeGaziere"].dt.year.astype(str) + "-01-01", format=FrequencyConverter.INPUT_DATE_FORMAT)
+        df["dateDebutReleve"] = GasDayCalendar.iso_starts(first_day)
+        df["dateFinReleve"] = GasDayCalendar.iso_starts(first_day + pd.DateOffset(years=1))
         # Get the corresponding year.
         df["year"] = df["journeeGaziere"].dt.strftime("%Y")
 
         # Aggregate rows by month_year.
-        df = df[["year", "dateDebutReleve","dateFinReleve", "indexDebut", "indexFin","volumeBrutConsomme", "energieConsomme","temperature" "timestamp"]].groupby("year").agg(start_index_m3=('indexDebut', 'min'), end_index_m3=('indexFin', 'max'), volume_m3=('volumeBrutConsomme', 'sum'), energy_kwh=('energieConsomme', 'sum'),  temperature=('temperature', 'mean'),timestamp=('timestamp', 'min'), count=('energieConsomme', 'count')).reset_index()
+        df = df[["year", "dateDebutReleve","dateFinReleve", "indexDebut", "indexFin","volumeBrutConsomme", "energieConsomme","temperature", "timestamp"]].groupby("year").agg(dateDebutReleve=('dateDebutReleve', 'min'),dateFinReleve=('dateFinReleve', 'max'), indexDebut=('indexDebut', 'min'), indexFin=('indexFin', 'max'), volumeBrutConsomme=('volumeBrutConsomme', 'sum'), energieConsomme=('energieConsomme', 'sum'),  temperature=('temperature', 'mean'),timestamp=('timestamp', 'min'), count=('energieConsomme', 'count')).reset_index()
 
-        # Sort rows by month ascending.
+        # Sort rows by year ascending.
         df = df.sort_values(by=['year'])
 
         # Select rows where we have almost a full year (more than 360) except for the current year.
@@ -167,9 +168,6 @@ class FrequencyConverter:
 
         # Select target columns.
         df = df[["time_period",  "dateDebutReleve","dateFinReleve", "indexDebut", "indexFin","volumeBrutConsomme", "energieConsomme","temperature", "timestamp"]]
-        
-        df['dateDebutReleve']=df['dateDebutReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
-        df['dateFinReleve']=df['dateFinReleve'].apply(FrequencyConverter.convert_datetime_iso_string)
         res = cast(List[Dict[str, Any]], df.to_dict('records'))
         result = [RelevesResultType(**dict(item, **{'natureReleve':NatureReleve.INFORMATIVES.value,'qualificationReleve':QualificationReleve.ESTIME.value})) for item in res]
 
@@ -0,0 +1,118 @@
+"""Support for gas day calendar."""
+from __future__ import annotations
+from typing import Dict, List, Tuple, Union
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+import logging
+import numpy as np
+import pandas as pd
+
+DayType = Union[str, date]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class GasDayCalendar:
+    """Start and end instants of gas days (06:00 Europe/Paris to 06:00 the next day).
+
+    06:00 is never in a DST transition in Europe/Paris, so the offset of a gas day start only depends on
+    whether the day is in summer time. The summer time days of each year are computed once from zoneinfo
+    and kept in a table: then any day (or any pandas column of days) is converted without a timezone lookup.
+    """
+    TIMEZONE = "Europe/Paris"
+    START_TIME = time(6, 0, 0)
+
+    # year -> (standard offset, summer offset, first summer day, first standard day after summer)
+    _table: Dict[int, Tuple[str, str, date, date]] = {}
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __format_offset(offset: timedelta) -> str:
+        minutes = int(offset.total_seconds()) // 60
+        sign = "+" if minutes >= 0 else "-"
+        return f"{sign}{abs(minutes) // 60:02d}:{abs(minutes) % 60:02d}"
+
+    # ------------------------------------------------------
+    @staticmethod
+    def year_table(year: int) -> Tuple[str, str, date, date]:
+        '''Get (standard offset, summer offset, first summer day, first standard day after summer) of a year'''
+        entry = GasDayCalendar._table.get(year)
+        if entry is None:
+            zone = ZoneInfo(GasDayCalendar.TIMEZONE)
+            first_day = date(year, 1, 1)
+            standard = datetime.combine(first_day, GasDayCalendar.START_TIME, tzinfo=zone).utcoffset()
+            summer_start = summer_end = first_day
+            summer = standard
+            day = first_day
+            while day.year == year:
+                offset = datetime.combine(day, GasDayCalendar.START_TIME, tzinfo=zone).utcoffset()
+                if offset != standard and summer_start == first_day:
+                    summer_start = day
+                    summer = offset
+                elif offset == standard and summer_start != first_day:
+                    summer_end = day
+                    break
+                day += timedelta(days=1)
+            entry = (GasDayCalendar.__format_offset(standard), GasDayCalendar.__format_offset(summer), summer_start, summer_end)  # type: ignore
+            GasDayCalendar._table[year] = entry
+        return entry
+
+    # ------------------------------------------------------
+    @staticmethod
+    def offset(day: DayType) -> str:
+        '''Get the UTC offset (+01:00) of the start of a gas day'''
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        standard, summer, summer_start, summer_end = GasDayCalendar.year_table(day.year)
+        return summer if summer_start <= day < summer_end else standard
+
+    # ------------------------------------------------------
+    @staticmethod
+    def start(day: DayType) -> str:
+        '''Get the start of a gas day as an ISO string (2022-01-01T06:00:00+01:00)'''
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        return f"{day.isoformat()}T06:00:00{GasDayCalendar.offset(day)}"
+
+    # ------------------------------------------------------
+    @staticmethod
+    def start_datetime(day: DayType) -> datetime:
+        '''Get the start of a gas day as an aware datetime (fixed offset)'''
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        return datetime.fromisoformat(GasDayCalendar.start(day))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def bounds(day: DayType) -> Tuple[str, str]:
+        '''Get the start and the end of a gas day as ISO strings'''
+        if isinstance(day, str):
+            day = date.fromisoformat(day[:10])
+        return GasDayCalendar.start(day), GasDayCalendar.start(day + timedelta(days=1))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def span(first_day: DayType, last_day: DayType) -> List[Tuple[str, str]]:
+        '''Get the start and the end of every gas day from first_day to last_day (included)'''
+        if isinstance(first_day, str):
+            first_day = date.fromisoformat(first_day[:10])
+        if isinstance(last_day, str):
+            last_day = date.fromisoformat(last_day[:10])
+        starts = [GasDayCalendar.start(first_day + timedelta(days=index)) for index in range((last_day - first_day).days + 2)]
+        return list(zip(starts[:-1], starts[1:]))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def iso_starts(days: pd.Series) -> pd.Series:
+        '''Get the start of each gas day of a datetime64 column as ISO strings'''
+        days = days.dt.normalize()
+        years = days.dt.year
+        offsets = pd.Series("", index=days.index, dtype=object)
+        for year in years.unique():
+            standard, summer, summer_start, summer_end = GasDayCalendar.year_table(int(year))
+            in_year = years == year
+            in_summer = (days >= pd.Timestamp(summer_start)) & (days < pd.Timestamp(summer_end))
+            offsets[in_year] = np.where(in_summer[in_year], summer, standard)
+        return days.dt.strftime("%Y-%m-%dT06:00:00") + offsets
+
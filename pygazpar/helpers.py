@@ -1,9 +1,52 @@
 """Support for Helper."""
-from typing import Any
+from typing import Any, Dict, IO, Tuple
 import socket
+import tempfile
 import aiohttp
-import async_timeout
 from pygazpar.exceptions import ClientAuthenticationError, ClientCommunicationError,ClientError
+from pygazpar import circuitbreaker, instrumentation
+from pygazpar.instrumentation import RequestSpan
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Downloads bigger than this are spooled to a temporary file.
+DOWNLOAD_SPOOL_SIZE = 8 * 1024 * 1024
+
+
+class EndpointTimeout:
+    """Timeouts of an endpoint in seconds (None: no limit).
+
+    connect: to get a connection, total: for the whole request including the body,
+    read_idle: between two chunks of the body.
+    """
+    def __init__(self, connect: float | None = 10, total: float | None = 10, read_idle: float | None = 10):
+        self.connect = connect
+        self.total = total
+        self.read_idle = read_idle
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        '''Get the aiohttp timeout'''
+        return aiohttp.ClientTimeout(total=self.total, sock_connect=self.connect, sock_read=self.read_idle)
+
+
+DEFAULT_TIMEOUT = EndpointTimeout()
+
+# Large multi-year exports may take minutes on slow links, as long as bytes keep coming.
+ENDPOINT_TIMEOUTS: Dict[str, EndpointTimeout] = {
+    "consommation_file": EndpointTimeout(connect=10, total=600, read_idle=30)
+}
+
+
+def get_endpoint_timeout(endpoint: str | None) -> EndpointTimeout:
+    """Get the timeouts of an endpoint."""
+    if endpoint is None:
+        return DEFAULT_TIMEOUT
+    return ENDPOINT_TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+
+
+def set_endpoint_timeout(endpoint: str, timeout: EndpointTimeout) -> None:
+    """Set the timeouts of an endpoint."""
+    ENDPOINT_TIMEOUTS[endpoint] = timeout
+
 
 async def _api_wrapper(
     session:aiohttp.ClientSession,
@@ -12,35 +55,101 @@ async def _api_wrapper(
     data: dict | None = None,
     headers: dict | None = None,
     params: dict | None = None,
+    endpoint: str | None = None,
+    pce: str | None = None,
+    attempt: int = 1,
 ) -> Any:
     """Get information from the API."""
+    # Fail fast while the endpoint family is unhealthy.
+    breaker = circuitbreaker.get_breaker(endpoint) if endpoint is not None else None
+    probe = breaker.before_call() if breaker is not None else False
+
+    span = RequestSpan(endpoint or url, method, url, pce, attempt)
+    response = None
     try:
-        async with async_timeout.timeout(10):
-            response = await session.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data,
-                params=params,
-            )
-            _verify_response_or_raise(response)
-            return response
+        response = await session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            json=data,
+            params=params,
+            timeout=get_endpoint_timeout(endpoint).client_timeout(),
+            trace_request_ctx=span,
+        )
+        _verify_response_or_raise(response)
+        span.finish(instrumentation.OUTCOME_SUCCESS, response)
+        if breaker is not None:
+            breaker.record_success()
+        return response
 
+    except ClientAuthenticationError:
+        span.finish(instrumentation.OUTCOME_AUTHENTICATION_ERROR, response)
+        if breaker is not None:
+            breaker.record_success()
+        raise
     except TimeoutError as exception:
+        span.finish(instrumentation.OUTCOME_TIMEOUT, response)
+        if breaker is not None:
+            breaker.record_failure()
         msg = f"Timeout error fetching information - {exception}"
         raise ClientCommunicationError(
             msg,
         ) from exception
     except (aiohttp.ClientError, socket.gaierror) as exception:
+        span.finish(instrumentation.OUTCOME_COMMUNICATION_ERROR, response)
+        if breaker is not None:
+            # A client error status (bad PCE, bad dates...) comes from a healthy upstream.
+            if isinstance(exception, aiohttp.ClientResponseError) and exception.status < 500 and exception.status != 429:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
         msg = f"Error fetching information - {exception}"
         raise ClientCommunicationError(
             msg,
         ) from exception
     except Exception as exception:  # pylint: disable=broad-except
+        span.finish(instrumentation.OUTCOME_ERROR, response)
+        if breaker is not None:
+            breaker.release()
         msg = f"Something really wrong happened! - {exception}"
         raise ClientError(
             msg,
         ) from exception
+    except BaseException:
+        # Cancelled (single-flight, daemon stop, wait_for): let the next request probe again.
+        if probe:
+            breaker.release()  # type: ignore
+        raise
+    finally:
+        instrumentation.emit(span)
+
+
+async def _download(response: aiohttp.ClientResponse) -> Tuple[IO[bytes], int]:
+    """Stream a response body by chunks into a spooled buffer and get it with its size."""
+    spool = tempfile.SpooledTemporaryFile(max_size=DOWNLOAD_SPOOL_SIZE)  # pylint: disable=consider-using-with
+    size = 0
+    try:
+        async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+            size += len(chunk)
+    except TimeoutError as exception:
+        spool.close()
+        msg = f"Timeout error downloading information after {size} bytes - {exception}"
+        raise ClientCommunicationError(
+            msg,
+        ) from exception
+    except aiohttp.ClientError as exception:
+        spool.close()
+        msg = f"Error downloading information after {size} bytes - {exception}"
+        raise ClientCommunicationError(
+            msg,
+        ) from exception
+    finally:
+        response.release()
+    spool.seek(0)
+    return spool, size
+
+
 def _verify_response_or_raise(response: aiohttp.ClientResponse) -> None:
     """Verify that the response is valid."""
     if response.status in (401, 403):
@@ -0,0 +1,168 @@
+"""Support for request instrumentation."""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple
+from types import SimpleNamespace
+import bisect
+import logging
+import time
+import aiohttp
+
+Logger = logging.getLogger(__name__)
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_COMMUNICATION_ERROR = "communication_error"
+OUTCOME_AUTHENTICATION_ERROR = "authentication_error"
+OUTCOME_ERROR = "error"
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class RequestSpan:
+    """Class representing one request sent to the API.
+
+    duration, dns_duration and connect_duration are in seconds. connect_duration includes the TLS
+    handshake (aiohttp does not report it separately) and both are None when a pooled connection is reused.
+    bytes is the announced Content-Length of the response (None when the body is chunked).
+    """
+    def __init__(self, endpoint: str, method: str, url: str, pce: str | None = None, attempt: int = 1):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.pce = pce
+        self.attempt = attempt
+        self.status: int | None = None
+        self.outcome: str | None = None
+        self.duration: float | None = None
+        self.dns_duration: float | None = None
+        self.connect_duration: float | None = None
+        self.bytes: int | None = None
+        self._start = time.perf_counter()
+
+    # ------------------------------------------------------
+    def finish(self, outcome: str, response: aiohttp.ClientResponse | None = None) -> None:
+        '''Close the span'''
+        self.duration = time.perf_counter() - self._start
+        self.outcome = outcome
+        if response is not None:
+            self.status = response.status
+            self.bytes = response.content_length
+
+
+RequestListener = Callable[[RequestSpan], None]
+
+_listeners: List[RequestListener] = []
+
+
+# ------------------------------------------------------
+def add_request_listener(listener: RequestListener) -> None:
+    '''Register a callback invoked with each finished RequestSpan'''
+    _listeners.append(listener)
+
+
+# ------------------------------------------------------
+def remove_request_listener(listener: RequestListener) -> None:
+    '''Unregister a callback'''
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+# ------------------------------------------------------
+def emit(span: RequestSpan) -> None:
+    '''Send a finished span to every listener'''
+    for listener in list(_listeners):
+        try:
+            listener(span)
+        except Exception:  # pylint: disable=broad-except
+            Logger.warning("Request listener failed", exc_info=True)
+
+
+# ------------------------------------------------------
+def create_trace_config() -> aiohttp.TraceConfig:
+    '''Build an aiohttp TraceConfig that fills DNS and connection timings of the RequestSpan
+    passed as trace_request_ctx'''
+
+    async def on_dns_resolvehost_start(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.dns_start = time.perf_counter()
+
+    async def on_dns_resolvehost_end(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        span = context.trace_request_ctx
+        if isinstance(span, RequestSpan) and hasattr(context, "dns_start"):
+            span.dns_duration = time.perf_counter() - context.dns_start
+
+    async def on_connection_create_start(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        context.connect_start = time.perf_counter()
+
+    async def on_connection_create_end(session: aiohttp.ClientSession, context: SimpleNamespace, params: Any) -> None:
+        span = context.trace_request_ctx
+        if isinstance(span, RequestSpan) and hasattr(context, "connect_start"):
+            span.connect_duration = time.perf_counter() - context.connect_start
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
+
+
+# ------------------------------------------------------------------------------------------------------------
+class RequestHistogram:
+    """In-memory aggregator of request spans by endpoint.
+
+    Register it with add_request_listener(histogram) and read summary() at any time.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    # ------------------------------------------------------
+    def __call__(self, span: RequestSpan) -> None:
+        self.record(span)
+
+    # ------------------------------------------------------
+    def record(self, span: RequestSpan) -> None:
+        '''Add one span to the histogram'''
+        stats = self._stats.get(span.endpoint)
+        if stats is None:
+            stats = {
+                "count": 0,
+                "total_duration": 0.0,
+                "max_duration": 0.0,
+                "bytes": 0,
+                "retries": 0,
+                "outcomes": {},
+                "buckets": [0] * (len(self.buckets) + 1)
+            }
+            self._stats[span.endpoint] = stats
+        duration = span.duration or 0.0
+        stats["count"] += 1
+        stats["total_duration"] += duration
+        stats["max_duration"] = max(stats["max_duration"], duration)
+        stats["bytes"] += span.bytes or 0
+        if span.attempt > 1:
+            stats["retries"] += 1
+        stats["outcomes"][span.outcome] = stats["outcomes"].get(span.outcome, 0) + 1
+        stats["buckets"][bisect.bisect_left(self.buckets, duration)] += 1
+
+    # ------------------------------------------------------
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        '''Get the statistics by endpoint (bucket upper bounds in seconds, last one is +inf)'''
+        res = {}
+        for endpoint, stats in self._stats.items():
+            res[endpoint] = {
+                "count": stats["count"],
+                "mean_duration": stats["total_duration"] / stats["count"],
+                "max_duration": stats["max_duration"],
+                "bytes": stats["bytes"],
+                "retries": stats["retries"],
+                "outcomes": dict(stats["outcomes"]),
+                "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+inf"], stats["buckets"]))
+            }
+        return res
+
+    # ------------------------------------------------------
+    def reset(self) -> None:
+        '''Forget all recorded spans'''
+        self._stats.clear()
@@ -1,11 +1,13 @@
 """Support for Json parser."""
 import json
 import logging
+from functools import lru_cache
 from typing import Any, List, Dict
 from datetime import datetime
 from pygazpar.enum import PropertyName
-from pygazpar.types.ConsommationType import ConsommationType
+from pygazpar.types.ConsommationType import ConsommationType, RelevesType
 from pygazpar.types.RelevesResultType import RelevesResultType
+from pygazpar.columns import DailyColumns, DailyReleves
 
 INPUT_DATE_FORMAT = "%Y-%m-%d"
 
@@ -14,6 +16,16 @@ OUTPUT_DATE_FORMAT = "%d/%m/%Y"
 Logger = logging.getLogger(__name__)
 
 
+# ------------------------------------------------------------------------------------------------------------
+@lru_cache(maxsize=16384)
+def to_output_date(day: str) -> str:
+    """Convert a YYYY-MM-DD day to DD/MM/YYYY (memoized: the same days come back for every PCE and every load)."""
+    # Slicing is much faster than strptime/strftime: only fall back to them for an unexpected layout.
+    if len(day) == 10 and day[4] == "-" and day[7] == "-":
+        return f"{day[8:10]}/{day[5:7]}/{day[0:4]}"
+    return datetime.strftime(datetime.strptime(day, INPUT_DATE_FORMAT), OUTPUT_DATE_FORMAT)
+
+
 # ------------------------------------------------------------------------------------------------------------
 class JsonParser:
     """ Class Json parser."""
@@ -21,24 +33,52 @@ class JsonParser:
     # ------------------------------------------------------
     @staticmethod
     def parse_result(data: ConsommationType, temperatures: Dict[str, Any], pce_identifier: str) -> List[RelevesResultType]:
-        """ parse Json to result."""
+        """ parse Json to result (a DailyReleves with the columns for the frequency converters)."""
 
-        res = []
+        # Timestamp of the data.
+        data_timestamp = datetime.now().isoformat()
+
+        releves = data.releves
+        days = [releve.journeeGaziere for releve in releves]
+
+        # Join the temperatures over the whole series: the releve one, else the one of its gas day.
+        if temperatures is not None and len(temperatures) > 0:
+            releve_temperatures = [releve.temperature if releve.temperature is not None else temperatures.get(day)
+                                   for releve, day in zip(releves, days)]
+        else:
+            releve_temperatures = [releve.temperature for releve in releves]
+
+        from_releve = RelevesResultType.from_releve
+        res = DailyReleves(from_releve(to_output_date(day), data_timestamp, releve, temperature)
+                           for releve, day, temperature in zip(releves, days, releve_temperatures))
+
+        columns = DailyColumns()
+        columns.extend(days, [data_timestamp] * len(days),
+                       indexDebut=[releve.indexDebut for releve in releves],
+                       indexFin=[releve.indexFin for releve in releves],
+                       volumeBrutConsomme=[releve.volumeBrutConsomme for releve in releves],
+                       energieConsomme=[releve.energieConsomme for releve in releves],
+                       temperature=releve_temperatures)
+        res.columns = columns
+
+        Logger.debug("Daily data read successfully from Json")
 
+        return res
 
+    # ------------------------------------------------------
+    @staticmethod
+    def parse_periods(releves: List[RelevesType]) -> List[RelevesResultType]:
+        """ parse releves over a period (no gas day) to result."""
 
         # Timestamp of the data.
         data_timestamp = datetime.now().isoformat()
 
-        for releve in data.releves:
-            temperature = releve.temperature
-            if temperature is None and temperatures is not None and len(temperatures) > 0:
-                temperature = temperatures.get(releve.journeeGaziere)
-            item = RelevesResultType(datetime.strftime(datetime.strptime(releve.journeeGaziere, INPUT_DATE_FORMAT),
-                                                       OUTPUT_DATE_FORMAT),data_timestamp,releve,temperature)
-            res.append(item)
+        res = []
+        for releve in releves:
+            time_period = "Du " + to_output_date(releve.dateDebutReleve[:10]) + " au " + to_output_date(releve.dateFinReleve[:10])
+            res.append(RelevesResultType.from_releve(time_period, data_timestamp, releve))
 
-        Logger.debug("Daily data read successfully from Json")
+        Logger.debug("Period data read successfully from Json")
 
         return res
  # ------------------------------------------------------
@@ -56,11 +96,10 @@ class JsonParser:
         for releve in data[pce_identifier]['releves']:
             temperature = releve['temperature']
             if temperature is None and temperatures is not None and len(temperatures) > 0:
-                releve.temperature = temperatures.get(releve['journeeGaziere'])
+                temperature = temperatures.get(releve['journeeGaziere'])
 
             item = {}
-            item[PropertyName.TIME_PERIOD.value] = datetime.strftime(
-                datetime.strptime(releve['journeeGaziere'], INPUT_DATE_FORMAT),OUTPUT_DATE_FORMAT)
+            item[PropertyName.TIME_PERIOD.value] = to_output_date(releve['journeeGaziere'])
             item[PropertyName.START_INDEX.value] = releve['indexDebut']
             item[PropertyName.END_INDEX.value] = releve['indexFin']
             item[PropertyName.VOLUME.value] = releve['volumeBrutConsomme']
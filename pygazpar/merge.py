@@ -0,0 +1,153 @@
+"""Support for Releves merge."""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import heapq
+from pygazpar.enum import NatureReleve, QualificationReleve, StatusReleve
+from pygazpar.types.ConsommationType import RelevesType
+
+QUALIFICATION_RANKS = {
+    QualificationReleve.MESURE: 3,
+    QualificationReleve.CORRIGE: 2,
+    QualificationReleve.ESTIME: 1,
+    QualificationReleve.ABSENT: 0
+}
+
+
+# ------------------------------------------------------
+def releve_key(releve: RelevesType) -> Tuple[str, str]:
+    '''Get the sortable identity of a releve: its gas day, or its (start, end) days for a period releve'''
+    if releve.journeeGaziere is not None:
+        return (releve.journeeGaziere, "")
+    return (releve.dateDebutReleve[:10], releve.dateFinReleve[:10])
+
+
+# ------------------------------------------------------
+def status_rank(releve: RelevesType) -> bool:
+    '''Definitive over provisional'''
+    return releve.status == StatusReleve.DEFINITIVE
+
+
+# ------------------------------------------------------
+def qualification_rank(releve: RelevesType) -> int:
+    '''Measured over corrected over estimated over absent'''
+    return QUALIFICATION_RANKS.get(releve.qualificationReleve, -1)  # type: ignore
+
+
+# ------------------------------------------------------
+def nature_rank(releve: RelevesType) -> bool:
+    '''Published over informative'''
+    return releve.natureReleve == NatureReleve.PUBLIEES
+
+
+# ------------------------------------------------------
+def timestamp_rank(releve: RelevesType) -> str:
+    '''Newest fetch first (RelevesResultType timestamp)'''
+    return getattr(releve, "timestamp", None) or ""
+
+
+DEFAULT_PRECEDENCE: List[Callable[[RelevesType], Any]] = [status_rank, qualification_rank, timestamp_rank]
+
+
+# ------------------------------------------------------
+def releve_values(releve: RelevesType) -> Dict[str, Any]:
+    '''Get the values of a releve which matter for a change (not the fetch timestamp)'''
+    return {name: value for name, value in vars(releve).items() if name != "timestamp"}
+
+
+# ------------------------------------------------------
+def merge_streams(streams: Iterable[List[RelevesType]],
+                  precedence: Optional[List[Callable[[RelevesType], Any]]] = None) -> List[RelevesType]:
+    '''Merge sorted releve streams in one pass and keep one releve per gas day (or period).
+
+    Among duplicates, the releve with the highest precedence tuple wins, the one of the last stream on a tie.
+    Each stream must be sorted by releve_key.
+    '''
+    return merge_changes([], streams, precedence)[0]
+
+
+# ------------------------------------------------------
+def merge_changes(previous: List[RelevesType], streams: Iterable[List[RelevesType]],
+                  precedence: Optional[List[Callable[[RelevesType], Any]]] = None) -> Tuple[List[RelevesType], List[Tuple[str, str]]]:
+    '''Merge fresh sorted streams into previous ones and get the keys of the releves which changed.
+
+    previous has the lowest priority on a tie. A key is reported when it is new or when the winning
+    releve values differ from the previous ones.
+    '''
+    if precedence is None:
+        precedence = DEFAULT_PRECEDENCE
+
+    def rank(releve: RelevesType) -> Tuple[Any, ...]:
+        return tuple(criterion(releve) for criterion in precedence)  # type: ignore
+
+    # heapq.merge is stable: on equal keys, items come in stream order.
+    def keyed(index: int, stream: List[RelevesType]) -> Iterable[Tuple[Tuple[str, str], int, RelevesType]]:
+        return ((releve_key(releve), index, releve) for releve in stream)
+
+    sources = [previous] + list(streams)
+    merged_items = heapq.merge(*[keyed(index, stream) for index, stream in enumerate(sources)], key=lambda item: item[0])
+
+    res: List[RelevesType] = []
+    changed: List[Tuple[str, str]] = []
+    current_key = None
+    best: Optional[RelevesType] = None
+    best_rank: Tuple[Any, ...] = ()
+    old: Optional[RelevesType] = None
+
+    def flush() -> None:
+        res.append(best)  # type: ignore
+        if old is None or (best is not old and releve_values(best) != releve_values(old)):  # type: ignore
+            changed.append(current_key)  # type: ignore
+
+    for key, index, releve in merged_items:
+        if key != current_key:
+            if best is not None:
+                flush()
+            current_key = key
+            best = None
+            old = None
+        if index == 0:
+            old = releve
+        candidate_rank = rank(releve)
+        if best is None or candidate_rank >= best_rank:
+            best = releve
+            best_rank = candidate_rank
+    if best is not None:
+        flush()
+
+    return res, changed
+
+
+# ------------------------------------------------------
+def merge_releves(informatives: List[RelevesType], publiees: List[RelevesType]) -> List[RelevesType]:
+    '''Merge informative and published releves in one linear pass.
+
+    When both sources have the same gas day (or period), the definitive releve is kept (status_rank),
+    else the published one (nature_rank).
+    '''
+    return merge_streams([sorted(informatives, key=releve_key), sorted(publiees, key=releve_key)], [status_rank, nature_rank])
+
+
+# ------------------------------------------------------
+def merge_periods(days: List[RelevesType], periods: List[RelevesType]) -> List[RelevesType]:
+    '''Merge period releves (published, no gas day) into gas day releves in one linear pass.
+
+    A period replaces the gas days it covers, unless one of them is definitive: the days are kept and the
+    period is dropped. Both lists must be sorted, days by gas day and periods by start.
+    '''
+    res: List[RelevesType] = []
+    index = 0
+    for period in periods:
+        start, end = period.dateDebutReleve[:10], period.dateFinReleve[:10]
+        while index < len(days) and days[index].journeeGaziere < start:  # type: ignore
+            res.append(days[index])
+            index += 1
+        covered_end = index
+        while covered_end < len(days) and days[covered_end].journeeGaziere < end:  # type: ignore
+            covered_end += 1
+        covered = days[index:covered_end]
+        if any(status_rank(day) for day in covered):
+            res.extend(covered)
+        else:
+            res.append(period)
+        index = covered_end
+    res.extend(days[index:])
+    return res
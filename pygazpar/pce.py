@@ -1,6 +1,7 @@
 """Support for PCE Methods."""
 from __future__ import annotations
 from typing import List
+import json
 import aiohttp
 from pygazpar.types.PceType import PceType
 from .helpers import _api_wrapper
@@ -17,6 +18,7 @@ class  GazparPCE:
           session=self._session,
           method="get",
           url=BASE_URL,
+          endpoint="pce_list",
           headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
           )
           results_pce=[]
@@ -33,6 +35,8 @@ class  GazparPCE:
         session=self._session,
         method="get",
         url=BASE_URL+"/"+pce+"/details",
+        endpoint="pce_details",
+        pce=pce,
         headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
         )
         if response.content_type=="application/json":
@@ -42,14 +46,19 @@ class  GazparPCE:
         return PceType(**responsejson)
     async def get_pce_meteo(self,pce:str,date_fin:str,nb_jours:int) -> any:
         """ Get PCE meteo temp data."""
+        return json.loads(await self.get_pce_meteo_payload(pce,date_fin,nb_jours))
+    async def get_pce_meteo_payload(self,pce:str,date_fin:str,nb_jours:int) -> bytes:
+        """ Get PCE meteo temp raw JSON payload."""
         response=await _api_wrapper(
         session=self._session,
         method="get",
         url=BASE_URL+"/"+pce+"/meteo",
+        endpoint="pce_meteo",
+        pce=pce,
         headers={"Content-type": "application/json","X-Requested-With": "XMLHttpRequest"},
         params={"dateFinPeriode":date_fin,"nbJours":nb_jours}
         )
         if response.content_type=="application/json":
-             return await response.json()
+             return await response.read()
         else:
              raise ClientError("Invalid response from server")
@@ -0,0 +1,117 @@
+"""Support for stage profiling."""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional
+from contextlib import contextmanager
+import time
+import tracemalloc
+
+
+# ------------------------------------------------------------------------------------------------------------
+class Profiler:
+    """Accumulate wall time and CPU time per stage.
+
+    With memory=True, tracemalloc also records for each stage its peak (the highest traced memory above
+    the stage start, nested stages included) and its retained bytes (traced memory at the end minus at
+    the start). Like CPU time, memory is process wide: it includes the allocations of concurrent tasks.
+    Tracing slows Python allocations down a lot, so memory mode is for benchmarks and investigations.
+    """
+    def __init__(self, memory: bool = False):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.memory = memory
+        # Peak trackers of the stages in progress, innermost last.
+        self.__open: List[Dict[str, int]] = []
+        self.__started_tracing = False
+
+    # ------------------------------------------------------
+    def __enter_memory(self) -> Dict[str, int]:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+        current, peak = tracemalloc.get_traced_memory()
+        # reset_peak() is global: save the peak reached so far in the enclosing stages first.
+        for frame in self.__open:
+            frame["peak"] = max(frame["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current}
+        self.__open.append(frame)
+        return frame
+
+    # ------------------------------------------------------
+    def __exit_memory(self, frame: Dict[str, int], stats: Dict[str, float]) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        frame["peak"] = max(frame["peak"], peak)
+        self.__open.remove(frame)
+        for parent in self.__open:
+            parent["peak"] = max(parent["peak"], frame["peak"])
+        tracemalloc.reset_peak()
+        stats["peak"] = max(stats.get("peak", 0), frame["peak"] - frame["start"])
+        stats["retained"] = stats.get("retained", 0) + current - frame["start"]
+
+    # ------------------------------------------------------
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        '''Measure the enclosed block under the given stage name'''
+        frame = self.__enter_memory() if self.memory else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            stats = self.stages.setdefault(name, {"count": 0, "wall": 0.0, "cpu": 0.0})
+            stats["count"] += 1
+            stats["wall"] += time.perf_counter() - wall_start
+            stats["cpu"] += time.process_time() - cpu_start
+            if frame is not None:
+                self.__exit_memory(frame, stats)
+
+    # ------------------------------------------------------
+    def stop(self) -> None:
+        '''Stop tracemalloc if this profiler started it'''
+        if self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    # ------------------------------------------------------
+    def report(self) -> str:
+        '''Format the stages as a table (CPU time is process wide, so it includes concurrent tasks)'''
+        header = f"{'stage':<24}{'count':>8}{'wall (s)':>12}{'cpu (s)':>12}"
+        if self.memory:
+            header += f"{'peak (KiB)':>14}{'retained (KiB)':>16}"
+        lines = [header]
+        for name, stats in self.stages.items():
+            line = f"{name:<24}{int(stats['count']):>8}{stats['wall']:>12.4f}{stats['cpu']:>12.4f}"
+            if self.memory:
+                line += f"{stats.get('peak', 0) / 1024:>14.1f}{stats.get('retained', 0) / 1024:>16.1f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+_profiler: Optional[Profiler] = None
+
+
+# ------------------------------------------------------
+def enable(profiler: Optional[Profiler] = None, memory: bool = False) -> Profiler:
+    '''Start recording stages into the given (or a new) profiler, with tracemalloc if memory is set'''
+    global _profiler  # pylint: disable=global-statement
+    _profiler = profiler if profiler is not None else Profiler(memory)
+    return _profiler
+
+
+# ------------------------------------------------------
+def disable() -> None:
+    '''Stop recording stages'''
+    global _profiler  # pylint: disable=global-statement
+    if _profiler is not None:
+        _profiler.stop()
+    _profiler = None
+
+
+# ------------------------------------------------------
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    '''Measure the enclosed block when profiling is enabled, do nothing otherwise'''
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.stage(name):
+            yield
@@ -0,0 +1,70 @@
+"""Support for PCE registry."""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+from pygazpar.datasource import IDataSource
+from pygazpar.types.PceType import PceType
+
+DEFAULT_PCE_TTL = 3600
+DEFAULT_PCE_CONCURRENCY = 8
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class PceRegistry:
+    """TTL cache of the PCE list and PCE details of an account.
+
+    Details of many PCE are fetched concurrently, at most max_concurrency at a time.
+    """
+    def __init__(self, datasource: IDataSource, ttl: float = DEFAULT_PCE_TTL, max_concurrency: int = DEFAULT_PCE_CONCURRENCY):
+        self.__datasource = datasource
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self._list: Optional[Tuple[float, List[PceType]]] = None
+        self._details: Dict[str, Tuple[float, PceType]] = {}
+        self._lock = asyncio.Lock()
+
+    # ------------------------------------------------------
+    def __is_fresh(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at < self.ttl
+
+    # ------------------------------------------------------
+    async def list(self, force: bool = False) -> List[PceType]:
+        '''Get the PCE of the account'''
+        async with self._lock:
+            if force or self._list is None or not self.__is_fresh(self._list[0]):
+                Logger.debug("Loading the PCE list...")
+                self._list = (time.monotonic(), await self.__datasource.list_pce())
+            return self._list[1]
+
+    # ------------------------------------------------------
+    async def details(self, pce_identifier: str, force: bool = False) -> PceType:
+        '''Get the details of one PCE'''
+        entry = self._details.get(pce_identifier)
+        if force or entry is None or not self.__is_fresh(entry[0]):
+            Logger.debug(f"Loading the details of PCE {pce_identifier}...")
+            entry = (time.monotonic(), await self.__datasource.pce_details(pce_identifier))
+            self._details[pce_identifier] = entry
+        return entry[1]
+
+    # ------------------------------------------------------
+    async def all_details(self, force: bool = False) -> Dict[str, PceType]:
+        '''Get the details of every PCE of the account'''
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded_details(pce_identifier: str) -> PceType:
+            async with semaphore:
+                return await self.details(pce_identifier, force)
+
+        pce_identifiers = [pce.pce for pce in await self.list(force)]
+        details = await asyncio.gather(*[bounded_details(pce_identifier) for pce_identifier in pce_identifiers])
+        return dict(zip(pce_identifiers, details))
+
+    # ------------------------------------------------------
+    def invalidate(self) -> None:
+        '''Forget everything loaded'''
+        self._list = None
+        self._details.clear()
@@ -0,0 +1,163 @@
+"""Support for the sharded fleet runner."""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+import os
+import time
+import zlib
+from pygazpar import profiling
+from pygazpar.cache import TokenStore, DEFAULT_TOKEN_TTL
+from pygazpar.client import DEFAULT_LAST_N_DAYS
+from pygazpar.daemon import IResultSink
+from pygazpar.enum import Frequency
+from pygazpar.fleet import FleetClient, DataSourceFactory, DEFAULT_FLEET_CONCURRENCY, DEFAULT_ACCOUNT_CONCURRENCY
+
+SUMMED_METRICS = ["accounts", "pces", "loaded", "errors", "readings", "logins", "reused_tokens", "cpu"]
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+def shard_of(username: str, shards: int) -> int:
+    '''Get the shard of an account: stable across runs, so an account always runs in the same worker'''
+    return zlib.crc32(username.encode()) % shards
+
+
+# ------------------------------------------------------------------------------------------------------------
+async def _load_shard(index: int, accounts: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    profiler = profiling.enable()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    sink: IResultSink = options["sink_factory"]()
+    token_store = TokenStore(options["state_directory"], options["token_ttl"])
+    metrics: Dict[str, Any] = {"shard": index, "pid": os.getpid(), "accounts": len(accounts)}
+    try:
+        async with FleetClient(accounts, options["concurrency"], options["account_concurrency"],
+                               datasource_factory=options["datasource_factory"], token_store=token_store) as fleet:
+            result = await fleet.load_since(options["last_n_days"], options["frequencies"])
+            readings = 0
+            for username, data_by_pce in result.data.items():
+                for pce_identifier, data in data_by_pce.items():
+                    with profiling.stage("sink"):
+                        await sink.write(username, pce_identifier, data)
+                    readings += sum(len(releves) for releves in data.values())
+            metrics.update(loaded=sum(len(data_by_pce) for data_by_pce in result.data.values()),
+                           errors=len(result.errors), readings=readings,
+                           logins=fleet.logins, reused_tokens=fleet.reused_tokens)
+            metrics["pces"] = metrics["loaded"] + metrics["errors"]
+    finally:
+        profiling.disable()
+    metrics.update(wall=time.perf_counter() - wall_start, cpu=time.process_time() - cpu_start, stages=profiler.stages)
+    return metrics
+
+
+# ------------------------------------------------------------------------------------------------------------
+def _run_shard(index: int, accounts: List[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
+    '''Worker process entry point: load the accounts of one shard with its own event loop'''
+    return asyncio.run(_load_shard(index, accounts, options))
+
+
+# ------------------------------------------------------------------------------------------------------------
+class RunnerReport:
+    '''Metrics of every shard of a run and their totals'''
+    def __init__(self, shards: List[Dict[str, Any]], wall: float):
+        self.shards = shards
+        self.wall = wall
+        self.totals: Dict[str, float] = {name: sum(shard.get(name, 0) for shard in shards) for name in SUMMED_METRICS}
+        self.failed_shards = [shard["shard"] for shard in shards if "failure" in shard]
+        # Stage statistics summed over the workers (count, wall and cpu).
+        self.stages: Dict[str, Dict[str, float]] = {}
+        for shard in shards:
+            for name, stats in shard.get("stages", {}).items():
+                total = self.stages.setdefault(name, {"count": 0, "wall": 0.0, "cpu": 0.0})
+                for key in total:
+                    total[key] += stats.get(key, 0)
+
+    # ------------------------------------------------------
+    def report(self) -> str:
+        '''Format the totals, the shards and the stages as text'''
+        totals = self.totals
+        lines = [f"{len(self.shards)} shards, {int(totals['pces'])} PCE in {self.wall:.2f}s: "
+                 f"{int(totals['loaded'])} loaded, {int(totals['errors'])} errors, {int(totals['readings'])} readings, "
+                 f"{int(totals['logins'])} logins, {int(totals['reused_tokens'])} reused tokens, {totals['cpu']:.2f}s cpu"]
+        for shard in self.shards:
+            if "failure" in shard:
+                lines.append(f"  shard {shard['shard']}: failed: {shard['failure']}")
+            else:
+                lines.append(f"  shard {shard['shard']} (pid {shard['pid']}): {shard['accounts']} accounts, "
+                             f"{shard['loaded']}/{shard['pces']} PCE, {shard['wall']:.2f}s wall, {shard['cpu']:.2f}s cpu")
+        profiler = profiling.Profiler()
+        profiler.stages = self.stages
+        lines.append(profiler.report())
+        return "\n".join(lines)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ShardedRunner:
+    """Load every PCE of many accounts with one worker process per shard of accounts.
+
+    Each worker runs its own event loop and FleetClient, so the parsing and aggregation CPU work scales
+    with the cores. Accounts are sharded by a hash of their username: the sessions of an account never
+    span several processes. The workers share a TokenStore in state_directory, so a run reuses the tokens
+    of the previous runs instead of logging in again. Only the tokens are shared: the payload and temperature
+    caches stay in the datasources of each worker and last one run, so every run fetches and parses the
+    payloads again. sink_factory (and datasource_factory) must be
+    picklable, e.g. functools.partial(JsonDirectorySink, directory): each worker builds its own sink.
+    A PCE shared by two accounts is loaded by both of them, possibly in two workers: the sinks must accept
+    it. JsonDirectorySink writes one file per account and PCE, and PartitionedSink writes parts named per
+    process, so the workers never write the same file.
+    """
+    def __init__(self, accounts: List[Dict[str, Any]], sink_factory: Callable[[], IResultSink], state_directory: str,
+                 workers: Optional[int] = None, last_n_days: int = DEFAULT_LAST_N_DAYS,
+                 frequencies: Optional[List[Frequency]] = None,
+                 concurrency: int = DEFAULT_FLEET_CONCURRENCY, account_concurrency: int = DEFAULT_ACCOUNT_CONCURRENCY,
+                 datasource_factory: Optional[DataSourceFactory] = None, token_ttl: float = DEFAULT_TOKEN_TTL):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        shards: List[List[Dict[str, Any]]] = [[] for _ in range(self.workers)]
+        for account in accounts:
+            shards[shard_of(account["username"], self.workers)].append(account)
+        self.shards = [shard for shard in shards if len(shard) > 0]
+        self.__options = {
+            "sink_factory": sink_factory,
+            "state_directory": state_directory,
+            "token_ttl": token_ttl,
+            "last_n_days": last_n_days,
+            "frequencies": frequencies if frequencies is not None else [Frequency.DAILY],
+            "concurrency": concurrency,
+            "account_concurrency": account_concurrency,
+            "datasource_factory": datasource_factory
+        }
+        # Created here so that a configuration error shows up before starting the workers.
+        TokenStore(state_directory, token_ttl)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def from_config(config: Dict[str, Any], sink_factory: Callable[[], IResultSink], state_directory: str,
+                    workers: Optional[int] = None) -> ShardedRunner:
+        '''Build a runner from a daemon configuration dictionary (see README)'''
+        frequencies = [Frequency[frequency] for frequency in config["frequencies"]] if "frequencies" in config else None
+        return ShardedRunner(config["accounts"], sink_factory, state_directory, workers,
+                             last_n_days=config.get("last_n_days", DEFAULT_LAST_N_DAYS),
+                             frequencies=frequencies,
+                             concurrency=config.get("concurrency", DEFAULT_FLEET_CONCURRENCY),
+                             account_concurrency=config.get("account_concurrency", DEFAULT_ACCOUNT_CONCURRENCY))
+
+    # ------------------------------------------------------
+    def run_once(self) -> RunnerReport:
+        '''Load every PCE once, one worker process per shard, and get the metrics of the run'''
+        start = time.perf_counter()
+        metrics = []
+        if len(self.shards) > 0:
+            with ProcessPoolExecutor(max_workers=len(self.shards)) as executor:
+                futures = [executor.submit(_run_shard, index, accounts, self.__options) for index, accounts in enumerate(self.shards)]
+                for index, future in enumerate(futures):
+                    try:
+                        metrics.append(future.result())
+                    except Exception as exception:  # pylint: disable=broad-except
+                        Logger.error(f"Shard {index} has failed", exc_info=True)
+                        metrics.append({"shard": index, "accounts": len(self.shards[index]), "failure": repr(exception)})
+        report = RunnerReport(metrics, time.perf_counter() - start)
+        Logger.info(report.report())
+        return report
@@ -0,0 +1,60 @@
+"""Support for single-flight call coalescing."""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import logging
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SingleFlight:
+    """Share one in-flight call between concurrent callers asking for the same key.
+
+    The first caller of a key starts the call in a task, the callers arriving before it completes wait
+    for the same task and get the same result (or exception). The key is forgotten as soon as the call
+    completes: nothing is cached, a later caller starts a new call.
+    A cancelled caller does not cancel the shared call as long as other callers wait for it.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.started = 0
+        self.shared = 0
+
+    # ------------------------------------------------------
+    def in_flight(self) -> int:
+        '''Get the number of calls in progress'''
+        return len(self._calls)
+
+    # ------------------------------------------------------
+    def __forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+
+    # ------------------------------------------------------
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[Any]]) -> Any:
+        '''Call function, or wait for the call in progress with the same key'''
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self.__forget(key, done))
+            self.started += 1
+        else:
+            Logger.debug(f"Joining the call in progress for {key}")
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                # Last caller gone: nobody needs the result anymore.
+                task.cancel()
+            raise
+        finally:
+            if key in self._waiters and self._calls.get(key) is task:
+                self._waiters[key] -= 1
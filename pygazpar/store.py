@@ -0,0 +1,111 @@
+"""Support for reading store."""
+from __future__ import annotations
+from typing import Dict, List, Optional, Union
+from bisect import bisect_left, bisect_right
+from datetime import date
+import logging
+from pygazpar.types.RelevesResultType import RelevesResultType
+
+Logger = logging.getLogger(__name__)
+
+DayType = Union[str, date]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class ReadingStore:
+    """Daily readings of one PCE indexed for date range queries.
+
+    Days are kept sorted with cumulative sums of energy, volume and temperature, so any range total
+    or mean temperature is two binary searches and a subtraction. Appending days after the last one
+    costs O(new days); a correction or an insertion of an older day rebuilds the sums after it.
+    Missing values count as 0 (energy, volume) or are ignored (temperature).
+    """
+    def __init__(self, daily: Optional[List[RelevesResultType]] = None):
+        self.days: List[str] = []
+        self._values: Dict[str, List[float]] = {"energy": [], "volume": [], "temperature": [], "temperature_count": []}
+        self._sums: Dict[str, List[float]] = {name: [0.0] for name in self._values}
+        if daily is not None:
+            self.add(daily)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __values(releve: RelevesResultType) -> Dict[str, float]:
+        temperature = releve.temperature
+        return {
+            "energy": float(releve.energieConsomme or 0),
+            "volume": float(releve.volumeBrutConsomme or 0),
+            "temperature": float(temperature) if temperature is not None else 0.0,
+            "temperature_count": 1.0 if temperature is not None else 0.0
+        }
+
+    # ------------------------------------------------------
+    def add(self, daily: List[RelevesResultType]) -> None:
+        '''Add or replace gas days'''
+        rebuild_from = len(self.days)
+        for releve in daily:
+            day = releve.journeeGaziere
+            if day is None:
+                continue
+            values = ReadingStore.__values(releve)
+            if len(self.days) == 0 or day > self.days[-1]:
+                self.days.append(day)
+                for name, value in values.items():
+                    self._values[name].append(value)
+                continue
+            index = bisect_left(self.days, day)
+            if index < len(self.days) and self.days[index] == day:
+                for name, value in values.items():
+                    self._values[name][index] = value
+            else:
+                self.days.insert(index, day)
+                for name, value in values.items():
+                    self._values[name].insert(index, value)
+            rebuild_from = min(rebuild_from, index)
+
+        for name, values in self._values.items():
+            sums = self._sums[name]
+            del sums[rebuild_from + 1:]
+            total = sums[rebuild_from]
+            for value in values[rebuild_from:]:
+                total += value
+                sums.append(total)
+
+    # ------------------------------------------------------
+    def __range(self, start: Optional[DayType], end: Optional[DayType]) -> tuple:
+        '''Get the [first, last) indexes of the days between start and end (included)'''
+        first = 0 if start is None else bisect_left(self.days, start.isoformat() if isinstance(start, date) else start)
+        last = len(self.days) if end is None else bisect_right(self.days, end.isoformat() if isinstance(end, date) else end)
+        return first, max(first, last)
+
+    # ------------------------------------------------------
+    def __total(self, name: str, start: Optional[DayType], end: Optional[DayType]) -> float:
+        first, last = self.__range(start, end)
+        return self._sums[name][last] - self._sums[name][first]
+
+    # ------------------------------------------------------
+    def energy(self, start: Optional[DayType] = None, end: Optional[DayType] = None) -> float:
+        '''Get the energy (kWh) consumed between two gas days (included)'''
+        return self.__total("energy", start, end)
+
+    # ------------------------------------------------------
+    def volume(self, start: Optional[DayType] = None, end: Optional[DayType] = None) -> float:
+        '''Get the volume (m3) consumed between two gas days (included)'''
+        return self.__total("volume", start, end)
+
+    # ------------------------------------------------------
+    def mean_temperature(self, start: Optional[DayType] = None, end: Optional[DayType] = None) -> Optional[float]:
+        '''Get the mean temperature between two gas days (included), None without temperature'''
+        count = self.__total("temperature_count", start, end)
+        if count == 0:
+            return None
+        return self.__total("temperature", start, end) / count
+
+    # ------------------------------------------------------
+    def count(self, start: Optional[DayType] = None, end: Optional[DayType] = None) -> int:
+        '''Get the number of gas days between two gas days (included)'''
+        first, last = self.__range(start, end)
+        return last - first
+
+    # ------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.days)
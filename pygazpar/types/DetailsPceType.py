@@ -80,13 +80,30 @@ class DetailsPce:
                  statutRestitutionContrat:str|None,
                  
                  ):
-        if not isinstance(technique, TechniquePce) and isinstance(technique, dict):
-            self.technique=TechniquePce(**technique)
-        else:
-            self.technique = technique
-        if not isinstance(contrat, ContratPce) and isinstance(contrat, dict):
-            self.contrat=ContratPce(**contrat)
-        else:
-            self.contrat = contrat
+        # Nested objects are built on first access.
+        self._technique = technique
+        self._contrat = contrat
         self.statutRestitutionTechnique = statutRestitutionTechnique
-        self.statutRestitutionContrat = statutRestitutionContrat
\ No newline at end of file
+        self.statutRestitutionContrat = statutRestitutionContrat
+
+    @property
+    def technique(self) -> TechniquePce|None:
+        """Technical data, built from the API dictionary on first access"""
+        if isinstance(self._technique, dict):
+            self._technique = TechniquePce(**self._technique)
+        return self._technique
+
+    @technique.setter
+    def technique(self, technique: TechniquePce|dict|None):
+        self._technique = technique
+
+    @property
+    def contrat(self) -> ContratPce|None:
+        """Contract, built from the API dictionary on first access"""
+        if isinstance(self._contrat, dict):
+            self._contrat = ContratPce(**self._contrat)
+        return self._contrat
+
+    @contrat.setter
+    def contrat(self, contrat: ContratPce|dict|None):
+        self._contrat = contrat
\ No newline at end of file
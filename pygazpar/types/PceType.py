@@ -80,10 +80,8 @@ class PceType:
         self.etat = etat
         self.datePremiereAccreditation = datePremiereAccreditation
         self.nomTitulaire = nomTitulaire
-        if not isinstance(details, DetailsPce) and isinstance(details, dict):
-            self.details=DetailsPce(**details)
-        else:
-            self.details = details
+        # Nested objects are built on first access.
+        self._details = details
       
         self.dateDerniereVerification = dateDerniereVerification
         self.frequenceJJ = frequenceJJ
@@ -93,9 +91,28 @@ class PceType:
         self.frequenceMMOrJJ = frequenceMMOrJJ
         self.numeroSerie = numeroSerie
         self.numeroMatricule = numeroMatricule
-        if not isinstance(contrat, ContratPce) and isinstance(contrat, dict):
-            self.contrat=ContratPce(**contrat)
-        else:
-            self.contrat = contrat
+        self._contrat = contrat
         
-        self.fullAddress = fullAddress
\ No newline at end of file
+        self.fullAddress = fullAddress
+
+    @property
+    def details(self) -> DetailsPce|None:
+        """PCE details, built from the API dictionary on first access"""
+        if isinstance(self._details, dict):
+            self._details = DetailsPce(**self._details)
+        return self._details
+
+    @details.setter
+    def details(self, details: DetailsPce|dict|None):
+        self._details = details
+
+    @property
+    def contrat(self) -> ContratPce|None:
+        """PCE contract, built from the API dictionary on first access"""
+        if isinstance(self._contrat, dict):
+            self._contrat = ContratPce(**self._contrat)
+        return self._contrat
+
+    @contrat.setter
+    def contrat(self, contrat: ContratPce|dict|None):
+        self._contrat = contrat
\ No newline at end of file
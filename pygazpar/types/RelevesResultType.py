@@ -68,6 +68,18 @@ class RelevesResultType(RelevesType):
 
         self.time_period = time_period
         self.timestamp = timestamp
+
+    @classmethod
+    def from_releve(cls, time_period: str, timestamp: str, releve: RelevesType, temperature: str|float|None = None) -> "RelevesResultType":
+        """Same as RelevesResultType(time_period, timestamp, releve, temperature), copying the attributes at once"""
+        item = cls.__new__(cls)
+        # Same attributes in the same order as __init__: the ones of the releve, then time_period and timestamp.
+        item.__dict__.update(releve.__dict__)
+        if temperature is not None:
+            item.temperature = temperature
+        item.time_period = time_period
+        item.timestamp = timestamp
+        return item
     def toJSON(self):
         return json.dumps(
             self,
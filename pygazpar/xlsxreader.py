@@ -0,0 +1,216 @@
+"""Support for XLSX reader."""
+from __future__ import annotations
+from typing import Any, Dict, IO, Optional, Set, Tuple
+import logging
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Built-in number formats which openpyxl turns into dates.
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+
+CELL_REFERENCE = re.compile(r"^([A-Z]+)(\d+)$")
+ESCAPED_CHARACTER = re.compile(r"_x([0-9A-Fa-f]{4})_")
+DATE_FORMAT_TOKENS = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+Logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class UnsupportedLayoutError(ValueError):
+    """Exception to indicate a workbook that XlsxWorksheet does not read like openpyxl."""
+
+
+# ------------------------------------------------------------------------------------------------------------
+class XlsxCell:
+    '''Read only cell (same value attribute as openpyxl)'''
+    __slots__ = ["value"]
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+# ------------------------------------------------------------------------------------------------------------
+class XlsxWorksheet:
+    """Values of the active sheet of a workbook, streamed from the XML parts of the archive.
+
+    Only values are read (no styles, no drawings), which makes it much faster than openpyxl on
+    simple exports. cell() and [] behave like the openpyxl Worksheet for value reads.
+    Workbooks with formulas or date cells raise UnsupportedLayoutError: use openpyxl for them.
+    """
+    def __init__(self, cells: Dict[Tuple[int, int], Any], max_row: int):
+        self._cells = cells
+        self.max_row = max_row
+
+    # ------------------------------------------------------
+    def cell(self, row: int, column: int) -> XlsxCell:
+        '''Get the cell at (row, column), 1-based'''
+        return XlsxCell(self._cells.get((row, column)))
+
+    # ------------------------------------------------------
+    def __getitem__(self, key: str) -> Any:
+        '''Get a cell ("D4") or a whole column ("B")'''
+        match = CELL_REFERENCE.match(key)
+        if match is not None:
+            return self.cell(int(match.group(2)), XlsxWorksheet.column_index(match.group(1)))
+        if key.isalpha():
+            column = XlsxWorksheet.column_index(key)
+            return tuple(self.cell(row, column) for row in range(1, self.max_row + 1))
+        raise KeyError(key)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def column_index(letters: str) -> int:
+        '''Convert a column name (A, B... AA) to its 1-based index'''
+        index = 0
+        for letter in letters:
+            index = index * 26 + ord(letter) - 64
+        return index
+
+    # ------------------------------------------------------
+    @staticmethod
+    def load(filename: str) -> XlsxWorksheet:
+        '''Read the active sheet of a workbook'''
+        try:
+            with zipfile.ZipFile(filename) as archive:
+                sheet_path = XlsxWorksheet.__active_sheet_path(archive)
+                shared_strings = XlsxWorksheet.__shared_strings(archive)
+                date_styles = XlsxWorksheet.__date_styles(archive)
+                with archive.open(sheet_path) as sheet:
+                    return XlsxWorksheet.__read_sheet(sheet, shared_strings, date_styles)
+        except (KeyError, zipfile.BadZipFile) as error:
+            raise UnsupportedLayoutError(f"Unreadable workbook '{filename}': {error}") from error
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __active_sheet_path(archive: zipfile.ZipFile) -> str:
+        active_tab = 0
+        sheet_ids = []
+        for _, element in iterparse(archive.open("xl/workbook.xml")):
+            if element.tag == f"{MAIN_NS}workbookView":
+                active_tab = int(element.get("activeTab", "0"))
+            elif element.tag == f"{MAIN_NS}sheet":
+                sheet_ids.append(element.get(f"{REL_NS}id"))
+
+        targets = {}
+        for _, element in iterparse(archive.open("xl/_rels/workbook.xml.rels")):
+            if element.tag == f"{PACKAGE_REL_NS}Relationship":
+                targets[element.get("Id")] = element.get("Target")
+
+        target = targets[sheet_ids[active_tab]]
+        if target.startswith("/"):
+            return target[1:]
+        return posixpath.normpath(posixpath.join("xl", target))
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __text(element: Any) -> str:
+        # Rich text runs are concatenated, phonetic runs (rPh) are ignored.
+        parts = []
+        for child in element:
+            if child.tag == f"{MAIN_NS}t":
+                parts.append(child.text or "")
+            elif child.tag == f"{MAIN_NS}r":
+                parts.append(child.findtext(f"{MAIN_NS}t") or "")
+        text = "".join(parts)
+        if "_x" in text:
+            text = ESCAPED_CHARACTER.sub(lambda match: chr(int(match.group(1), 16)), text)
+        return text
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __shared_strings(archive: zipfile.ZipFile) -> list:
+        if "xl/sharedStrings.xml" not in archive.namelist():
+            return []
+        res = []
+        for _, element in iterparse(archive.open("xl/sharedStrings.xml")):
+            if element.tag == f"{MAIN_NS}si":
+                res.append(XlsxWorksheet.__text(element))
+                element.clear()
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __date_styles(archive: zipfile.ZipFile) -> Set[int]:
+        '''Indexes of the cell styles whose number format is a date'''
+        if "xl/styles.xml" not in archive.namelist():
+            return set()
+        custom_date_formats = set()
+        res = set()
+        in_cell_xfs = False
+        index = 0
+        for event, element in iterparse(archive.open("xl/styles.xml"), events=("start", "end")):
+            if event == "start":
+                if element.tag == f"{MAIN_NS}cellXfs":
+                    in_cell_xfs = True
+                continue
+            if element.tag == f"{MAIN_NS}numFmt":
+                # Ignore quoted text, colors and conditions ([Red], "kWh"...).
+                code = re.sub(r'"[^"]*"|\[[^\]]*\]|\\.', "", element.get("formatCode", ""))
+                if DATE_FORMAT_TOKENS.search(code):
+                    custom_date_formats.add(int(element.get("numFmtId", "0")))
+            elif element.tag == f"{MAIN_NS}cellXfs":
+                in_cell_xfs = False
+            elif element.tag == f"{MAIN_NS}xf" and in_cell_xfs:
+                number_format = int(element.get("numFmtId", "0"))
+                if number_format in BUILTIN_DATE_FORMATS or number_format in custom_date_formats:
+                    res.add(index)
+                index += 1
+        return res
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __read_sheet(sheet: IO[bytes], shared_strings: list, date_styles: Set[int]) -> XlsxWorksheet:
+        cells: Dict[Tuple[int, int], Any] = {}
+        max_row = 0
+        row_number = 0
+        row_tag = f"{MAIN_NS}row"
+        for _, element in iterparse(sheet):
+            if element.tag != row_tag:
+                continue
+            row_number = int(element.get("r", row_number + 1))
+            max_row = row_number
+            column_number = 0
+            for cell in element:
+                reference = cell.get("r")
+                if reference is not None:
+                    column_number = XlsxWorksheet.column_index(reference.rstrip("0123456789"))
+                else:
+                    column_number += 1
+                # Most cells of an export only carry a style.
+                if len(cell) > 0:
+                    value = XlsxWorksheet.__value(cell, shared_strings, date_styles)
+                    if value is not None:
+                        cells[(row_number, column_number)] = value
+            element.clear()
+        return XlsxWorksheet(cells, max_row)
+
+    # ------------------------------------------------------
+    @staticmethod
+    def __value(element: Any, shared_strings: list, date_styles: Set[int]) -> Optional[Any]:
+        if element.find(f"{MAIN_NS}f") is not None:
+            raise UnsupportedLayoutError("Formula cells are not supported")
+        cell_type = element.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = element.find(f"{MAIN_NS}is")
+            return XlsxWorksheet.__text(inline) if inline is not None else None
+        raw = element.findtext(f"{MAIN_NS}v")
+        if raw is None:
+            return None
+        if cell_type == "s":
+            return shared_strings[int(raw)]
+        if cell_type == "n":
+            if int(element.get("s", "0")) in date_styles:
+                raise UnsupportedLayoutError("Date cells are not supported")
+            # Same conversion as openpyxl.
+            return float(raw) if "." in raw or "E" in raw or "e" in raw else int(raw)
+        if cell_type == "b":
+            return bool(int(raw))
+        if cell_type in ("str", "e"):
+            return raw
+        raise UnsupportedLayoutError(f"Cell type '{cell_type}' is not supported")
@@ -0,0 +1,105 @@
+"""Support for the fake datasource shared by the tests."""
+import asyncio
+from datetime import date
+from typing import List, Optional
+from pygazpar.datasource import IDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.exceptions import ClientAuthenticationError
+from pygazpar.types.PceType import PceType
+
+BROKEN_PCE = "broken"
+
+PCE_FIELDS = ["idObject", "typeObject", "role", "alias", "teleReleve", "pce", "dateActivation", "dateMhs", "dateMes", "codePostal",
+              "frequenceReleve", "etat", "datePremiereAccreditation", "nomTitulaire", "idAccreditation", "raisonSociale",
+              "denominationClient", "adresseEmailClient", "telephoneClient", "dateCreation", "dateDebutConsentement",
+              "dateFinConsentement", "dateDebutAccesDonneesConso", "dateFinAccesDonneesConso", "dateEtat", "donneesConsoPubliees",
+              "donneesConsoInformatives", "donneesContractuelles", "donneesTechniques", "parcours", "statutControlePreuves",
+              "dateLimitePreuves", "details", "dateDerniereVerification"]
+
+CONTRAT_FIELDS = ["tarifAcheminement", "carActuelle", "carFuture", "profilTypeFutur", "cja", "cjaMensuelle", "cjaJournaliere", "idCad",
+                  "nomTitulaire", "raisonSocialeTitulaire", "numeroSiretTitulaire", "dateMes", "dateMhs", "statutContractuel",
+                  "consommationJournalierePlafond", "modulationN1", "modulationN2", "modulationN3", "modulationN4", "assiette",
+                  "fournisseur", "profil", "dateDebutProfil", "dateFinProfil"]
+
+
+# ------------------------------------------------------
+def make_pce(pce_identifier: str, with_details: bool = False) -> PceType:
+    item = {field: None for field in PCE_FIELDS}
+    item["pce"] = pce_identifier
+    if with_details:
+        contrat = {field: None for field in CONTRAT_FIELDS}
+        contrat["tarifAcheminement"] = "T2"
+        item["details"] = {"technique": None, "contrat": contrat, "statutRestitutionTechnique": None, "statutRestitutionContrat": None}
+    return PceType(**item)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class FakeDataSource(IDataSource):
+    '''Serve an in-memory account and record the calls.
+
+    The constructor takes the arguments of the fleet, daemon and runner datasource factories. Loading a PCE
+    raises while the token is expired and for BROKEN_PCE; subclasses change the served data by overriding readings.
+    '''
+    def __init__(self, username: str = "username", password: str = "password", session=None,
+                 pce_identifiers: Optional[List[str]] = None, expired: bool = False, delay: float = 0):
+        self.username = username
+        self.password = password
+        self.session = session
+        self.pce_identifiers = pce_identifiers if pce_identifiers is not None else []
+        self.expired = expired
+        self.delay = delay
+        self.token: Optional[str] = None
+        self.logins = 0
+        self.list_count = 0
+        self.details_count = 0
+        self.loads: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    # ------------------------------------------------------
+    async def login(self) -> str:
+        self.logins += 1
+        self.expired = False
+        self.token = f"token of {self.username}"
+        return self.token
+
+    # ------------------------------------------------------
+    def set_token(self, token: str) -> None:
+        self.token = token
+
+    # ------------------------------------------------------
+    async def list_pce(self) -> List[PceType]:
+        self.list_count += 1
+        return [make_pce(pce_identifier) for pce_identifier in self.pce_identifiers]
+
+    # ------------------------------------------------------
+    async def pce_details(self, pce_identifier: str) -> PceType:
+        self.details_count += 1
+        await self.wait()
+        return make_pce(pce_identifier, True)
+
+    # ------------------------------------------------------
+    async def load(self, pce_identifier: str, start_date: date, end_date: date,
+                   frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
+        if self.expired:
+            raise ClientAuthenticationError("Token expired")
+        if pce_identifier == BROKEN_PCE:
+            raise ValueError("broken")
+        self.loads.append(pce_identifier)
+        await self.wait()
+        return self.readings(pce_identifier, start_date, end_date)
+
+    # ------------------------------------------------------
+    def readings(self, pce_identifier: str, start_date: date, end_date: date) -> MeterReadingsByFrequency:
+        '''Readings served by load: one daily reading naming the PCE'''
+        return {Frequency.DAILY.value: [{"pce": pce_identifier}]}
+
+    # ------------------------------------------------------
+    async def wait(self) -> None:
+        '''Simulate the network delay, tracking the calls in flight'''
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,74 @@
+import json
+import pytest
+from pygazpar.aggregator import IncrementalAggregator
+from pygazpar.enum import Frequency
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.jsonparser import JsonParser
+from pygazpar.types.ConsommationType import ConsommationType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestAggregator:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            temperatures = json.load(temperature_json_file)
+        self.daily = JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("frequency, compute", [(Frequency.WEEKLY, FrequencyConverter.compute_weekly),
+                                                    (Frequency.MONTHLY, FrequencyConverter.compute_monthly),
+                                                    (Frequency.YEARLY, FrequencyConverter.compute_yearly)])
+    def test_same_as_converter(self, frequency, compute):
+        aggregator = IncrementalAggregator(frequency)
+        aggregator.update(self.daily[:500])
+        aggregator.update(self.daily[400:])
+
+        periods = aggregator.periods()
+        expected = compute(self.daily)
+
+        assert ([period.time_period for period in periods] == [period.time_period for period in expected])
+        assert ([period.energieConsomme for period in periods] == [period.energieConsomme for period in expected])
+        assert ([period.indexFin for period in periods] == [period.indexFin for period in expected])
+        assert ([period.dateDebutReleve for period in periods] == [period.dateDebutReleve for period in expected])
+
+    # ------------------------------------------------------
+    def test_new_day_changes_last_period(self):
+        aggregator = IncrementalAggregator(Frequency.MONTHLY)
+        aggregator.update(self.daily[:-1])
+
+        changed = aggregator.update(self.daily[-2:])
+
+        assert (changed == [FrequencyConverter.period_key(Frequency.MONTHLY, self.daily[-1].journeeGaziere)])
+
+    # ------------------------------------------------------
+    def test_serialization(self):
+        aggregator = IncrementalAggregator(Frequency.WEEKLY)
+        aggregator.update(self.daily[:300])
+
+        restored = IncrementalAggregator.from_dict(json.loads(json.dumps(aggregator.to_dict())))
+        restored.update(self.daily[300:])
+        aggregator.update(self.daily[300:])
+
+        assert ([period.__dict__ for period in restored.periods()] == [period.__dict__ for period in aggregator.periods()])
+
+    # ------------------------------------------------------
+    def test_bounded_and_cached(self):
+        aggregator = IncrementalAggregator(Frequency.MONTHLY, max_periods=6)
+        aggregator.update(self.daily[:-1])
+
+        first = aggregator.periods()
+        first[0].energieConsomme = -1
+        aggregator.update(self.daily[-1:])
+        second = aggregator.periods()
+
+        # Only the last periods are kept, and the returned readings are copies.
+        expected = FrequencyConverter.compute_monthly(self.daily)[-6:]
+        assert (len(aggregator._periods) == 6)
+        assert ([period.time_period for period in second] == [period.time_period for period in expected])
+        assert ([period.energieConsomme for period in second] == [period.energieConsomme for period in expected])
+        assert (IncrementalAggregator.from_dict(aggregator.to_dict()).max_periods == 6)
@@ -0,0 +1,66 @@
+import asyncio
+import copy
+from pygazpar.changes import ChangeTracker
+from pygazpar.client import Client
+from pygazpar.enum import Frequency
+from tests.test_client_streaming import PCE_IDENTIFIER, SampleDataSource
+
+LAST_N_DAYS = 20 * 365
+
+
+class TestChanges:
+
+    # ------------------------------------------------------
+    def test_load_changes(self):
+        datasource = SampleDataSource()
+        client = Client(datasource)
+
+        async def run():
+            first, cursor = await client.load_changes(PCE_IDENTIFIER, None, LAST_N_DAYS, [Frequency.DAILY])
+            assert (len(first[Frequency.DAILY.value]) == 1096)
+
+            unchanged, second_cursor = await client.load_changes(PCE_IDENTIFIER, cursor, LAST_N_DAYS, [Frequency.DAILY])
+            assert (unchanged[Frequency.DAILY.value] == [])
+            assert (second_cursor != cursor)
+
+            # A refetch with a new timestamp only is not a change.
+            datasource.daily = [copy.copy(releve) for releve in datasource.daily]
+            for releve in datasource.daily:
+                releve.timestamp = "2030-01-01T00:00:00"
+            datasource.daily[367].energieConsomme += 1
+            added = copy.copy(datasource.daily[-1])
+            added.journeeGaziere = "2022-12-01"
+            added.time_period = "01/12/2022"
+            datasource.daily.append(added)
+
+            changes, third_cursor = await client.load_changes(PCE_IDENTIFIER, second_cursor, LAST_N_DAYS, [Frequency.DAILY])
+            assert ([releve.journeeGaziere for releve in changes[Frequency.DAILY.value]] == ["2020-12-01", "2022-12-01"])
+
+            # An outdated cursor gets everything.
+            everything, _ = await client.load_changes(PCE_IDENTIFIER, cursor, LAST_N_DAYS, [Frequency.DAILY])
+            assert (len(everything[Frequency.DAILY.value]) == 1097)
+
+        asyncio.run(run())
+
+    # ------------------------------------------------------
+    def test_tracker(self):
+        tracker = ChangeTracker()
+        other = ChangeTracker()
+        data = {"monthly": [{"time_period": "Mai 2019", "energy_kwh": 918.0, "temperature": float("nan"), "timestamp": "1"}]}
+
+        _, cursor = tracker.diff("1", data)
+        changes, cursor = tracker.diff("1", {"monthly": [dict(data["monthly"][0], timestamp="2")]}, cursor)
+        assert (changes == {"monthly": []})
+
+        # Frequencies not loaded keep their snapshot.
+        changes, cursor = tracker.diff("1", {"daily": []}, cursor)
+        changes, cursor = tracker.diff("1", data, cursor)
+        assert (changes == {"monthly": []})
+
+        # Cursors are per PCE and per tracker.
+        assert (len(tracker.diff("2", data, cursor)[0]["monthly"]) == 1)
+        assert (len(other.diff("1", data, cursor)[0]["monthly"]) == 1)
+
+        tracker.forget("1")
+        assert (tracker.cursor("1") is None)
+        assert (len(tracker.diff("1", data, cursor)[0]["monthly"]) == 1)
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+import aiohttp
+from aiohttp import web
+from pygazpar import circuitbreaker
+from pygazpar.circuitbreaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from pygazpar.exceptions import CircuitOpenError, ClientCommunicationError
+from pygazpar.helpers import _api_wrapper
+
+
+class TestCircuitBreaker:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        circuitbreaker.reset()
+
+    # ------------------------------------------------------
+    def teardown_method(self):
+        circuitbreaker.configure()
+        circuitbreaker.reset()
+
+    # ------------------------------------------------------
+    def test_states(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, cooldown=0)
+
+        breaker.before_call()
+        breaker.record_failure()
+        assert (breaker.state == STATE_CLOSED)
+        breaker.before_call()
+        breaker.record_failure()
+        assert (breaker.state == STATE_OPEN)
+
+        # Cooldown elapsed: one probe only.
+        breaker.before_call()
+        assert (breaker.state == STATE_HALF_OPEN)
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+        assert (breaker.state == STATE_OPEN)
+
+        breaker.before_call()
+        breaker.record_success()
+        assert (breaker.state == STATE_CLOSED)
+        assert (breaker.snapshot() == {"state": STATE_CLOSED, "failures": 0, "rejected": 1, "open_for": None})
+
+    # ------------------------------------------------------
+    def test_api_wrapper_fails_fast(self):
+        circuitbreaker.configure(failure_threshold=3, cooldown=60)
+        calls = []
+
+        async def unavailable(request):
+            calls.append(request.path)
+            return web.Response(status=503)
+
+        async def not_found(request):
+            calls.append(request.path)
+            return web.Response(status=404)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/consommation", unavailable)
+            app.router.add_get("/pce", not_found)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            errors = []
+            try:
+                async with aiohttp.ClientSession() as session:
+                    for path, endpoint in [("/consommation", "consommation")] * 5 + [("/pce", "pce_list")] * 5:
+                        try:
+                            await _api_wrapper(session=session, method="get", url=f"http://127.0.0.1:{port}{path}", endpoint=endpoint)
+                        except ClientCommunicationError as error:
+                            errors.append(type(error))
+            finally:
+                await runner.cleanup()
+            return errors
+
+        errors = asyncio.run(run())
+
+        assert (calls.count("/consommation") == 3)
+        assert (errors[:5] == [ClientCommunicationError] * 3 + [CircuitOpenError] * 2)
+        # 4xx come from a healthy upstream: the pce circuit stays closed.
+        assert (calls.count("/pce") == 5)
+        states = circuitbreaker.states()
+        assert (states["consommation"]["state"] == STATE_OPEN)
+        assert (states["consommation"]["rejected"] == 2)
+        assert (states["pce"]["state"] == STATE_CLOSED)
+
+    # ------------------------------------------------------
+    def test_cancelled_probe(self):
+        circuitbreaker.configure(failure_threshold=1, cooldown=0)
+        breaker = circuitbreaker.get_breaker("consommation")
+        breaker.record_failure()
+        assert (breaker.state == STATE_OPEN)
+
+        async def slow(request):
+            await asyncio.sleep(1)
+            return web.Response(status=200)
+
+        async def ok(request):
+            return web.Response(status=200)
+
+        async def run():
+            app = web.Application()
+            app.router.add_get("/slow", slow)
+            app.router.add_get("/ok", ok)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                async with aiohttp.ClientSession() as session:
+                    # The probe is cancelled: it says nothing about the upstream health.
+                    with pytest.raises(asyncio.TimeoutError):
+                        await asyncio.wait_for(_api_wrapper(session=session, method="get", url=f"http://127.0.0.1:{port}/slow",
+                                                            endpoint="consommation"), 0.1)
+                    assert (breaker.state == STATE_HALF_OPEN and not breaker.probing)
+                    await _api_wrapper(session=session, method="get", url=f"http://127.0.0.1:{port}/ok", endpoint="consommation")
+            finally:
+                await runner.cleanup()
+
+        asyncio.run(run())
+
+        assert (breaker.state == STATE_CLOSED)
@@ -0,0 +1,91 @@
+import asyncio
+import json
+from datetime import date
+from typing import List
+from pygazpar.client import Client
+from pygazpar.datasource import JsonWebDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.jsonparser import JsonParser
+from pygazpar.types.ConsommationType import ConsommationType
+from tests.fakes import FakeDataSource
+from tests.test_merge import NoMeteoPce, RoleConsommation
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SampleDataSource(FakeDataSource):
+    '''Serve the Json sample files filtered by date range'''
+    def __init__(self):
+        super().__init__(pce_identifiers=[PCE_IDENTIFIER])
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            temperatures = json.load(temperature_json_file)
+        self.daily = JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+    def readings(self, pce_identifier: str, start_date: date, end_date: date) -> MeterReadingsByFrequency:
+        return {Frequency.DAILY.value: [releve for releve in self.daily
+                                        if start_date.isoformat() <= releve.journeeGaziere <= end_date.isoformat()]}
+
+
+class TestClientStreaming:
+
+    # ------------------------------------------------------
+    def __collect(self, client: Client, start_date: date, end_date: date, frequencies: List[Frequency], window_days: int):
+
+        async def collect():
+            return [item async for item in client.iter_releves(PCE_IDENTIFIER, start_date, end_date, frequencies, window_days)]
+
+        return asyncio.run(collect())
+
+    # ------------------------------------------------------
+    def test_daily_by_window(self):
+        datasource = SampleDataSource()
+        client = Client(datasource)
+
+        items = self.__collect(client, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY], 30)
+
+        assert (len(items) == 366)
+        assert (len(datasource.loads) == 13)
+        assert ([releve.journeeGaziere for _, releve in items] == sorted(releve.journeeGaziere for _, releve in items))
+
+    # ------------------------------------------------------
+    def test_aggregated_periods(self):
+        datasource = SampleDataSource()
+        client = Client(datasource)
+
+        items = self.__collect(client, date(2020, 1, 1), date(2020, 12, 31), [Frequency.MONTHLY, Frequency.YEARLY], 45)
+
+        monthly = [releve for frequency, releve in items if frequency == Frequency.MONTHLY]
+        yearly = [releve for frequency, releve in items if frequency == Frequency.YEARLY]
+        expected = FrequencyConverter.compute_monthly([releve for releve in datasource.daily if releve.journeeGaziere.startswith("2020")])
+
+        assert ([releve.time_period for releve in monthly] == [releve.time_period for releve in expected])
+        assert ([releve.energieConsomme for releve in monthly] == [releve.energieConsomme for releve in expected])
+        assert (len(yearly) == 1)
+        assert (yearly[0].energieConsomme == sum(releve.energieConsomme for releve in monthly))
+
+    # ------------------------------------------------------
+    def test_merged_published(self):
+
+        async def collect():
+            dataSource = JsonWebDataSource("username", "password", merge_published=True)
+            dataSource._auth_token = "token"
+            dataSource._conso = RoleConsommation()
+            dataSource._pce = NoMeteoPce()
+            try:
+                return [item async for item in Client(dataSource).iter_releves(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31),
+                                                                               [Frequency.DAILY, Frequency.MONTHLY], 366)]
+            finally:
+                await dataSource.close()
+
+        items = asyncio.run(collect())
+
+        # The published periods are streamed with the daily readings but not aggregated.
+        daily = [releve for frequency, releve in items if frequency == Frequency.DAILY]
+        monthly = [releve for frequency, releve in items if frequency == Frequency.MONTHLY]
+        assert (sum(1 for releve in daily if releve.journeeGaziere is None) == 87)
+        days = [releve for releve in daily if releve.journeeGaziere is not None]
+        assert (len(monthly) == len(FrequencyConverter.compute_monthly(days)))
@@ -0,0 +1,59 @@
+import json
+import pickle
+import pandas as pd
+from pygazpar.columns import DailyColumns, DailyReleves
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.jsonparser import JsonParser
+from pygazpar.types.ConsommationType import ConsommationType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestColumns:
+
+    # ------------------------------------------------------
+    def __daily(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            temperatures = json.load(temperature_json_file)
+        return JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+    # ------------------------------------------------------
+    def test_dtypes(self):
+        columns = DailyColumns()
+        columns.append("2020-01-01", "t", indexDebut=1, indexFin=2, volumeBrutConsomme=1.5, energieConsomme=None, temperature=3)
+        columns.extend(["2020-01-02"], ["t"], indexDebut=[2], indexFin=[4], volumeBrutConsomme=[2], energieConsomme=[20], temperature=[None])
+
+        df = columns.to_frame()
+
+        assert (str(df["journeeGaziere"].dtype) == "datetime64[ns]")
+        assert (df["journeeGaziere"][1] == pd.Timestamp("2020-01-02"))
+        assert (str(df["indexDebut"].dtype) == "int64" and str(df["indexFin"].dtype) == "int64")
+        assert (str(df["volumeBrutConsomme"].dtype) == "float64")
+        assert (df["energieConsomme"].isna().tolist() == [True, False])
+        assert (str(df["temperature"].dtype) == "float64")
+        assert (len(DailyColumns().to_frame()) == 0)
+
+    # ------------------------------------------------------
+    def test_parser_columns(self):
+        daily = self.__daily()
+
+        assert (isinstance(daily, DailyReleves) and daily.columns_or_none() is not None)
+        from_parser = FrequencyConverter.daily_frame(daily)
+        from_releves = FrequencyConverter.daily_frame(list(daily))
+        pd.testing.assert_frame_equal(from_parser, from_releves)
+
+        # Same through a process pool.
+        assert (len(pickle.loads(pickle.dumps(daily)).columns_or_none()) == len(daily))
+
+    # ------------------------------------------------------
+    def test_mutation_drops_columns(self):
+        daily = self.__daily()
+        daily.append(daily[0])
+        assert (daily.columns_or_none() is None)
+
+        daily = self.__daily()
+        daily[0] = daily[1]
+        assert (daily.columns_or_none() is None)
+        assert (FrequencyConverter.daily_frame(daily)["journeeGaziere"][0] == pd.Timestamp(daily[1].journeeGaziere))
@@ -0,0 +1,73 @@
+import asyncio
+import json
+from typing import List
+from pygazpar.daemon import JsonDirectorySink, PollingDaemon
+from tests.fakes import FakeDataSource
+
+
+# ------------------------------------------------------------------------------------------------------------
+class CountingDataSource(FakeDataSource):
+    '''Expire the token once, remember the instances'''
+    instances: List["CountingDataSource"] = []
+
+    def __init__(self, username: str, password: str):
+        super().__init__(username, password, expired=True)
+        CountingDataSource.instances.append(self)
+
+
+class TestDaemon:
+
+    # ------------------------------------------------------
+    def test_run_once(self, tmp_path):
+        CountingDataSource.instances = []
+        accounts = [
+            {"username": "a", "password": "p", "pces": ["1", "2"]},
+            {"username": "b", "password": "p", "pces": [{"pce": "3", "interval": 60}]}
+        ]
+        daemon = PollingDaemon(accounts, JsonDirectorySink(str(tmp_path)), datasource_factory=CountingDataSource)
+
+        async def run():
+            await daemon.run_once()
+            await daemon.run_once()
+
+        asyncio.run(run())
+
+        assert (len(CountingDataSource.instances) == 2)
+        assert ([datasource.logins for datasource in CountingDataSource.instances] == [1, 1])
+        assert (sorted(CountingDataSource.instances[0].loads) == ["1", "1", "2", "2"])
+        assert ([job.interval for job in daemon.jobs] == [3600, 3600, 60])
+        assert (sum(job.errors for job in daemon.jobs) == 0)
+        with open(tmp_path / "b" / "3.json") as json_file:
+            assert (json.load(json_file) == {"daily": [{"pce": "3"}]})
+
+    # ------------------------------------------------------
+    def test_json_directory_sink(self, tmp_path):
+        sink = JsonDirectorySink(str(tmp_path))
+
+        async def run():
+            await sink.write("a@mail.com", "1", {"daily": [{"account": "a"}]})
+            await sink.write("b/c@mail.com", "1", {"daily": [{"account": "b"}]})
+
+        asyncio.run(run())
+
+        # Same PCE in two accounts: one file each.
+        with open(tmp_path / "a@mail.com" / "1.json") as json_file:
+            assert (json.load(json_file) == {"daily": [{"account": "a"}]})
+        with open(tmp_path / "b_c@mail.com" / "1.json") as json_file:
+            assert (json.load(json_file) == {"daily": [{"account": "b"}]})
+
+    # ------------------------------------------------------
+    def test_run_until_stopped(self, tmp_path):
+        CountingDataSource.instances = []
+        accounts = [{"username": "a", "password": "p", "interval": 0.05, "pces": ["1"]}]
+        daemon = PollingDaemon(accounts, JsonDirectorySink(str(tmp_path)), datasource_factory=CountingDataSource)
+
+        async def run():
+            task = asyncio.create_task(daemon.run())
+            await asyncio.sleep(0.3)
+            daemon.stop()
+            await task
+
+        asyncio.run(run())
+
+        assert (daemon.jobs[0].polls >= 3)
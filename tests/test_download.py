@@ -0,0 +1,83 @@
+import asyncio
+import aiohttp
+import pytest
+from aiohttp import web
+from pygazpar import circuitbreaker, helpers
+from pygazpar.cache import PayloadCache
+from pygazpar.consommation import GazparConsommation
+from pygazpar.enum import ConsommationRole, Frequency
+from pygazpar.exceptions import ClientCommunicationError
+from pygazpar.helpers import EndpointTimeout
+
+CHUNK = b"x" * 100000
+
+
+class TestDownload:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        self.timeouts = dict(helpers.ENDPOINT_TIMEOUTS)
+        circuitbreaker.reset()
+
+    # ------------------------------------------------------
+    def teardown_method(self):
+        helpers.ENDPOINT_TIMEOUTS.clear()
+        helpers.ENDPOINT_TIMEOUTS.update(self.timeouts)
+        circuitbreaker.reset()
+
+    # ------------------------------------------------------
+    async def __download(self, pause: float, stream: bool = True):
+
+        async def telecharger(request):
+            response = web.StreamResponse(headers={"Content-Disposition": "attachment; filename=Donnees.xlsx",
+                                                   "Content-Type": "application/octet-stream"})
+            await response.prepare(request)
+            for _ in range(10):
+                await response.write(CHUNK)
+                await asyncio.sleep(pause)
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_get("/api/e-conso/pce/consommation/informatives/telecharger", telecharger)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        try:
+            async with aiohttp.ClientSession(base_url=f"http://127.0.0.1:{port}") as session:
+                conso = GazparConsommation(session)
+                download = conso.stream_consommation_file if stream else conso.get_consommation_file
+                return await download("123", "2020-01-01", "2021-01-01", ConsommationRole.INFORMATIVES, Frequency.DAILY)
+        finally:
+            await runner.cleanup()
+
+    # ------------------------------------------------------
+    def test_streamed(self, monkeypatch):
+        monkeypatch.setattr("pygazpar.consommation.BASE_URL", "/api/e-conso/pce/consommation/")
+        monkeypatch.setattr(helpers, "DOWNLOAD_SPOOL_SIZE", 250000)
+        # Longer than the total timeout of the other endpoints, but bytes keep coming.
+        helpers.set_endpoint_timeout("consommation_file", EndpointTimeout(connect=1, total=10, read_idle=0.5))
+        monkeypatch.setattr(helpers, "DEFAULT_TIMEOUT", EndpointTimeout(total=0.2))
+
+        res = asyncio.run(self.__download(0.05))
+
+        assert (res["filename"] == "Donnees.xlsx")
+        assert (res["size"] == 10 * len(CHUNK))
+        with res["content"] as content:
+            assert (content._rolled)
+            assert (PayloadCache.digest_file(content, res["size"]) == PayloadCache.digest(CHUNK * 10))
+            assert (content.read() == CHUNK * 10)
+
+        # Bytes for the callers of get_consommation_file.
+        res = asyncio.run(self.__download(0, False))
+        assert (res == {"filename": "Donnees.xlsx", "content": CHUNK * 10})
+
+    # ------------------------------------------------------
+    def test_read_idle_timeout(self, monkeypatch):
+        monkeypatch.setattr("pygazpar.consommation.BASE_URL", "/api/e-conso/pce/consommation/")
+        helpers.set_endpoint_timeout("consommation_file", EndpointTimeout(connect=1, total=10, read_idle=0.1))
+
+        with pytest.raises(ClientCommunicationError):
+            asyncio.run(self.__download(0.5))
@@ -0,0 +1,48 @@
+import asyncio
+import shutil
+from pygazpar.datasource import ExcelDirectoryDataSource
+from pygazpar.enum import Frequency
+from pygazpar.excelparser import ExcelParser
+
+SAMPLES = {Frequency.DAILY: "tests/resources/Donnees_informatives_PCE_DAILY.xlsx",
+           Frequency.WEEKLY: "tests/resources/Donnees_informatives_PCE_WEEKLY.xlsx",
+           Frequency.MONTHLY: "tests/resources/Donnees_informatives_PCE_MONTHLY.xlsx"}
+
+
+class TestExcelBulk:
+
+    # ------------------------------------------------------
+    def test_parse_many(self, tmp_path):
+        for frequency, sample in SAMPLES.items():
+            (tmp_path / frequency.value).mkdir()
+            for pce_identifier in ["00000000000001", "00000000000002"]:
+                shutil.copy(sample, tmp_path / frequency.value / f"{pce_identifier}.xlsx")
+
+        res = ExcelParser.parse_many(ExcelParser.expand(str(tmp_path / "*" / "*.xlsx")), max_workers=2)
+
+        assert (sorted(res) == ["00000000000001", "00000000000002"])
+        assert (len(res["00000000000001"][Frequency.DAILY.value]) == 363)
+        assert (len(res["00000000000002"][Frequency.WEEKLY.value]) == 53)
+        assert (len(res["00000000000002"][Frequency.MONTHLY.value]) == 13)
+
+    # ------------------------------------------------------
+    def test_detect_frequency(self, tmp_path):
+        for frequency, sample in SAMPLES.items():
+            shutil.copy(sample, tmp_path / f"{frequency.value}.xlsx")
+
+        res = ExcelParser.parse_many(ExcelParser.expand(str(tmp_path)), max_workers=1)
+
+        assert (len(res["daily"][Frequency.DAILY.value]) == 363)
+        assert (len(res["weekly"][Frequency.WEEKLY.value]) == 53)
+        assert (len(res["monthly"][Frequency.MONTHLY.value]) == 13)
+
+    # ------------------------------------------------------
+    def test_datasource(self, tmp_path):
+        shutil.copy(SAMPLES[Frequency.DAILY], tmp_path / "00000000000001.xlsx")
+        datasource = ExcelDirectoryDataSource(str(tmp_path))
+
+        data = asyncio.run(datasource.load("00000000000001", None, None, [Frequency.DAILY, Frequency.YEARLY, Frequency.MONTHLY]))
+
+        assert (len(data[Frequency.DAILY.value]) == 363)
+        assert (len(data[Frequency.YEARLY.value]) > 0)
+        assert (data[Frequency.MONTHLY.value] == [])
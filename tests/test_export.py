@@ -0,0 +1,73 @@
+import asyncio
+import json
+import os
+import threading
+from pygazpar.enum import Frequency
+from pygazpar.export import PartitionedSink, PartitionedWriter
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.jsonparser import JsonParser
+from pygazpar.types.ConsommationType import ConsommationType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestExport:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        self.daily = JsonParser.parse_result(data, {}, PCE_IDENTIFIER)
+
+    # ------------------------------------------------------
+    def test_partitions(self, tmp_path):
+        writer = PartitionedWriter(str(tmp_path), "csv")
+
+        writer.write(PCE_IDENTIFIER, {Frequency.DAILY.value: self.daily, Frequency.MONTHLY.value: FrequencyConverter.compute_monthly(self.daily)})
+
+        months = os.listdir(tmp_path / "frequency=daily" / f"pce={PCE_IDENTIFIER}")
+        assert (len(months) == 37)
+        assert ("month=2020-01" in months)
+        df = writer.read(Frequency.DAILY.value, PCE_IDENTIFIER)
+        assert (len(df) == 1096)
+        assert (list(df["journeeGaziere"]) == [releve.journeeGaziere for releve in self.daily])
+        assert (df["natureReleve"][0] == "Informative Journalier")
+        assert (len(writer.read(Frequency.MONTHLY.value, PCE_IDENTIFIER)) == 36)
+
+    # ------------------------------------------------------
+    def test_append_and_compact(self, tmp_path):
+        writer = PartitionedWriter(str(tmp_path), "csv", compact_threshold=3)
+        path = writer.partition_path(Frequency.DAILY.value, PCE_IDENTIFIER, "2022-11")
+        last_month = [releve for releve in self.daily if releve.journeeGaziere.startswith("2022-11")]
+
+        # Each poll rewrites the last days, the last version of a reading wins.
+        for energy in range(3):
+            for releve in last_month:
+                releve.energieConsomme = energy
+            writer.write(PCE_IDENTIFIER, {Frequency.DAILY.value: last_month})
+        assert (len(writer.parts(path)) == 3)
+
+        writer.write(PCE_IDENTIFIER, {Frequency.DAILY.value: last_month[:5]})
+        assert (len(writer.parts(path)) == 1)
+
+        df = writer.read_partition(path)
+        assert (len(df) == len(last_month))
+        assert (list(df["energieConsomme"]) == [2] * len(last_month))
+
+    # ------------------------------------------------------
+    def test_sink(self, tmp_path):
+        sink = PartitionedSink(str(tmp_path), "csv")
+
+        threads = []
+        write = sink.writer.write
+
+        def recording_write(pce_identifier, data):
+            threads.append(threading.get_ident())
+            return write(pce_identifier, data)
+
+        sink.writer.write = recording_write
+        asyncio.run(sink.write("user", PCE_IDENTIFIER, {Frequency.DAILY.value: self.daily[:40]}))
+
+        assert (len(sink.writer.read(Frequency.DAILY.value, PCE_IDENTIFIER)) == 40)
+        # Written off the event loop.
+        assert (threads != [threading.get_ident()] and len(threads) == 1)
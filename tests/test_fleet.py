@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from datetime import date
+from typing import List
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.enum import ConsommationRole
+from pygazpar.exceptions import ClientAuthenticationError
+from pygazpar.fleet import FleetClient
+from pygazpar.types.PceType import PceType
+from tests.fakes import FakeDataSource
+
+
+class AccountDataSource(FakeDataSource):
+    '''Serve the accounts of a fleet, recording the loads across the accounts'''
+    running = 0
+    max_running = 0
+    order: List[str] = []
+
+    def __init__(self, username: str, password: str, session):
+        super().__init__(username, password, session, pce_identifiers=["d1", "d2"], expired=username == "expired", delay=0.01)
+
+    async def list_pce(self) -> List[PceType]:
+        if self.username == "unlisted":
+            raise ClientAuthenticationError("Invalid password")
+        return await super().list_pce()
+
+    async def load(self, pce_identifier, start_date, end_date, frequencies=None):
+        AccountDataSource.running += 1
+        AccountDataSource.max_running = max(AccountDataSource.max_running, AccountDataSource.running)
+        try:
+            res = await super().load(pce_identifier, start_date, end_date, frequencies)
+        finally:
+            AccountDataSource.running -= 1
+        AccountDataSource.order.append(self.username)
+        return res
+
+    def readings(self, pce_identifier, start_date, end_date):
+        return {"daily": [f"{self.username}/{pce_identifier}"]}
+
+
+class ExpiredConsommation:
+    '''Reject every consumption request as unauthenticated'''
+    def __init__(self):
+        self.calls = 0
+
+    async def get_consommation_payload(self, pce, date_debut, date_fin, type_conso, attempt=1) -> bytes:
+        self.calls += 1
+        raise ClientAuthenticationError("Invalid credentials")
+
+
+class TestFleet:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        AccountDataSource.running = 0
+        AccountDataSource.max_running = 0
+        AccountDataSource.order = []
+
+    # ------------------------------------------------------
+    def test_load_since(self):
+        accounts = [
+            {"username": "big", "password": "p1", "pces": [f"b{index}" for index in range(10)]},
+            {"username": "small", "password": "p2", "pces": ["s1", {"pce": "s2"}]},
+            {"username": "discovered", "password": "p3"},
+            {"username": "expired", "password": "p4", "pces": ["e1", "broken"]}
+        ]
+
+        async def run():
+            async with FleetClient(accounts, concurrency=3, account_concurrency=1, datasource_factory=AccountDataSource) as fleet:
+                result = await fleet.load_since(30)
+                datasources = {username: fleet.client(username)._Client__datasource for username in fleet.usernames}
+                connector = fleet._connector
+            assert (connector.closed)
+            return result, datasources
+
+        result, datasources = asyncio.run(run())
+
+        assert (result.data["big"]["b3"] == {"daily": ["big/b3"]})
+        assert (sorted(result.data["small"]) == ["s1", "s2"])
+        assert (sorted(result.data["discovered"]) == ["d1", "d2"])
+        assert (result.data["expired"]["e1"] == {"daily": ["expired/e1"]})
+        assert (list(result.errors) == [("expired", "broken")])
+        assert (datasources["expired"].logins >= 1)
+
+        # One cookie jar per account over the same connector.
+        sessions = [datasource.session for datasource in datasources.values()]
+        assert (len({id(session.cookie_jar) for session in sessions}) == 4)
+        assert (len({id(session.connector) for session in sessions}) == 1)
+
+        # Bounded, and the small accounts are not queued behind the big one.
+        assert (AccountDataSource.max_running <= 3)
+        assert (AccountDataSource.order.index("small") < 3 and AccountDataSource.order[6:].count("big") >= 5)
+
+    # ------------------------------------------------------
+    def test_load_since_with_failed_listing(self):
+        accounts = [{"username": "unlisted", "password": "p1"}, {"username": "healthy", "password": "p2"}]
+
+        async def run():
+            async with FleetClient(accounts, datasource_factory=AccountDataSource) as fleet:
+                return await fleet.load_since(30)
+
+        result = asyncio.run(run())
+
+        assert (sorted(result.data["healthy"]) == ["d1", "d2"])
+        assert ("unlisted" not in result.data)
+        assert (list(result.errors) == [("unlisted", "*")])
+        assert (isinstance(result.errors[("unlisted", "*")], ClientAuthenticationError))
+
+    # ------------------------------------------------------
+    def test_login_all(self):
+
+        class FailingDataSource(AccountDataSource):
+            async def login(self) -> str:
+                if self.password == "wrong":
+                    raise ClientAuthenticationError("Invalid password")
+                return await super().login()
+
+        accounts = [{"username": "a", "password": "p", "pces": []}, {"username": "b", "password": "wrong", "pces": []}]
+
+        async def run():
+            async with FleetClient(accounts, datasource_factory=FailingDataSource) as fleet:
+                return await fleet.login_all()
+
+        errors = asyncio.run(run())
+
+        assert (errors["a"] is None)
+        assert (isinstance(errors["b"], ClientAuthenticationError))
+
+    # ------------------------------------------------------
+    def test_authentication_error_not_retried(self):
+        conso = ExpiredConsommation()
+
+        async def run():
+            dataSource = JsonWebDataSource("username", "password")
+            dataSource._conso = conso
+            try:
+                await dataSource._load_payload("pce", date(2020, 1, 1), date(2020, 12, 31), ConsommationRole.INFORMATIVES)
+            finally:
+                await dataSource.close()
+
+        # Raised at once, so that the fleet logs in again instead of waiting for the retries.
+        with pytest.raises(ClientAuthenticationError):
+            asyncio.run(run())
+        assert (conso.calls == 1)
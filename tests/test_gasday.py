@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+import pandas as pd
+from pygazpar.gasday import GasDayCalendar
+
+
+class TestGasDay:
+
+    # ------------------------------------------------------
+    def test_same_as_zoneinfo(self):
+        zone = ZoneInfo("Europe/Paris")
+        for first, last in GasDayCalendar.span(date(2019, 1, 1), date(2024, 12, 31)):
+            day = date.fromisoformat(first[:10])
+            assert (first == datetime(day.year, day.month, day.day, 6, tzinfo=zone).isoformat())
+            assert (last[:10] > first[:10])
+
+    # ------------------------------------------------------
+    def test_dst_bounds(self):
+        assert (GasDayCalendar.bounds("2021-03-27") == ("2021-03-27T06:00:00+01:00", "2021-03-28T06:00:00+02:00"))
+        assert (GasDayCalendar.bounds(date(2021, 10, 30)) == ("2021-10-30T06:00:00+02:00", "2021-10-31T06:00:00+01:00"))
+        assert (GasDayCalendar.start_datetime("2021-07-01").utcoffset().total_seconds() == 7200)
+
+    # ------------------------------------------------------
+    def test_iso_starts(self):
+        days = pd.Series(pd.date_range("2020-01-01", "2022-12-31", freq="D"))
+
+        starts = GasDayCalendar.iso_starts(days)
+
+        assert (list(starts) == [GasDayCalendar.start(day.date()) for day in days])
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import date
+import pytest
+import aiohttp
+from aiohttp import web
+from pygazpar import datasource, instrumentation
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.enum import ConsommationRole
+from pygazpar.exceptions import ClientAuthenticationError
+from pygazpar.helpers import _api_wrapper
+from pygazpar.instrumentation import RequestHistogram, RequestSpan
+
+
+class TestInstrumentation:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        self.spans = []
+        instrumentation.add_request_listener(self.spans.append)
+
+    # ------------------------------------------------------
+    def teardown_method(self):
+        instrumentation.remove_request_listener(self.spans.append)
+
+    # ------------------------------------------------------
+    async def __request(self, path: str, histogram: RequestHistogram):
+
+        async def ok(request):
+            return web.json_response({"value": 1})
+
+        async def forbidden(request):
+            return web.Response(status=403)
+
+        app = web.Application()
+        app.router.add_get("/ok", ok)
+        app.router.add_get("/forbidden", forbidden)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        instrumentation.add_request_listener(histogram)
+        try:
+            async with aiohttp.ClientSession(trace_configs=[instrumentation.create_trace_config()]) as session:
+                response = await _api_wrapper(session=session, method="get", url=f"http://127.0.0.1:{port}{path}",
+                                              endpoint="test", pce="123", attempt=2)
+                return await response.json()
+        finally:
+            instrumentation.remove_request_listener(histogram)
+            await runner.cleanup()
+
+    # ------------------------------------------------------
+    def test_success_span(self):
+        histogram = RequestHistogram()
+
+        data = asyncio.run(self.__request("/ok", histogram))
+
+        assert (data == {"value": 1})
+        assert (len(self.spans) == 1)
+        span = self.spans[0]
+        assert (span.endpoint == "test" and span.pce == "123" and span.attempt == 2)
+        assert (span.status == 200)
+        assert (span.outcome == instrumentation.OUTCOME_SUCCESS)
+        assert (span.bytes == len(b'{"value": 1}'))
+        assert (span.connect_duration is not None)
+        summary = histogram.summary()["test"]
+        assert (summary["count"] == 1 and summary["retries"] == 1)
+        assert (sum(summary["buckets"].values()) == 1)
+
+    # ------------------------------------------------------
+    def test_authentication_error_span(self):
+        histogram = RequestHistogram()
+
+        with pytest.raises(ClientAuthenticationError):
+            asyncio.run(self.__request("/forbidden", histogram))
+
+        assert (self.spans[0].status == 403)
+        assert (histogram.summary()["test"]["outcomes"] == {instrumentation.OUTCOME_AUTHENTICATION_ERROR: 1})
+
+    # ------------------------------------------------------
+    def test_histogram_buckets(self):
+        histogram = RequestHistogram(buckets=(0.1, 1.0))
+        for duration in (0.05, 0.5, 5.0):
+            span = RequestSpan("test", "get", "http://localhost")
+            span.finish(instrumentation.OUTCOME_SUCCESS)
+            span.duration = duration
+            histogram.record(span)
+
+        assert (histogram.summary()["test"]["buckets"] == {"0.1": 1, "1.0": 1, "+inf": 1})
+
+    # ------------------------------------------------------
+    def test_retry_attempts(self, monkeypatch):
+        attempts = []
+
+        class FailingConsommation:
+            async def get_consommation_payload(self, pce, date_debut, date_fin, type_conso, attempt=1) -> bytes:
+                attempts.append(attempt)
+                raise ValueError("unavailable")
+
+        async def no_sleep(delay):
+            pass
+
+        monkeypatch.setattr(datasource, "MAX_ATTEMPTS", 3)
+        monkeypatch.setattr(datasource.asyncio, "sleep", no_sleep)
+
+        async def run():
+            dataSource = JsonWebDataSource("username", "password")
+            dataSource._conso = FailingConsommation()
+            try:
+                await dataSource._load_payload("pce", date(2020, 1, 1), date(2020, 12, 31), ConsommationRole.INFORMATIVES)
+            finally:
+                await dataSource.close()
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+        # The attempt number of the spans follows the retry loop.
+        assert (attempts == [1, 2, 3])
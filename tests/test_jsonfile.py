@@ -0,0 +1,57 @@
+import asyncio
+import json
+import pytest
+from pygazpar.datasource import JsonFileDataSource
+from pygazpar.enum import Frequency
+from pygazpar.types.RelevesResultType import RelevesResultType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestJsonFile:
+
+    # ------------------------------------------------------
+    def test_typed(self):
+        dataSource = JsonFileDataSource("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json")
+
+        data = asyncio.run(dataSource.load(PCE_IDENTIFIER, None, None, [Frequency.DAILY, Frequency.MONTHLY]))
+
+        assert (len(data[Frequency.DAILY.value]) == 1096)
+        assert (isinstance(data[Frequency.DAILY.value][0], RelevesResultType))
+        assert (data[Frequency.DAILY.value][367].temperature == 7.6)
+        assert (len(data[Frequency.MONTHLY.value]) == 36)
+
+    # ------------------------------------------------------
+    def test_archive(self, tmp_path):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            dump = json.load(consumption_json_file)
+        releves = dump[PCE_IDENTIFIER]["releves"]
+
+        # Two overlapping dumps of the PCE, a dump of another PCE, and a corrected gas day in the last dump.
+        (tmp_path / "conso").mkdir()
+        first = {PCE_IDENTIFIER: dict(dump[PCE_IDENTIFIER], releves=releves[:600])}
+        second = {PCE_IDENTIFIER: dict(dump[PCE_IDENTIFIER], releves=[dict(releve) for releve in releves[500:]])}
+        second[PCE_IDENTIFIER]["releves"][0]["energieConsomme"] = 999
+        other = {"00000000000000": dump[PCE_IDENTIFIER]}
+        for name, content in [("2021-01-01.json", first), ("2022-01-01.json", second), ("2022-01-02.json", other)]:
+            with open(tmp_path / "conso" / name, "w") as dump_file:
+                json.dump(content, dump_file)
+        (tmp_path / "meteo").mkdir()
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            with open(tmp_path / "meteo" / f"{PCE_IDENTIFIER}_2022-01-01.json", "w") as dump_file:
+                dump_file.write(temperature_json_file.read())
+
+        dataSource = JsonFileDataSource(str(tmp_path / "conso"), str(tmp_path / "meteo"))
+        daily = asyncio.run(dataSource.load(PCE_IDENTIFIER, None, None, [Frequency.DAILY]))[Frequency.DAILY.value]
+
+        assert (len(daily) == 1096)
+        assert ([releve.journeeGaziere for releve in daily] == sorted(releve["journeeGaziere"] for releve in releves))
+        assert (daily[500].energieConsomme == 999)
+        assert (daily[367].temperature == 7.6)
+
+    # ------------------------------------------------------
+    def test_unknown_pce(self):
+        dataSource = JsonFileDataSource("tests/resources/donnees_informatives.json", None)
+
+        with pytest.raises(ValueError):
+            asyncio.run(dataSource.load("00000000000000", None, None, [Frequency.DAILY]))
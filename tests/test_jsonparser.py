@@ -0,0 +1,52 @@
+import json
+from pygazpar.frequency import FrequencyConverter
+from pygazpar.jsonparser import JsonParser, to_output_date
+from pygazpar.types.ConsommationType import ConsommationType
+from pygazpar.types.RelevesResultType import RelevesResultType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestJsonParser:
+
+    # ------------------------------------------------------
+    def test_to_output_date(self):
+        assert (to_output_date("2020-12-01") == "01/12/2020")
+        # Unexpected layouts go through strptime.
+        assert (to_output_date("2020-1-5") == "05/01/2020")
+
+    # ------------------------------------------------------
+    def test_parse_result(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            temperatures = json.load(temperature_json_file)
+        data.releves[0].temperature = 42.0
+
+        res = JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+        assert (len(res) == 1096)
+        assert (res[0].temperature == 42.0)
+        assert (res[367].journeeGaziere == "2020-12-01" and res[367].time_period == "01/12/2020")
+        assert (res[367].temperature == 7.6)
+        # Same attributes, in the same order, as the constructor.
+        expected = RelevesResultType(res[367].time_period, res[367].timestamp, data.releves[367], 7.6)
+        assert (list(vars(res[367]).items()) == list(vars(expected).items()))
+
+        without_temperatures = JsonParser.parse_result(data, {}, PCE_IDENTIFIER)
+        assert (without_temperatures[367].temperature is None)
+
+    # ------------------------------------------------------
+    def test_parse_result_without_temperature_dump(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        for releve in data.releves:
+            releve.temperature = 10.0
+
+        for temperatures in [None, {}]:
+            res = JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+            # The columns keep the temperatures of the releves, like the readings.
+            monthly = FrequencyConverter.compute_monthly(res)
+            assert (monthly[0].temperature == 10.0)
+            assert ([vars(item) for item in monthly] == [vars(item) for item in FrequencyConverter.compute_monthly(list(res))])
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from datetime import date
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.enum import ConsommationRole, Frequency, NatureReleve, QualificationReleve, StatusReleve
+from pygazpar.merge import merge_changes, merge_periods, merge_releves, merge_streams
+from pygazpar.types.ConsommationType import RelevesType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------
+def make_releve(journee_gaziere: str, energy: float, nature: NatureReleve, status: StatusReleve | None = None) -> RelevesType:
+    return RelevesType(dateDebutReleve=f"{journee_gaziere}T06:00:00+00:00", dateFinReleve=f"{journee_gaziere}T06:00:00+00:00",
+                       indexDebut=0, indexFin=0, volumeBrutConsomme=energy / 10, energieConsomme=energy,
+                       natureReleve=nature, qualificationReleve=QualificationReleve.MESURE,
+                       journeeGaziere=journee_gaziere, status=status)
+
+
+# ------------------------------------------------------------------------------------------------------------
+class RoleConsommation:
+    '''Serve the informative and published Json samples as raw payloads'''
+    def __init__(self):
+        self.payloads = {}
+        for role, filename in ((ConsommationRole.INFORMATIVES, "donnees_informatives.json"), (ConsommationRole.PUBLIEES, "donnees_publiees.json")):
+            with open(f"tests/resources/{filename}", "rb") as json_file:
+                self.payloads[role] = json_file.read()
+        self.roles = []
+
+    async def get_consommation_payload(self, pce, date_debut, date_fin, type_conso, attempt=1) -> bytes:
+        self.roles.append(type_conso)
+        return self.payloads[type_conso]
+
+
+# ------------------------------------------------------------------------------------------------------------
+class NoMeteoPce:
+    '''Return no temperature'''
+    async def get_pce_meteo(self, pce, date_fin, nb_jours):
+        return {}
+
+
+class TestMerge:
+
+    # ------------------------------------------------------
+    def test_precedence(self):
+        informatives = [make_releve("2022-01-01", 10, NatureReleve.INFORMATIVES),
+                        make_releve("2022-01-02", 20, NatureReleve.INFORMATIVES, StatusReleve.DEFINITIVE),
+                        make_releve("2022-01-04", 40, NatureReleve.INFORMATIVES)]
+        publiees = [make_releve("2022-01-01", 11, NatureReleve.PUBLIEES, StatusReleve.DEFINITIVE),
+                    make_releve("2022-01-02", 21, NatureReleve.PUBLIEES, StatusReleve.PROVISOIRE),
+                    make_releve("2022-01-03", 31, NatureReleve.PUBLIEES)]
+
+        merged = merge_releves(informatives, publiees)
+
+        assert ([releve.journeeGaziere for releve in merged] == ["2022-01-01", "2022-01-02", "2022-01-03", "2022-01-04"])
+        assert ([releve.energieConsomme for releve in merged] == [11, 20, 31, 40])
+
+    # ------------------------------------------------------
+    def test_jsonweb_merge_published(self):
+
+        async def load():
+            dataSource = JsonWebDataSource("username", "password", merge_published=True)
+            dataSource._auth_token = "token"
+            dataSource._conso = RoleConsommation()
+            dataSource._pce = NoMeteoPce()
+            try:
+                data = await dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY])
+            finally:
+                await dataSource.close()
+            return data, dataSource._conso.roles
+
+        data, roles = asyncio.run(load())
+
+        assert (sorted(roles) == [ConsommationRole.INFORMATIVES, ConsommationRole.PUBLIEES])
+        assert (ConsommationRole.PUBLIEES.value not in data)
+        daily = data[Frequency.DAILY.value]
+        # The published periods replace the informative days they cover, the days after the last one stay.
+        periods = [releve for releve in daily if releve.journeeGaziere is None]
+        days = [releve for releve in daily if releve.journeeGaziere is not None]
+        assert (len(periods) == 87)
+        assert (periods[0].time_period == "Du 10/10/2017 au 09/04/2018")
+        assert (days[0].journeeGaziere == "2022-11-03" and days[-1].journeeGaziere == "2022-11-29")
+        assert (daily[-len(days) - 1].time_period == "Du 01/11/2022 au 03/11/2022")
+        with open("tests/resources/donnees_publiees.json") as json_file:
+            assert (sum(releve.energieConsomme for releve in periods) == sum(releve["energieConsomme"] for releve in json.load(json_file)[PCE_IDENTIFIER]["releves"]))
+        # The aggregations still come from every gas day.
+        assert (len(data[Frequency.MONTHLY.value]) == 36)
+
+    # ------------------------------------------------------
+    def test_streams_precedence(self):
+        cached = [make_releve("2022-01-01", 10, NatureReleve.INFORMATIVES, StatusReleve.DEFINITIVE),
+                  make_releve("2022-01-02", 20, NatureReleve.INFORMATIVES),
+                  make_releve("2022-01-03", 30, NatureReleve.INFORMATIVES)]
+        fresh = [make_releve("2022-01-01", 11, NatureReleve.INFORMATIVES, StatusReleve.PROVISOIRE),
+                 make_releve("2022-01-02", 21, NatureReleve.INFORMATIVES),
+                 make_releve("2022-01-03", 30, NatureReleve.INFORMATIVES),
+                 make_releve("2022-01-04", 40, NatureReleve.INFORMATIVES)]
+        fresh[1].qualificationReleve = QualificationReleve.ESTIME
+        newest = [make_releve("2022-01-03", 31, NatureReleve.INFORMATIVES)]
+
+        merged, changed = merge_changes(cached, [fresh, newest])
+
+        # Definitive beats provisional, measured beats estimated, the last stream wins a tie.
+        assert ([releve.energieConsomme for releve in merged] == [10, 20, 31, 40])
+        assert (changed == [("2022-01-03", ""), ("2022-01-04", "")])
+
+    # ------------------------------------------------------
+    def test_streams_unchanged(self):
+        cached = [make_releve("2022-01-01", 10, NatureReleve.INFORMATIVES)]
+        fresh = [make_releve("2022-01-01", 10, NatureReleve.INFORMATIVES)]
+
+        merged, changed = merge_changes(cached, [fresh])
+
+        assert (merged[0] is fresh[0])
+        assert (changed == [])
+        assert (merge_streams([fresh, cached])[0] is cached[0])
+
+    # ------------------------------------------------------
+    def test_periods(self):
+        days = [make_releve(f"2022-01-0{day}", day, NatureReleve.INFORMATIVES) for day in range(1, 8)]
+        days[5].status = StatusReleve.DEFINITIVE
+
+        def period(start: str, end: str, energy: float) -> RelevesType:
+            releve = make_releve(start, energy, NatureReleve.PUBLIEES)
+            releve.journeeGaziere = None
+            releve.dateFinReleve = f"{end}T06:00:00+00:00"
+            return releve
+
+        periods = [period("2021-12-01", "2022-01-03", 100), period("2022-01-04", "2022-01-06", 200), period("2022-01-06", "2022-01-08", 300)]
+
+        merged = merge_periods(days, periods)
+
+        # The last period covers a definitive day: the days are kept.
+        assert ([releve.energieConsomme for releve in merged] == [100, 3, 200, 6, 7])
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from datetime import date
+from pygazpar.cache import PayloadCache
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.enum import Frequency
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SampleConsommation:
+    '''Serve the Json consumption sample as raw payload'''
+    def __init__(self):
+        with open("tests/resources/donnees_informatives.json", "rb") as consumption_json_file:
+            self.payload = consumption_json_file.read()
+
+    async def get_consommation_payload(self, pce, date_debut, date_fin, type_conso, attempt=1) -> bytes:
+        return self.payload
+
+
+# ------------------------------------------------------------------------------------------------------------
+class SamplePce:
+    '''Serve the Json temperature sample as raw payload'''
+    def __init__(self):
+        with open("tests/resources/temperatures.json", "rb") as temperature_json_file:
+            self.payload = temperature_json_file.read()
+
+        self.requests = []
+
+    async def get_pce_meteo(self, pce, date_fin, nb_jours):
+        self.requests.append((date_fin, nb_jours))
+        return json.loads(self.payload)
+
+
+class TestPayloadCache:
+
+    # ------------------------------------------------------
+    def test_digest_match(self):
+        cache = PayloadCache(max_entries=2)
+        cache.put("a", PayloadCache.digest(b"1"), "parsed a")
+
+        assert (cache.get("a", PayloadCache.digest(b"1")) == "parsed a")
+        assert (cache.get("a", PayloadCache.digest(b"2")) is None)
+        assert (PayloadCache.digest(b"ab", b"c") != PayloadCache.digest(b"a", b"bc"))
+
+    # ------------------------------------------------------
+    def test_bounded(self):
+        cache = PayloadCache(max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, "digest", key)
+
+        assert (len(cache) == 2)
+        assert (cache.get("a", "digest") is None)
+        assert (cache.get("c", "digest") == "c")
+
+    # ------------------------------------------------------
+    def test_jsonweb_reuse(self):
+
+        async def load_twice():
+            dataSource = JsonWebDataSource("username", "password")
+            dataSource._auth_token = "token"
+            dataSource._conso = SampleConsommation()
+            dataSource._pce = SamplePce()
+            try:
+                first = await dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY])
+                # Changing a result does not change the cached one.
+                first_energy = first[Frequency.MONTHLY.value][0].energieConsomme
+                first[Frequency.MONTHLY.value][0].energieConsomme = -1
+                first[Frequency.DAILY.value].clear()
+                second = await dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY])
+                second[Frequency.MONTHLY.value].pop()
+                hits = dataSource._payload_cache.hits
+                third = await dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY])
+                dataSource._conso.payload = dataSource._conso.payload.replace(b'"energieConsomme": 75', b'"energieConsomme": 76')
+                changed = await dataSource.load(PCE_IDENTIFIER, date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY])
+            finally:
+                await dataSource.close()
+            return first_energy, second, changed, third, hits, dataSource._pce.requests
+
+        first_energy, second, changed, third, hits, meteo_requests = asyncio.run(load_twice())
+
+        assert (hits == 1)
+        assert (len(second[Frequency.DAILY.value]) == 1096)
+        assert (second[Frequency.MONTHLY.value][0].energieConsomme == first_energy)
+        assert (len(third[Frequency.MONTHLY.value]) == len(second[Frequency.MONTHLY.value]) + 1)
+        assert (changed[Frequency.MONTHLY.value][0].energieConsomme != first_energy)
+        assert (changed[Frequency.DAILY.value][0].energieConsomme == 76)
+        assert (meteo_requests == [("2020-12-31", 366)])
+        assert (second[Frequency.DAILY.value][367].temperature == 7.6)
@@ -0,0 +1,76 @@
+import pytest
+from pygazpar import profiling
+from pygazpar import __main__ as pygazpar_main
+from pygazpar.enum import Frequency
+from pygazpar.datasource import ExcelFileDataSource, JsonFileDataSource
+import asyncio
+import sys
+import tracemalloc
+from datetime import date
+
+
+class TestProfiling:
+
+    # ------------------------------------------------------
+    def teardown_method(self):
+        profiling.disable()
+
+    # ------------------------------------------------------
+    def test_stages(self):
+        profiler = profiling.enable()
+
+        dataSource = ExcelFileDataSource("tests/resources/Donnees_informatives_PCE_DAILY.xlsx")
+        asyncio.run(dataSource.load("xxx", date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.YEARLY]))
+
+        assert (profiler.stages["xlsx_parse"]["count"] == 2)
+        assert (profiler.stages["compute_yearly"]["count"] == 1)
+        assert (profiler.stages["xlsx_parse"]["wall"] > 0)
+        assert ("compute_yearly" in profiler.report())
+
+    # ------------------------------------------------------
+    def test_disabled(self):
+        profiler = profiling.enable(memory=True)
+        profiling.disable()
+
+        # Nothing is recorded any more, and tracemalloc is stopped.
+        with profiling.stage("nothing"):
+            pass
+        assert (profiler.stages == {})
+        assert (not tracemalloc.is_tracing())
+
+    # ------------------------------------------------------
+    def test_main_error(self, tmp_path, monkeypatch):
+
+        async def failing_load_since(*args, **kwargs):
+            raise ValueError("broken")
+
+        monkeypatch.setattr(pygazpar_main.Client, "load_since", failing_load_since)
+        monkeypatch.setattr(sys, "argv", ["pygazpar", "-u", "user", "-p", "password", "-c", "pce", "-t", str(tmp_path),
+                                          "--datasource", "test", "--profile-memory", "--profile-output", str(tmp_path / "stats")])
+
+        with pytest.raises(SystemExit) as exit_info:
+            pygazpar_main.run()
+        assert (exit_info.value.code == 1)
+
+        # The profilers are stopped on the error path too.
+        assert (profiling._profiler is None)
+        assert (not tracemalloc.is_tracing())
+        assert (sys.getprofile() is None)
+
+    # ------------------------------------------------------
+    def test_memory(self):
+        profiler = profiling.enable(memory=True)
+
+        dataSource = JsonFileDataSource("tests/resources/donnees_informatives.json", "tests/resources/temperatures.json")
+        asyncio.run(dataSource.load("22423299474865", date(2020, 1, 1), date(2020, 12, 31), [Frequency.DAILY, Frequency.MONTHLY]))
+
+        assert (tracemalloc.is_tracing())
+        for name in ["json_decode", "consommation_type", "parse_result", "dataframe"]:
+            assert (profiler.stages[name]["peak"] > 0)
+        # Nested stages count in the peak of their enclosing stage.
+        assert (profiler.stages["json_parse"]["peak"] >= profiler.stages["json_decode"]["peak"])
+        assert (profiler.stages["compute_monthly"]["peak"] >= profiler.stages["dataframe"]["peak"])
+        assert ("peak (KiB)" in profiler.report())
+
+        profiling.disable()
+        assert (not tracemalloc.is_tracing())
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from datetime import date
+from typing import List, Optional
+from pygazpar.client import Client
+from pygazpar.datasource import IDataSource, MeterReadingsByFrequency
+from pygazpar.enum import Frequency
+from pygazpar.types.ContratType import ContratPce
+from pygazpar.types.DetailsPceType import DetailsPce
+from pygazpar.types.PceType import PceType
+from tests.fakes import FakeDataSource, make_pce
+
+
+class TestRegistry:
+
+    # ------------------------------------------------------
+    def test_cached_and_bounded(self):
+        datasource = FakeDataSource(pce_identifiers=[f"{index:014d}" for index in range(20)], delay=0.01)
+        client = Client(datasource, pce_max_concurrency=4)
+
+        async def load():
+            first = await client.load_pce_registry(with_details=True)
+            second = await client.load_pce_registry(with_details=True)
+            return first, second
+
+        first, second = asyncio.run(load())
+
+        assert (list(first) == datasource.pce_identifiers)
+        assert (second == first)
+        assert (datasource.list_count == 1)
+        assert (datasource.details_count == 20)
+        assert (datasource.max_in_flight == 4)
+
+    # ------------------------------------------------------
+    def test_expired(self):
+        datasource = FakeDataSource(pce_identifiers=["1", "2"])
+        client = Client(datasource, pce_ttl=0)
+
+        async def load():
+            await client.load_pce_registry()
+            await client.load_pce_registry()
+
+        asyncio.run(load())
+
+        assert (datasource.list_count == 2)
+
+    # ------------------------------------------------------
+    def test_lazy_details(self):
+        pce = make_pce("00000000000000", True)
+
+        assert (isinstance(pce._details, dict))
+        assert (isinstance(pce.details, DetailsPce))
+        assert (isinstance(pce.details.contrat, ContratPce))
+        assert (pce.details.contrat.tarifAcheminement == "T2")
+        assert (pce.contrat is None)
+
+    # ------------------------------------------------------
+    def test_datasource_without_details(self):
+
+        class LegacyDataSource(IDataSource):
+            '''Datasource written before pce_details'''
+            async def login(self) -> str:
+                return "token"
+
+            async def list_pce(self) -> List[PceType]:
+                return []
+
+            async def load(self, pce_identifier: str, start_date: date, end_date: date,
+                           frequencies: Optional[List[Frequency]] = None) -> MeterReadingsByFrequency:
+                return {}
+
+        datasource = LegacyDataSource()
+
+        with pytest.raises(NotImplementedError):
+            asyncio.run(datasource.pce_details("1"))
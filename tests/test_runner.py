@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import json
+import os
+import aiohttp
+from yarl import URL
+from pygazpar.cache import TokenStore
+from pygazpar.daemon import JsonDirectorySink
+from pygazpar.export import PartitionedSink
+from pygazpar.datasource import JsonWebDataSource
+from pygazpar.runner import ShardedRunner, shard_of
+from tests.fakes import FakeDataSource
+
+
+class TokenDataSource(FakeDataSource):
+    '''Serve one daily reading per PCE, the token being restored or obtained by login'''
+    def readings(self, pce_identifier, start_date, end_date):
+        assert self.token == f"token of {self.username}"
+        return {"daily": [{"pce": pce_identifier, "pid": os.getpid()}]}
+
+
+class PeriodDataSource(FakeDataSource):
+    '''Serve the same daily reading of a PCE to every account'''
+    def readings(self, pce_identifier, start_date, end_date):
+        return {"daily": [{"pce": pce_identifier, "dateDebutReleve": "2023-01-01T06:00:00+01:00", "energieConsomme": 10}]}
+
+
+class TestRunner:
+
+    # ------------------------------------------------------
+    def test_run_once(self, tmp_path):
+        accounts = [{"username": f"user{index}@mail", "password": "p", "pces": [f"{index}-a", f"{index}-b"]} for index in range(6)]
+        accounts[0]["pces"].append("broken")
+        runner = ShardedRunner(accounts, functools.partial(JsonDirectorySink, str(tmp_path / "out")), str(tmp_path / "state"),
+                               workers=2, datasource_factory=TokenDataSource)
+
+        assert (sorted(len(shard) for shard in runner.shards) == sorted([sum(1 for account in accounts if shard_of(account["username"], 2) == index) for index in range(2)]))
+
+        report = runner.run_once()
+
+        assert (report.failed_shards == [])
+        assert (report.totals["pces"] == 13 and report.totals["loaded"] == 12 and report.totals["errors"] == 1)
+        assert (report.totals["logins"] == 6 and report.totals["reused_tokens"] == 0)
+        assert (report.stages["sink"]["count"] == 12)
+        assert ("reused tokens" in report.report())
+        written = sorted(os.path.relpath(os.path.join(path, filename), tmp_path / "out")
+                         for path, _, filenames in os.walk(tmp_path / "out") for filename in filenames)
+        assert (written == sorted(f"user{index}@mail/{index}-{suffix}.json" for index in range(6) for suffix in "ab"))
+        pids = {json.load(open(tmp_path / "out" / filename))["daily"][0]["pid"] for filename in written}
+        assert (len(pids) == len(runner.shards) and os.getpid() not in pids)
+
+        # The next run reuses the stored tokens.
+        report = runner.run_once()
+        assert (report.totals["logins"] == 0 and report.totals["reused_tokens"] == 6)
+
+    # ------------------------------------------------------
+    def test_shared_pce(self, tmp_path):
+        # Two accounts of the same PCE, in different shards.
+        accounts = [{"username": "owner@mail", "password": "p", "pces": ["shared"]},
+                    {"username": "tenant@mail", "password": "p", "pces": ["shared"]}]
+        assert (shard_of("owner@mail", 2) != shard_of("tenant@mail", 2))
+        runner = ShardedRunner(accounts, functools.partial(PartitionedSink, str(tmp_path / "out"), "csv"), str(tmp_path / "state"),
+                               workers=2, datasource_factory=PeriodDataSource)
+
+        report = runner.run_once()
+
+        assert (report.failed_shards == [] and report.totals["loaded"] == 2)
+        sink = PartitionedSink(str(tmp_path / "out"), "csv")
+        path = sink.writer.partition_path("daily", "shared", "2023-01")
+        assert (len(sink.writer.parts(path)) == 2)
+        assert (len(sink.writer.read("daily", "shared")) == 1)
+
+    # ------------------------------------------------------
+    def test_token_store(self, tmp_path):
+        store = TokenStore(str(tmp_path), ttl=60)
+        assert (store.get("a@mail") is None)
+        store.put("a@mail", "token")
+        assert (store.get("a@mail") == "token")
+        # Private to the user.
+        assert (os.stat(tmp_path).st_mode & 0o777 == 0o700)
+        assert ([os.stat(tmp_path / name).st_mode & 0o777 for name in os.listdir(tmp_path)] == [0o600])
+        assert (TokenStore(str(tmp_path), ttl=0).get("a@mail") is None)
+        store.invalidate("a@mail")
+        assert (store.get("a@mail") is None)
+
+    # ------------------------------------------------------
+    def test_set_token(self):
+
+        async def run():
+            async with aiohttp.ClientSession() as session:
+                datasource = JsonWebDataSource("a@mail", "p", session)
+                datasource.set_token("stored")
+                assert (datasource._auth_token == "stored")
+                return session.cookie_jar.filter_cookies(URL("https://monespace.grdf.fr/api/e-conso/pce"))["auth_token"].value
+
+        assert (asyncio.run(run()) == "stored")
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import date
+import aiohttp
+import pytest
+from pygazpar.datasource import WebDataSource
+from pygazpar.enum import Frequency
+from pygazpar.singleflight import SingleFlight
+
+
+class CountingAuth:
+
+    def __init__(self):
+        self.calls = 0
+
+    async def request_token(self) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return f"token-{self.calls}"
+
+
+class CountingDataSource(WebDataSource):
+
+    def __init__(self, session: aiohttp.ClientSession):
+        super().__init__("username", "password", session)
+        self._auth = CountingAuth()
+        self.loads = []
+
+    async def _load_from_session(self, pce_identifier, start_date, end_date, frequencies=None):
+        self.loads.append((pce_identifier, frequencies))
+        await asyncio.sleep(0.05)
+        return {frequency.value: [pce_identifier] for frequency in frequencies}
+
+
+class TestSingleFlight:
+
+    # ------------------------------------------------------
+    def test_shared_call(self):
+
+        calls = []
+
+        async def slow(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            return [value]
+
+        async def run():
+            flight = SingleFlight()
+            results = await asyncio.gather(*[flight.do("a", lambda: slow(1)) for _ in range(5)], flight.do("b", lambda: slow(2)))
+            assert (flight.in_flight() == 0)
+            assert (flight.started == 2 and flight.shared == 4)
+            # Not a cache: the next call runs again.
+            await flight.do("a", lambda: slow(3))
+            return results
+
+        results = asyncio.run(run())
+
+        assert (calls == [1, 2, 3])
+        assert (all(result is results[0] for result in results[:5]))
+        assert (results[5] == [2])
+
+    # ------------------------------------------------------
+    def test_shared_exception(self):
+
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            raise ValueError("boom")
+
+        async def run():
+            flight = SingleFlight()
+            return await asyncio.gather(*[flight.do("a", failing) for _ in range(3)], return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert (len(calls) == 1)
+        assert (all(isinstance(result, ValueError) for result in results))
+
+    # ------------------------------------------------------
+    def test_cancelled_caller(self):
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return "done"
+
+        async def run():
+            flight = SingleFlight()
+            first = asyncio.ensure_future(flight.do("a", slow))
+            second = asyncio.ensure_future(flight.do("a", slow))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            # The other caller still gets the result.
+            assert (await second == "done")
+
+            alone = asyncio.ensure_future(flight.do("b", slow))
+            await asyncio.sleep(0.01)
+            task = flight._calls["b"]
+            alone.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await alone
+            await asyncio.sleep(0)
+            assert (task.cancelled())
+            assert (flight.in_flight() == 0)
+
+        asyncio.run(run())
+
+    # ------------------------------------------------------
+    def test_datasource(self):
+
+        async def run():
+            async with aiohttp.ClientSession() as session:
+                datasource = CountingDataSource(session)
+                start, end = date(2023, 1, 1), date(2023, 1, 31)
+                results = await asyncio.gather(
+                    datasource.load("1", start, end, [Frequency.DAILY]),
+                    datasource.load("1", start, end, [Frequency.DAILY, Frequency.DAILY]),
+                    datasource.load("1", start, end, [Frequency.DAILY]),
+                    datasource.load("2", start, end, [Frequency.DAILY]),
+                    datasource.load("1", start, end, [Frequency.MONTHLY]),
+                    datasource.login()
+                )
+                assert (datasource._auth.calls == 1)
+                assert (results[5] == "token-1")
+                assert (results[0] is results[1] and results[0] is results[2])
+                assert (results[3] == {"daily": ["2"]})
+                assert (len(datasource.loads) == 3)
+
+                tokens = await asyncio.gather(*[datasource.login() for _ in range(4)])
+                assert (tokens == ["token-2"] * 4)
+
+        asyncio.run(run())
@@ -0,0 +1,55 @@
+import json
+from datetime import date
+import pytest
+from pygazpar.jsonparser import JsonParser
+from pygazpar.store import ReadingStore
+from pygazpar.types.ConsommationType import ConsommationType
+
+PCE_IDENTIFIER = "22423299474865"
+
+
+class TestStore:
+
+    # ------------------------------------------------------
+    def setup_method(self):
+        with open("tests/resources/donnees_informatives.json") as consumption_json_file:
+            data = ConsommationType(**json.load(consumption_json_file)[PCE_IDENTIFIER])
+        with open("tests/resources/temperatures.json") as temperature_json_file:
+            temperatures = json.load(temperature_json_file)
+        self.daily = JsonParser.parse_result(data, temperatures, PCE_IDENTIFIER)
+
+    # ------------------------------------------------------
+    def naive_energy(self, start, end):
+        return sum(releve.energieConsomme or 0 for releve in self.daily if start <= releve.journeeGaziere <= end)
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("start, end", [("2019-11-30", "2022-11-29"), ("2020-02-15", "2020-03-14"), ("2021-06-01", "2021-06-01"),
+                                            ("2018-01-01", "2019-12-01"), ("2021-01-10", "2021-01-01")])
+    def test_ranges(self, start, end):
+        store = ReadingStore(self.daily)
+
+        assert (store.energy(start, end) == pytest.approx(self.naive_energy(start, end)))
+
+    # ------------------------------------------------------
+    def test_mean_temperature(self):
+        store = ReadingStore(self.daily)
+        temperatures = [float(releve.temperature) for releve in self.daily
+                        if "2021-01-01" <= releve.journeeGaziere <= "2021-01-31" and releve.temperature is not None]
+
+        assert (store.mean_temperature(date(2021, 1, 1), date(2021, 1, 31)) == pytest.approx(sum(temperatures) / len(temperatures)))
+        assert (store.mean_temperature("2019-12-01", "2019-12-31") is None)
+
+    # ------------------------------------------------------
+    def test_append_and_correct(self):
+        store = ReadingStore(self.daily[:1000])
+        store.add(self.daily[990:])
+
+        assert (len(store) == len(self.daily))
+        assert (store.energy() == pytest.approx(self.naive_energy("0000", "9999")))
+
+        correction = self.daily[500]
+        correction.energieConsomme = (correction.energieConsomme or 0) + 100
+        store.add([correction])
+
+        assert (store.energy() == pytest.approx(self.naive_energy("0000", "9999")))
+        assert (store.count(correction.journeeGaziere, None) == len(self.daily) - 500)
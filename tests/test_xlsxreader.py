@@ -0,0 +1,51 @@
+import pytest
+from openpyxl import Workbook
+from pygazpar.enum import Frequency
+from pygazpar.excelparser import ExcelParser
+from pygazpar.xlsxreader import UnsupportedLayoutError, XlsxWorksheet
+
+SAMPLES = {Frequency.DAILY: "tests/resources/Donnees_informatives_PCE_DAILY.xlsx",
+           Frequency.WEEKLY: "tests/resources/Donnees_informatives_PCE_WEEKLY.xlsx",
+           Frequency.MONTHLY: "tests/resources/Donnees_informatives_PCE_MONTHLY.xlsx"}
+
+
+# ------------------------------------------------------
+def values(releves):
+    return [{key: value for key, value in releve.__dict__.items() if key != "timestamp"} for releve in releves]
+
+
+class TestXlsxReader:
+
+    # ------------------------------------------------------
+    @pytest.mark.parametrize("frequency", list(SAMPLES))
+    def test_same_as_openpyxl(self, frequency):
+        fast = ExcelParser.parse(SAMPLES[frequency], frequency)
+        slow = ExcelParser.parse(SAMPLES[frequency], frequency, fast=False)
+
+        assert (len(fast) > 0)
+        assert (values(fast) == values(slow))
+
+    # ------------------------------------------------------
+    def test_cells(self):
+        worksheet = XlsxWorksheet.load(SAMPLES[Frequency.DAILY])
+
+        assert (worksheet["C4"].value == "N° PCE :")
+        assert (worksheet.cell(row=10, column=2).value == "24/11/2020")
+        assert (worksheet.cell(row=10, column=3).value == 12163)
+        assert (len(worksheet["B"]) == worksheet.max_row)
+
+    # ------------------------------------------------------
+    def test_formula_fallback(self, tmp_path):
+        workbook = Workbook()
+        workbook.active["B10"] = "24/11/2020"
+        workbook.active["E10"] = 12
+        workbook.active["J10"] = "=1+1"
+        workbook.save(tmp_path / "formula.xlsx")
+
+        with pytest.raises(UnsupportedLayoutError):
+            XlsxWorksheet.load(str(tmp_path / "formula.xlsx"))
+
+        pce_identifier, frequency, releves = ExcelParser.parse_export(str(tmp_path / "formula.xlsx"))
+
+        assert ((pce_identifier, frequency) == ("formula", Frequency.DAILY))
+        assert (releves[0].volumeBrutConsomme == 12)